@@ -1,4 +1,7 @@
 from .calendarView import CalendarView
 from .diaryView import DiaryView
 from .noteView import QuickNoteView
-from .todoView import TodayTODOView
\ No newline at end of file
+from .todoView import TodayTODOView
+from .taskBoardView import TaskBoardView
+from .findReplaceDialog import FindReplaceDialog
+from .quickSwitcherDialog import QuickSwitcherDialog
@@ -2,7 +2,8 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QCalendarWidget, QLabel, QPushButton, QHBoxLayout
 )
 from PyQt6.QtCore import Qt, QDate, pyqtSignal
-from PyQt6.QtGui import QFont, QColor, QTextCharFormat
+from PyQt6.QtGui import QFont, QTextCharFormat
+from core.style import set_style_role, current_theme
 
 class CalendarView(QWidget):
     date_selected = pyqtSignal(QDate)  # 日期选择信号
@@ -19,8 +20,8 @@ class CalendarView(QWidget):
         
         # 标题
         title = QLabel("选择日期")
-        title.setFont(QFont("Arial", 24, QFont.Weight.Bold))
-        title.setStyleSheet("color: #5D3FD3; padding: 10px;")
+        title.setFont(current_theme().font("title_large"))
+        set_style_role(title, role="title")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(title)
         
@@ -31,6 +32,8 @@ class CalendarView(QWidget):
         self.calendar.clicked.connect(self.on_date_selected)
         # 连接页面变化信号，当月份或年份改变时重新标记日记日期
         self.calendar.currentPageChanged.connect(self.mark_diary_dates)
+        # 切换主题后重新着色
+        current_theme().theme_changed.connect(self.mark_diary_dates)
         layout.addWidget(self.calendar)
         
         # 今天按钮（右上角）
@@ -75,15 +78,11 @@ class CalendarView(QWidget):
         diary_dates = self.file_manager.get_diary_dates_for_month(year, month)
         
         todo_dates = self.check_todo_done(diary_dates)
-        # 根据系统主题选择颜色
-        palette = self.calendar.palette()
-        if palette.window().color().lightness() < 128:  # 深色模式
-            bg_color = QColor("#5E35B1")  # 深紫色
-        else:  # 浅色模式
-            bg_color = QColor("#EDE7F6")  # 浅紫色
+        # 颜色由主题统一决定（深色 / 浅色）
+        theme = current_theme()
         # 创建文本格式
         format = QTextCharFormat()
-        format.setBackground(bg_color)
+        format.setBackground(theme.color("diary_mark"))
         format.setFontWeight(QFont.Weight.Bold)
         
         # 应用格式
@@ -91,11 +90,7 @@ class CalendarView(QWidget):
             self.calendar.setDateTextFormat(date, format)
         # 未完成todo的日期使用黄色背景
         todo_format = QTextCharFormat()
-        if palette.window().color().lightness() < 128:  # 深色模式
-            todo_bg_color = QColor("#DAA520")  # 深黄色
-        else:  # 浅色模式
-            todo_bg_color = QColor("#FFF9C4")  # 浅黄色
-        todo_format.setBackground(todo_bg_color)
+        todo_format.setBackground(theme.color("todo_mark"))
         todo_format.setFontWeight(QFont.Weight.Bold)
 
         for date in todo_dates:
@@ -2,6 +2,8 @@ from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLab
 from PyQt6.QtCore import Qt, QDate, pyqtSignal
 from PyQt6.QtGui import QFont
 from core.editor import DiaryEditor  # 假设你有这个模块
+from core.server.diaryParser import is_document_empty
+from core.style import set_style_role
 class DiaryView(QWidget):
     # 添加返回信号
     back_to_calendar = pyqtSignal()
@@ -11,6 +13,8 @@ class DiaryView(QWidget):
         self.file_manager = file_manager
         self.text_processor = text_processor
         self.current_date = QDate.currentDate()
+        # 是否跳过没有内容的日期
+        self.skip_empty = False
         self.init_ui()
         
     def init_ui(self):
@@ -25,62 +29,42 @@ class DiaryView(QWidget):
         
         # 返回日历按钮
         back_btn = QPushButton("返回日历")
-        back_btn.setStyleSheet("""
-            QPushButton {
-                font-size: 14px;
-                padding: 8px 20px;
-                background-color: #5D3FD3;
-                color: white;
-                border-radius: 6px;
-                font-weight: bold;
-            }
-        """)
+        set_style_role(back_btn, variant="primary")
         back_btn.clicked.connect(self.go_back_to_calendar)
         nav_layout.addWidget(back_btn)
         
         # 日期导航
         prev_btn = QPushButton("◀")
-        prev_btn.setStyleSheet("""
-            QPushButton {
-                font-size: 18px;
-                padding: 5px 15px;
-                background-color: #D6C4F0;
-                border-radius: 6px;
-            }
-            QPushButton:hover {
-                background-color: #EDE7F6;
-            }
-        """)
+        set_style_role(prev_btn, role="dayStep")
         prev_btn.clicked.connect(self.prev_day)
         
         next_btn = QPushButton("▶")
-        next_btn.setStyleSheet(prev_btn.styleSheet())
+        set_style_role(next_btn, role="dayStep")
         next_btn.clicked.connect(self.next_day)
         
         today_btn = QPushButton("今天")
-        today_btn.setStyleSheet("""
-            QPushButton {
-                font-size: 14px;
-                padding: 8px 20px;
-                background-color: #5D3FD3;
-                color: white;
-                border-radius: 6px;
-                font-weight: bold;
-            }
-        """)
+        set_style_role(today_btn, variant="primary")
         today_btn.clicked.connect(self.go_to_today)
         
+        # 跳过空白日期开关
+        self.skip_empty_btn = QPushButton("跳过空白")
+        self.skip_empty_btn.setCheckable(True)
+        self.skip_empty_btn.setToolTip("前后翻页时直接跳到有内容的日记")
+        set_style_role(self.skip_empty_btn, role="toggle")
+        self.skip_empty_btn.toggled.connect(self.set_skip_empty)
+        
         # 日期标签
         self.date_label = QLabel()
         self.update_date_label()
         self.date_label.setFont(QFont("Arial", 20, QFont.Weight.Bold))
-        self.date_label.setStyleSheet("color: #5D3FD3;")
+        set_style_role(self.date_label, role="accent")
         self.date_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
         nav_layout.addWidget(prev_btn)
         nav_layout.addWidget(self.date_label, 1)  # 添加伸缩因子
         nav_layout.addWidget(next_btn)
         nav_layout.addWidget(today_btn)
+        nav_layout.addWidget(self.skip_empty_btn)
         
         layout.addLayout(nav_layout)
         
@@ -108,16 +92,54 @@ class DiaryView(QWidget):
     def refresh(self):
         """刷新日记内容"""
         self.editor.load_date(self.current_date)
+        self.prefetch_neighbors()
     
+    def set_skip_empty(self, checked):
+        """切换是否跳过空白日期"""
+        self.skip_empty = checked
+        self.prefetch_neighbors()
+
+    def find_adjacent_date(self, step):
+        """查找相邻日期，跳过空白模式下只返回有内容的日记"""
+        if not self.skip_empty:
+            return self.current_date.addDays(step)
+
+        date = self.file_manager.get_adjacent_diary_date(self.current_date, step)
+        while date is not None:
+            document = self.file_manager.load_diary_document(date)
+            if not is_document_empty(document):
+                return date
+            date = self.file_manager.get_adjacent_diary_date(date, step)
+        return None
+
+    def prefetch_neighbors(self):
+        """在后台预读前后相邻的日记"""
+        if self.skip_empty:
+            neighbors = [
+                self.file_manager.get_adjacent_diary_date(self.current_date, -1),
+                self.file_manager.get_adjacent_diary_date(self.current_date, 1)
+            ]
+        else:
+            neighbors = [self.current_date.addDays(-1), self.current_date.addDays(1)]
+        self.file_manager.prefetch_diaries(neighbors)
+
     def prev_day(self):
         """跳转到前一天"""
-        self.current_date = self.current_date.addDays(-1)
+        date = self.find_adjacent_date(-1)
+        if date is None:
+            # 前面没有更早的日记
+            return
+        self.current_date = date
         self.update_date_label()
         self.refresh()
     
     def next_day(self):
         """跳转到后一天"""
-        self.current_date = self.current_date.addDays(1)
+        date = self.find_adjacent_date(1)
+        if date is None:
+            # 后面没有更晚的日记
+            return
+        self.current_date = date
         self.update_date_label()
         self.refresh()
     
@@ -0,0 +1,230 @@
+import re
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit, QCheckBox,
+    QPushButton, QTreeWidget, QTreeWidgetItem, QMessageBox, QProgressBar
+)
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from core.server.findReplace import FindReplace
+from core.style import set_style_role
+
+
+class FindThread(QThread):
+    """在后台线程中查找（索引对账和文件扫描都不阻塞界面），结果按批次发出"""
+    progress = pyqtSignal(int, int)
+    results_found = pyqtSignal(list)
+    failed = pyqtSignal(str)
+
+    def __init__(self, finder, parent=None):
+        super().__init__(parent)
+        self.finder = finder
+        self.result = None
+
+    def run(self):
+        try:
+            self.result = self.finder.find(progress=self.progress.emit,
+                                           cancelled=self.isInterruptionRequested,
+                                           on_results=self.results_found.emit)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class FindReplaceDialog(QDialog):
+    """全库查找替换对话框：先预览所有匹配，再把勾选的文件一次性替换"""
+    files_changed = pyqtSignal()
+
+    CONTEXT_CHARS = 40  # 预览中匹配前后保留的字符数
+
+    def __init__(self, file_manager, parent=None):
+        super().__init__(parent)
+        self.file_manager = file_manager
+        self.finder = None
+        self.find_thread = None
+        self.match_count = 0
+        self.setWindowTitle("查找和替换")
+        self.resize(720, 560)
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 15, 20, 15)
+        layout.setSpacing(10)
+
+        form = QGridLayout()
+        self.find_input = QLineEdit()
+        self.find_input.setPlaceholderText("查找内容")
+        self.find_input.returnPressed.connect(self.start_find)
+        self.replace_input = QLineEdit()
+        self.replace_input.setPlaceholderText("替换为（正则模式下可使用 \\1 引用分组）")
+        form.addWidget(QLabel("查找:"), 0, 0)
+        form.addWidget(self.find_input, 0, 1)
+        form.addWidget(QLabel("替换:"), 1, 0)
+        form.addWidget(self.replace_input, 1, 1)
+        layout.addLayout(form)
+
+        options_layout = QHBoxLayout()
+        self.regex_check = QCheckBox("正则表达式")
+        self.case_check = QCheckBox("区分大小写")
+        self.diary_check = QCheckBox("日记")
+        self.diary_check.setChecked(True)
+        self.note_check = QCheckBox("笔记")
+        self.note_check.setChecked(True)
+        for check in (self.regex_check, self.case_check, self.diary_check, self.note_check):
+            options_layout.addWidget(check)
+        options_layout.addStretch()
+        layout.addLayout(options_layout)
+
+        self.result_tree = QTreeWidget()
+        self.result_tree.setHeaderHidden(True)
+        self.result_tree.setUniformRowHeights(True)
+        set_style_role(self.result_tree, role="itemList")
+        layout.addWidget(self.result_tree, 1)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("")
+        set_style_role(self.status_label, role="muted")
+        layout.addWidget(self.status_label)
+
+        btn_layout = QHBoxLayout()
+        self.find_btn = QPushButton("查找")
+        set_style_role(self.find_btn, variant="primary")
+        self.find_btn.clicked.connect(self.start_find)
+        self.replace_btn = QPushButton("替换勾选的文件")
+        set_style_role(self.replace_btn, variant="warning")
+        self.replace_btn.setEnabled(False)
+        self.replace_btn.clicked.connect(self.replace_checked)
+        close_btn = QPushButton("关闭")
+        set_style_role(close_btn, variant="secondary")
+        close_btn.clicked.connect(self.reject)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.find_btn)
+        btn_layout.addWidget(self.replace_btn)
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+
+    # ==================== 查找 ====================
+    def start_find(self):
+        query = self.find_input.text()
+        if not query:
+            return
+        if self.find_thread is not None:
+            # 再次查找时取消正在进行的查找
+            self.find_thread.requestInterruption()
+            return
+
+        try:
+            self.finder = FindReplace(self.file_manager, query,
+                                      regex=self.regex_check.isChecked(),
+                                      case_sensitive=self.case_check.isChecked(),
+                                      include_diaries=self.diary_check.isChecked(),
+                                      include_notes=self.note_check.isChecked())
+        except re.error as e:
+            QMessageBox.warning(self, "正则表达式错误", str(e))
+            return
+
+        self.result_tree.clear()
+        self.match_count = 0
+        self.replace_btn.setEnabled(False)
+        self.find_btn.setText("停止")
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setVisible(True)
+        self.status_label.setText("正在查找...")
+
+        thread = FindThread(self.finder, self)
+        errors = []
+        thread.progress.connect(self.update_progress)
+        thread.results_found.connect(self.add_results)
+        thread.failed.connect(errors.append)
+        thread.finished.connect(lambda: self.finish_find(thread, errors))
+        self.find_thread = thread
+        thread.start()
+
+    def update_progress(self, done, total):
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setValue(done)
+
+    def finish_find(self, thread, errors):
+        self.find_thread = None
+        self.find_btn.setText("查找")
+        self.progress_bar.setVisible(False)
+
+        if errors:
+            self.status_label.setText(f"查找失败: {errors[0]}")
+            return
+        if thread.result is None:
+            self.status_label.setText(f"已停止查找，已找到 {self.match_count} 处匹配")
+        else:
+            self.status_label.setText(
+                f"在 {len(thread.result)} 个文件中找到 {self.match_count} 处匹配")
+        self.replace_btn.setEnabled(self.result_tree.topLevelItemCount() > 0)
+
+    def add_results(self, results):
+        """追加一批结果：每个文件一项（可勾选），下面列出匹配行"""
+        self.result_tree.setUpdatesEnabled(False)
+        for rel_path, count, matches in results:
+            self.match_count += count
+            file_item = QTreeWidgetItem([f"{rel_path}  ({count} 处)"])
+            file_item.setData(0, Qt.ItemDataRole.UserRole, rel_path)
+            file_item.setFlags(file_item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            file_item.setCheckState(0, Qt.CheckState.Checked)
+            for line_no, line, start, end in matches:
+                file_item.addChild(QTreeWidgetItem([f"{line_no}: {self.match_context(line, start, end)}"]))
+            if count > len(matches):
+                file_item.addChild(QTreeWidgetItem([f"……还有 {count - len(matches)} 处"]))
+            self.result_tree.addTopLevelItem(file_item)
+        self.result_tree.setUpdatesEnabled(True)
+        self.status_label.setText(f"正在查找... 已找到 {self.match_count} 处匹配")
+
+    def match_context(self, line, start, end):
+        """截取匹配附近的文本，匹配部分用【】标出"""
+        left = max(0, start - self.CONTEXT_CHARS)
+        right = min(len(line), end + self.CONTEXT_CHARS)
+        prefix = "…" if left > 0 else ""
+        suffix = "…" if right < len(line) else ""
+        return f"{prefix}{line[left:start]}【{line[start:end]}】{line[end:right]}{suffix}".strip()
+
+    # ==================== 替换 ====================
+    def checked_paths(self):
+        paths = []
+        for i in range(self.result_tree.topLevelItemCount()):
+            item = self.result_tree.topLevelItem(i)
+            if item.checkState(0) == Qt.CheckState.Checked:
+                paths.append(item.data(0, Qt.ItemDataRole.UserRole))
+        return paths
+
+    def replace_checked(self):
+        paths = self.checked_paths()
+        if self.finder is None or not paths:
+            return
+
+        replacement = self.replace_input.text()
+        reply = QMessageBox.question(
+            self, "确认替换",
+            f"确定把 {len(paths)} 个文件中的匹配替换为 '{replacement}' 吗？",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+
+        try:
+            count = self.finder.replace(replacement, paths)
+        except re.error as e:
+            QMessageBox.warning(self, "替换失败", f"替换文本无效: {e}")
+            return
+        if count < 0:
+            QMessageBox.critical(self, "错误", "写入文件失败，未做任何修改")
+            return
+
+        self.result_tree.clear()
+        self.replace_btn.setEnabled(False)
+        self.status_label.setText(f"已在 {len(paths)} 个文件中替换 {count} 处")
+        self.files_changed.emit()
+
+    def reject(self):
+        if self.find_thread is not None:
+            self.find_thread.requestInterruption()
+            self.find_thread.wait()
+        super().reject()
@@ -6,10 +6,30 @@ from PyQt6.QtWidgets import (
     QMessageBox, QInputDialog, QLabel, QMenu, QComboBox, QDialog,
     QScrollArea
 )
-from PyQt6.QtCore import Qt, QDate, pyqtSignal, QDateTime
-from PyQt6.QtGui import QFont, QIcon
+from PyQt6.QtCore import Qt, QDate, QThread, QTimer, pyqtSignal, QDateTime
+from PyQt6.QtGui import QIcon
+from core.style import set_style_role, current_theme
+from core.server.queryLanguage import QueryPlanner, parse_query, is_structured_query
+
+class NoteQueryThread(QThread):
+    """在后台线程中执行结构化笔记查询（全文索引对账和首次建立都不阻塞界面）"""
+
+    def __init__(self, file_manager, text, parent=None):
+        super().__init__(parent)
+        self.file_manager = file_manager
+        self.text = text
+        self.result = None
+
+    def run(self):
+        try:
+            self.result = QueryPlanner(self.file_manager).find_notes(parse_query(self.text))
+        except Exception as e:
+            print(f"笔记查询失败: {e}")
+
 
 class QuickNoteView(QWidget):
+    SEARCH_DELAY_MS = 300   # 输入停顿后才开始搜索
+
     notename_changed = pyqtSignal(str, str) # old_filename, new_filename
     note_deleted = pyqtSignal(str)
     note_created = pyqtSignal(str)
@@ -18,6 +38,8 @@ class QuickNoteView(QWidget):
         self.file_manager = file_manager
         self.text_processor = text_processor
         self.filter_tag = None
+        self.query_thread = None      # 最新的查询，结果只采用它的
+        self.running_queries = set()
         self.init_ui()
     
     def format_time_human_readable(self, timestamp):
@@ -64,22 +86,19 @@ class QuickNoteView(QWidget):
         title_layout = QHBoxLayout()
         
         title = QLabel("快速笔记")
-        title.setFont(QFont("Arial", 20, QFont.Weight.Bold))
-        title.setStyleSheet("color: #5D3FD3; margin-bottom: 5px;")
+        title.setFont(current_theme().font("title"))
+        set_style_role(title, role="title")
         
         # 搜索框
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("搜索笔记...")
+        self.search_input.setPlaceholderText('搜索笔记... 支持 tag:工作 date:2025-06..2025-08 "关键字"')
         self.search_input.setClearButtonEnabled(True)
-        self.search_input.setStyleSheet("""
-            QLineEdit {
-                padding: 8px 12px;
-                font-size: 14px;
-                border: 1px solid #E0E0E0;
-                border-radius: 6px;
-            }
-        """)
-        self.search_input.textChanged.connect(self.refresh)
+        set_style_role(self.search_input, role="search")
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.refresh)
+        self.search_input.textChanged.connect(self.search_timer.start)
         
         title_layout.addWidget(title)
         title_layout.addStretch(1)
@@ -91,32 +110,14 @@ class QuickNoteView(QWidget):
         # 新建笔记按钮
         new_note_btn = QPushButton("新建笔记")
         new_note_btn.setIcon(QIcon.fromTheme("document-new"))
-        new_note_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #5D3FD3;
-                color: white;
-                padding: 8px 16px;
-                font-weight: bold;
-                border-radius: 6px;
-            }
-            QPushButton:hover {
-                background-color: #4A2FB8;
-            }
-        """)
+        set_style_role(new_note_btn, variant="primary")
         new_note_btn.clicked.connect(self.create_new_note)
         
         # 标签过滤按钮
         self.tag_filter_combo = QComboBox()
         self.tag_filter_combo.addItem("所有标签", None)
         self.tag_filter_combo.setPlaceholderText("按标签过滤")
-        self.tag_filter_combo.setStyleSheet("""
-            QComboBox {
-                padding: 6px;
-                font-size: 14px;
-                border: 1px solid #E0E0E0;
-                border-radius: 6px;
-            }
-        """)
+        set_style_role(self.tag_filter_combo, role="filter")
         self.tag_filter_combo.currentIndexChanged.connect(self.filter_by_tag)
         
         # 排序方式
@@ -124,14 +125,7 @@ class QuickNoteView(QWidget):
         self.sort_combo.addItem("最近修改", "modified")
         self.sort_combo.addItem("标题 A-Z", "title_asc")
         self.sort_combo.addItem("标题 Z-A", "title_desc")
-        self.sort_combo.setStyleSheet("""
-            QComboBox {
-                padding: 6px;
-                font-size: 14px;
-                border: 1px solid #E0E0E0;
-                border-radius: 6px;
-            }
-        """)
+        set_style_role(self.sort_combo, role="filter")
         self.sort_combo.currentIndexChanged.connect(self.refresh)
         
         btn_layout.addWidget(new_note_btn)
@@ -142,19 +136,7 @@ class QuickNoteView(QWidget):
         
         # 笔记列表容器
         self.notes_list = QListWidget()
-        self.notes_list.setStyleSheet("""
-            QListWidget {
-                border: 1px solid #E0E0E0;
-                border-radius: 8px;
-            }
-            QListWidget::item {
-                padding: 0px;
-                border-bottom: 1px solid #EEEEEE;
-            }
-            QListWidget::item:selected {
-                background-color: #EDE7F6;
-            }
-        """)
+        self.notes_list.setObjectName("notesList")
         self.notes_list.setVerticalScrollMode(QListWidget.ScrollMode.ScrollPerPixel)
         self.notes_list.itemClicked.connect(self.open_note)
         self.notes_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
@@ -170,7 +152,42 @@ class QuickNoteView(QWidget):
         self.setLayout(main_layout)
     
     def refresh(self):
-        """刷新笔记列表"""
+        """刷新笔记列表（结构化查询先在后台线程求出结果）"""
+        self.search_timer.stop()
+        raw_text = self.search_input.text()
+        # 使用 tag: / date: / "短语" 等语法时由查询规划器通过索引求出结果
+        # （标签区分大小写，parse_query 只把文本词转为小写，因此传入原文）
+        if is_structured_query(raw_text):
+            thread = NoteQueryThread(self.file_manager, raw_text, self)
+            thread.finished.connect(lambda: self.finish_query(thread))
+            self.query_thread = thread
+            self.running_queries.add(thread)
+            thread.start()
+            return
+        self.query_thread = None
+        self.populate_notes(None)
+
+    def finish_query(self, thread):
+        self.running_queries.discard(thread)
+        thread.deleteLater()
+        if thread is not self.query_thread:
+            return  # 已有更新的查询
+        self.query_thread = None
+        self.populate_notes(set(thread.result or ()))
+
+    def stop_queries(self):
+        """等待后台查询结束（窗口关闭时调用）"""
+        self.search_timer.stop()
+        self.query_thread = None
+        for thread in list(self.running_queries):
+            thread.wait()
+
+    def populate_notes(self, query_matches):
+        """按搜索、标签过滤和排序重建笔记列表
+
+        Args:
+            query_matches (set | None): 结构化查询匹配的文件名，None 表示使用普通搜索
+        """
         # 保存滚动位置
         scrollbar = self.notes_list.verticalScrollBar()
         scroll_pos = scrollbar.value() if scrollbar else 0
@@ -229,7 +246,10 @@ class QuickNoteView(QWidget):
             all_tags.update(tags)
             
             # 应用搜索过滤
-            if search_text and not (search_text in note_title.lower() or any(search_text in tag.lower() for tag in tags)):
+            if query_matches is not None:
+                if filename not in query_matches:
+                    continue
+            elif search_text and not (search_text in note_title.lower() or any(search_text in tag.lower() for tag in tags)):
                 continue
             
             # 应用标签过滤
@@ -250,7 +270,7 @@ class QuickNoteView(QWidget):
             title_layout.setContentsMargins(0, 0, 0, 0)
             
             title_label = QLabel(note_title if note_title else "未命名笔记")
-            title_label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+            title_label.setFont(current_theme().font("body_bold"))
             # title_label.setStyleSheet("color: #212121;")
             title_layout.addWidget(title_label)
             
@@ -258,15 +278,15 @@ class QuickNoteView(QWidget):
             
             # 修改时间（人类可读格式）
             time_label = QLabel(human_time)
-            time_label.setFont(QFont("Arial", 10))
-            time_label.setStyleSheet("color: #757575;")
+            time_label.setFont(current_theme().font("meta"))
+            set_style_role(time_label, role="muted")
             title_layout.addWidget(time_label)
             
             # 如果有创建日期，也显示
             if note_date:
                 date_label = QLabel(f"创建: {note_date}")
-                date_label.setFont(QFont("Arial", 9))
-                date_label.setStyleSheet("color: #9E9E9E;")
+                date_label.setFont(current_theme().font("small"))
+                set_style_role(date_label, role="subtle")
                 title_layout.addWidget(date_label)
             
             layout.addLayout(title_layout)
@@ -279,13 +299,8 @@ class QuickNoteView(QWidget):
                 
                 for tag in tags:
                     tag_label = QLabel(f"#{tag}")
-                    tag_label.setFont(QFont("Arial", 9))
-                    tag_label.setStyleSheet("""
-                        background-color: #E0E0E0;
-                        color: #424242;
-                        border-radius: 10px;
-                        padding: 2px 8px;
-                    """)
+                    tag_label.setFont(current_theme().font("small"))
+                    set_style_role(tag_label, role="chip")
                     tags_layout.addWidget(tag_label)
                 
                 tags_layout.addStretch()
@@ -307,8 +322,8 @@ class QuickNoteView(QWidget):
             
             if preview_text:
                 preview_label = QLabel(preview_text)
-                preview_label.setFont(QFont("Arial", 10))
-                preview_label.setStyleSheet("color: #616161;")
+                preview_label.setFont(current_theme().font("meta"))
+                set_style_role(preview_label, role="preview")
                 preview_label.setWordWrap(True)
                 layout.addWidget(preview_label)
             
@@ -367,19 +382,19 @@ class QuickNoteView(QWidget):
         
         # 笔记标题
         title_label = QLabel("笔记标题:")
-        title_label.setStyleSheet("font-weight: bold;")
+        set_style_role(title_label, role="formLabel")
         self.new_note_title = QLineEdit()
         self.new_note_title.setPlaceholderText("输入笔记标题")
         
         # 标签输入
         tags_label = QLabel("标签 (可选, 用逗号分隔):")
-        tags_label.setStyleSheet("font-weight: bold;")
+        set_style_role(tags_label, role="formLabel")
         self.new_note_tags = QLineEdit()
         self.new_note_tags.setPlaceholderText("例如: 工作,项目")
         
         # 已有标签区域
         existing_tags_label = QLabel("已有标签 (点击添加):")
-        existing_tags_label.setStyleSheet("font-weight: bold; margin-top: 10px;")
+        set_style_role(existing_tags_label, role="formLabel")
         
         # 标签按钮滚动区域
         tags_scroll = QScrollArea()
@@ -413,27 +428,10 @@ class QuickNoteView(QWidget):
         
         self.new_tag_input = QLineEdit()
         self.new_tag_input.setPlaceholderText("添加新标签...")
-        self.new_tag_input.setStyleSheet("""
-            QLineEdit {
-                padding: 6px 10px;
-                border: 1px solid #E0E0E0;
-                border-radius: 4px;
-            }
-        """)
+        set_style_role(self.new_tag_input, role="search")
         
         add_tag_btn = QPushButton("添加到标签库")
-        add_tag_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                padding: 6px 12px;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-        """)
+        set_style_role(add_tag_btn, variant="success")
         add_tag_btn.clicked.connect(self.add_new_tag_to_library)
         
         new_tag_layout.addWidget(QLabel("新标签:"))
@@ -445,30 +443,11 @@ class QuickNoteView(QWidget):
         btn_layout.setContentsMargins(0, 15, 0, 0)
         
         create_btn = QPushButton("创建")
-        create_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #5D3FD3;
-                color: white;
-                padding: 8px 16px;
-                font-weight: bold;
-                border-radius: 6px;
-            }
-            QPushButton:hover {
-                background-color: #4A2FB8;
-            }
-        """)
+        set_style_role(create_btn, variant="primary")
         create_btn.clicked.connect(lambda: self.do_create_note(dialog))
         
         cancel_btn = QPushButton("取消")
-        cancel_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #EEEEEE;
-                color: #424242;
-                padding: 8px 16px;
-                font-weight: bold;
-                border-radius: 6px;
-            }
-        """)
+        set_style_role(cancel_btn, variant="secondary")
         cancel_btn.clicked.connect(dialog.reject)
         
         btn_layout.addStretch()
@@ -498,22 +477,7 @@ class QuickNoteView(QWidget):
         # 创建标签按钮
         for tag in tags:
             tag_btn = QPushButton(f"#{tag}")
-            tag_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #E8EAF6;
-                    color: #3F51B5;
-                    border: 1px solid #C5CAE9;
-                    border-radius: 15px;
-                    padding: 5px 12px;
-                    font-size: 12px;
-                }
-                QPushButton:hover {
-                    background-color: #C5CAE9;
-                }
-                QPushButton:pressed {
-                    background-color: #9FA8DA;
-                }
-            """)
+            set_style_role(tag_btn, role="tagChip")
             tag_btn.clicked.connect(lambda checked, t=tag: self.add_tag_to_input(t))
             self.tags_button_layout.addWidget(tag_btn)
         
@@ -754,7 +718,7 @@ class QuickNoteView(QWidget):
         # 标签标题
         title = QLabel(f"标签: {filename.split('_', 1)[-1].replace('#', '')}")
         title.setWordWrap(True)
-        title.setStyleSheet("font-weight: bold; font-size: 14px; margin-bottom: 10px;")
+        set_style_role(title, role="heading")
         layout.addWidget(title)
         
         # 添加新标签区域
@@ -770,29 +734,17 @@ class QuickNoteView(QWidget):
         
         # 标签列表
         tags_list_label = QLabel("已有标签:")
-        tags_list_label.setStyleSheet("font-weight: bold; margin-top: 10px;")
+        set_style_role(tags_list_label, role="formLabel")
         layout.addWidget(tags_list_label)
         
         self.tags_list = QListWidget()
         self.tags_list.addItems(current_tags)
-        self.tags_list.setStyleSheet("""
-            QListWidget::item {
-                padding: 4px 8px;
-                margin: 2px;
-            }
-        """)
+        set_style_role(self.tags_list, role="compactList")
         layout.addWidget(self.tags_list)
         
         # 移除按钮
         remove_btn = QPushButton("移除选中标签")
-        remove_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f8d7da;
-                color: #721c24;
-                padding: 6px 12px;
-                margin-top: 10px;
-            }
-        """)
+        set_style_role(remove_btn, variant="danger")
         remove_btn.clicked.connect(lambda: self.remove_selected_tag(item))
         
         btn_layout = QHBoxLayout()
@@ -0,0 +1,75 @@
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem
+from PyQt6.QtCore import Qt, QEvent, pyqtSignal
+from core.style import set_style_role
+
+
+class QuickSwitcherDialog(QDialog):
+    """Ctrl+P 快速跳转：输入标题前缀跳转到笔记，输入日期前缀跳转到日记"""
+    note_selected = pyqtSignal(str)   # 笔记文件名
+    date_selected = pyqtSignal(str)   # yyyy-MM-dd
+
+    def __init__(self, switcher_index, parent=None):
+        super().__init__(parent)
+        self.switcher_index = switcher_index
+        self.setWindowTitle("快速跳转")
+        self.setWindowFlags(Qt.WindowType.Popup)
+        self.resize(480, 360)
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+
+        self.input = QLineEdit()
+        self.input.setPlaceholderText("输入笔记标题或日期，例如 2025-08-1")
+        set_style_role(self.input, role="search")
+        self.input.textChanged.connect(self.update_results)
+        self.input.returnPressed.connect(self.activate_current)
+        self.input.installEventFilter(self)
+
+        self.result_list = QListWidget()
+        self.result_list.setUniformItemSizes(True)
+        set_style_role(self.result_list, role="itemList")
+        self.result_list.itemActivated.connect(self.activate_item)
+
+        layout.addWidget(self.input)
+        layout.addWidget(self.result_list, 1)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.input.setFocus()
+
+    def eventFilter(self, obj, event):
+        # 输入框中按上下键移动结果选择
+        if obj is self.input and event.type() == QEvent.Type.KeyPress:
+            key = event.key()
+            if key in (Qt.Key.Key_Down, Qt.Key.Key_Up):
+                step = 1 if key == Qt.Key.Key_Down else -1
+                count = self.result_list.count()
+                if count:
+                    row = (self.result_list.currentRow() + step) % count
+                    self.result_list.setCurrentRow(row)
+                return True
+        return super().eventFilter(obj, event)
+
+    def update_results(self, text):
+        self.result_list.clear()
+        for kind, value, label in self.switcher_index.search(text):
+            item = QListWidgetItem(label)
+            item.setData(Qt.ItemDataRole.UserRole, (kind, value))
+            self.result_list.addItem(item)
+        if self.result_list.count():
+            self.result_list.setCurrentRow(0)
+
+    def activate_current(self):
+        item = self.result_list.currentItem()
+        if item is not None:
+            self.activate_item(item)
+
+    def activate_item(self, item):
+        kind, value = item.data(Qt.ItemDataRole.UserRole)
+        self.accept()
+        if kind == "note":
+            self.note_selected.emit(value)
+        else:
+            self.date_selected.emit(value)
@@ -0,0 +1,179 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QListWidget, QListWidgetItem,
+    QPushButton, QLineEdit, QComboBox, QSpinBox, QCheckBox, QDateEdit,
+    QMessageBox, QGridLayout
+)
+from PyQt6.QtCore import Qt, QDate
+from core.style import set_style_role
+
+
+class RecurringTaskDialog(QDialog):
+    """循环任务管理对话框"""
+
+    FREQ_OPTIONS = [("每天", "daily"), ("每周", "weekly"), ("每月", "monthly")]
+    WEEKDAY_NAMES = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
+
+    def __init__(self, scheduler, todo_tags, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self.todo_tags = todo_tags
+        self.setWindowTitle("循环任务")
+        self.resize(560, 520)
+        self.init_ui()
+        self.load_rules()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 15, 20, 15)
+        layout.setSpacing(10)
+
+        rules_label = QLabel("已有循环任务:")
+        set_style_role(rules_label, role="formLabel")
+        self.rules_list = QListWidget()
+
+        remove_btn = QPushButton("删除选中")
+        set_style_role(remove_btn, variant="danger")
+        remove_btn.clicked.connect(self.remove_selected)
+
+        # 新建规则表单
+        form_label = QLabel("新建循环任务:")
+        set_style_role(form_label, role="formLabel")
+
+        form = QGridLayout()
+        self.text_input = QLineEdit()
+        self.text_input.setPlaceholderText("任务内容")
+
+        self.freq_combo = QComboBox()
+        for text, value in self.FREQ_OPTIONS:
+            self.freq_combo.addItem(text, value)
+        self.freq_combo.currentIndexChanged.connect(self.update_weekday_visibility)
+
+        self.interval_spin = QSpinBox()
+        self.interval_spin.setRange(1, 365)
+        self.interval_spin.setPrefix("每 ")
+
+        self.start_edit = QDateEdit(QDate.currentDate())
+        self.start_edit.setCalendarPopup(True)
+        self.start_edit.setDisplayFormat("yyyy-MM-dd")
+
+        self.priority_combo = QComboBox()
+        self.priority_combo.addItem("无优先级", None)
+        for value in ("High", "Medium", "Low"):
+            self.priority_combo.addItem(value, value)
+
+        self.tags_input = QLineEdit()
+        self.tags_input.setPlaceholderText("标签，用逗号分隔，例如: " + ",".join(self.todo_tags[:3]))
+
+        weekday_layout = QHBoxLayout()
+        self.weekday_checks = []
+        for name in self.WEEKDAY_NAMES:
+            check = QCheckBox(name)
+            self.weekday_checks.append(check)
+            weekday_layout.addWidget(check)
+        self.weekday_widget_label = QLabel("重复于:")
+
+        form.addWidget(QLabel("内容:"), 0, 0)
+        form.addWidget(self.text_input, 0, 1, 1, 3)
+        form.addWidget(QLabel("频率:"), 1, 0)
+        form.addWidget(self.freq_combo, 1, 1)
+        form.addWidget(QLabel("间隔:"), 1, 2)
+        form.addWidget(self.interval_spin, 1, 3)
+        form.addWidget(QLabel("开始:"), 2, 0)
+        form.addWidget(self.start_edit, 2, 1)
+        form.addWidget(QLabel("优先级:"), 2, 2)
+        form.addWidget(self.priority_combo, 2, 3)
+        form.addWidget(QLabel("标签:"), 3, 0)
+        form.addWidget(self.tags_input, 3, 1, 1, 3)
+        form.addWidget(self.weekday_widget_label, 4, 0)
+        form.addLayout(weekday_layout, 4, 1, 1, 3)
+
+        add_btn = QPushButton("添加")
+        set_style_role(add_btn, variant="primary")
+        add_btn.clicked.connect(self.add_rule)
+
+        close_btn = QPushButton("关闭")
+        close_btn.clicked.connect(self.accept)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addWidget(remove_btn)
+        btn_layout.addStretch()
+        btn_layout.addWidget(add_btn)
+        btn_layout.addWidget(close_btn)
+
+        layout.addWidget(rules_label)
+        layout.addWidget(self.rules_list, 1)
+        layout.addWidget(form_label)
+        layout.addLayout(form)
+        layout.addLayout(btn_layout)
+
+        self.update_weekday_visibility()
+
+    def update_weekday_visibility(self):
+        """只有每周重复时才显示星期选择"""
+        weekly = self.freq_combo.currentData() == "weekly"
+        self.weekday_widget_label.setVisible(weekly)
+        for check in self.weekday_checks:
+            check.setVisible(weekly)
+
+    def describe_rule(self, rule):
+        """生成规则的可读描述"""
+        interval = rule.get('interval', 1)
+        if rule['freq'] == "daily":
+            when = "每天" if interval == 1 else f"每 {interval} 天"
+        elif rule['freq'] == "weekly":
+            days = rule.get('weekdays') or [QDate.fromString(rule['start'], "yyyy-MM-dd").dayOfWeek()]
+            names = "/".join(self.WEEKDAY_NAMES[d - 1] for d in days)
+            when = (f"每周 {names}" if interval == 1 else f"每 {interval} 周 {names}")
+        else:
+            day = rule.get('monthday') or int(rule['start'][8:10])
+            when = (f"每月 {day} 日" if interval == 1 else f"每 {interval} 个月 {day} 日")
+
+        parts = [f"↻ {rule['text']}", when, f"从 {rule['start']}"]
+        if rule.get('priority'):
+            parts.append(rule['priority'])
+        parts.extend(f"#{tag}" for tag in rule.get('tags') or [])
+        return "  ·  ".join(parts)
+
+    def load_rules(self):
+        self.rules_list.clear()
+        for rule in self.scheduler.list_rules():
+            item = QListWidgetItem(self.describe_rule(rule))
+            item.setData(Qt.ItemDataRole.UserRole, rule['id'])
+            self.rules_list.addItem(item)
+
+    def add_rule(self):
+        text = self.text_input.text().strip()
+        if not text:
+            QMessageBox.warning(self, "输入错误", "任务内容不能为空")
+            return
+
+        freq = self.freq_combo.currentData()
+        weekdays = None
+        if freq == "weekly":
+            weekdays = [i + 1 for i, check in enumerate(self.weekday_checks) if check.isChecked()]
+        tags = [t.strip() for t in self.tags_input.text().split(',') if t.strip()]
+
+        self.scheduler.add_rule(
+            text, freq,
+            start=self.start_edit.date().toString("yyyy-MM-dd"),
+            interval=self.interval_spin.value(),
+            weekdays=weekdays or None,
+            priority=self.priority_combo.currentData(),
+            tags=tags
+        )
+        self.text_input.clear()
+        self.tags_input.clear()
+        self.load_rules()
+
+    def remove_selected(self):
+        item = self.rules_list.currentItem()
+        if not item:
+            return
+        reply = QMessageBox.question(
+            self, "确认删除", "删除循环任务会同时清除它的历史完成记录，确定吗？",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self.scheduler.remove_rule(item.data(Qt.ItemDataRole.UserRole))
+            self.load_rules()
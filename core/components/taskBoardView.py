@@ -0,0 +1,211 @@
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QListView
+)
+from PyQt6.QtCore import Qt, QDate, pyqtSignal, QAbstractListModel, QModelIndex
+from PyQt6.QtGui import QBrush
+from core.style import set_style_role, current_theme
+
+
+class TaskBoardModel(QAbstractListModel):
+    """
+    任务看板数据模型
+    每行是一个分组标题或一个任务，QListView 只会请求可见行的数据，
+    因此任务再多也不会为每一行创建控件。
+    """
+    TaskIdRole = Qt.ItemDataRole.UserRole
+    TaskDateRole = Qt.ItemDataRole.UserRole + 1
+    IsHeaderRole = Qt.ItemDataRole.UserRole + 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []   # ('header', 标题) 或 ('task', Task)
+        self._header_font = current_theme().font("board_header")
+        self.update_colors()
+
+    def update_colors(self):
+        """根据当前主题更新分组标题的配色"""
+        theme = current_theme()
+        self._header_brush = QBrush(theme.color("selection"))
+        self._header_fg = QBrush(theme.color("primary"))
+        if self._rows:
+            self.dataChanged.emit(self.index(0), self.index(len(self._rows) - 1))
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        if self._rows[index.row()][0] == 'header':
+            return Qt.ItemFlag.ItemIsEnabled
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        kind, value = self._rows[index.row()]
+
+        if kind == 'header':
+            if role == Qt.ItemDataRole.DisplayRole:
+                return value
+            if role == Qt.ItemDataRole.FontRole:
+                return self._header_font
+            if role == Qt.ItemDataRole.BackgroundRole:
+                return self._header_brush
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return self._header_fg
+            if role == self.IsHeaderRole:
+                return True
+            return None
+
+        task = value
+        if role == Qt.ItemDataRole.DisplayRole:
+            parts = [f"◌  {task.text if task.text.strip() else '(无标题任务)'}"]
+            if task.priority:
+                parts.append(f"[{task.priority}]")
+            parts.extend(f"#{tag}" for tag in task.tags)
+            if task.due:
+                parts.append(f"截止 {task.due}")
+            parts.append(f"· {task.date}")
+            return "  ".join(parts)
+        if role == self.TaskIdRole:
+            return task.task_id
+        if role == self.TaskDateRole:
+            return task.date
+        if role == self.IsHeaderRole:
+            return False
+        return None
+
+
+class TaskBoardView(QWidget):
+    """全部日期的未完成任务看板"""
+    open_date = pyqtSignal(QDate)  # 双击任务时打开对应日期的日记
+
+    GROUP_MODES = [
+        ("按日期", "date"),
+        ("按标签", "tag"),
+        ("按优先级", "priority"),
+    ]
+    PRIORITY_ORDER = ["high", "medium", "low"]
+
+    def __init__(self, file_manager):
+        super().__init__()
+        self.file_manager = file_manager
+        self.task_store = None
+        self._dirty = True
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        title_layout = QHBoxLayout()
+        title = QLabel("任务看板")
+        title.setFont(current_theme().font("title"))
+        set_style_role(title, role="title")
+
+        self.summary_label = QLabel()
+        set_style_role(self.summary_label, role="muted")
+
+        self.group_combo = QComboBox()
+        for text, mode in self.GROUP_MODES:
+            self.group_combo.addItem(text, mode)
+        self.group_combo.currentIndexChanged.connect(self.rebuild)
+
+        title_layout.addWidget(title)
+        title_layout.addStretch()
+        title_layout.addWidget(self.summary_label)
+        title_layout.addWidget(QLabel("分组:"))
+        title_layout.addWidget(self.group_combo)
+
+        self.model = TaskBoardModel(self)
+        self.task_view = QListView()
+        self.task_view.setModel(self.model)
+        # 所有行等高，QListView 可以跳过逐行尺寸计算
+        self.task_view.setUniformItemSizes(True)
+        self.task_view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.task_view.setBatchSize(200)
+        self.task_view.setFont(current_theme().font("board"))
+        self.task_view.setObjectName("taskBoard")
+        set_style_role(self.task_view, role="itemList")
+        self.task_view.doubleClicked.connect(self.on_double_clicked)
+        current_theme().theme_changed.connect(self.model.update_colors)
+
+        layout.addLayout(title_layout)
+        layout.addWidget(self.task_view, 1)
+        self.setLayout(layout)
+
+    def refresh(self):
+        """显示看板时调用，首次调用才加载任务索引"""
+        if self.task_store is None:
+            self.task_store = self.file_manager.get_task_store()
+            self.task_store.add_listener(self.on_store_changed)
+            self._dirty = True
+        if self._dirty:
+            self.rebuild()
+
+    def on_store_changed(self, date_keys):
+        """任务索引变化时只做标记，看板可见时才重建行"""
+        self._dirty = True
+        if self.isVisible():
+            self.rebuild()
+
+    def rebuild(self):
+        """根据分组方式从任务索引重建看板行"""
+        if self.task_store is None:
+            return
+        self._dirty = False
+
+        tasks = self.task_store.query(completed=False)
+        mode = self.group_combo.currentData()
+
+        groups = []
+        if mode == "tag":
+            by_tag = {}
+            untagged = []
+            for task in tasks:
+                if not task.tags:
+                    untagged.append(task)
+                for tag in task.tags:
+                    by_tag.setdefault(tag, []).append(task)
+            groups = [(f"#{tag}", by_tag[tag]) for tag in sorted(by_tag)]
+            if untagged:
+                groups.append(("无标签", untagged))
+        elif mode == "priority":
+            by_priority = {}
+            for task in tasks:
+                key = task.priority.lower() if task.priority else ""
+                by_priority.setdefault(key, []).append(task)
+            order = self.PRIORITY_ORDER + sorted(k for k in by_priority
+                                                 if k and k not in self.PRIORITY_ORDER)
+            for key in order:
+                if key in by_priority:
+                    groups.append((key.capitalize(), by_priority[key]))
+            if "" in by_priority:
+                groups.append(("无优先级", by_priority[""]))
+        else:
+            # 按日期分组，最近的日期在前
+            by_date = {}
+            for task in tasks:
+                by_date.setdefault(task.date, []).append(task)
+            groups = [(date_key, by_date[date_key]) for date_key in sorted(by_date, reverse=True)]
+
+        rows = []
+        for label, group_tasks in groups:
+            rows.append(('header', f"{label}  ({len(group_tasks)})"))
+            rows.extend(('task', task) for task in group_tasks)
+
+        self.model.set_rows(rows)
+        self.summary_label.setText(f"未完成 {len(tasks)} 项")
+
+    def on_double_clicked(self, index):
+        """双击任务打开对应日期的日记"""
+        if index.data(TaskBoardModel.IsHeaderRole):
+            return
+        date_key = index.data(TaskBoardModel.TaskDateRole)
+        if date_key:
+            self.open_date.emit(QDate.fromString(date_key, "yyyy-MM-dd"))
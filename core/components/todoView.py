@@ -1,15 +1,23 @@
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QListWidget, QLineEdit, QListWidgetItem,
-    QMessageBox, QInputDialog, QLabel, QMenu, QSizePolicy,
+    QPushButton, QListView, QLineEdit,
+    QMessageBox, QInputDialog, QLabel, QMenu,
     QDialog, QScrollArea
 )
-from PyQt6.QtCore import Qt, QDate, pyqtSignal, QSize, QDateTime
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QDate, pyqtSignal, QDateTime
+from core.server.diaryParser import (
+    parse_tags_and_priority, parse_task_fields, format_task_line, new_task_id
+)
+from core.editor.taskItemDelegate import TaskListModel, TaskItemDelegate
+from core.editor.taskBulkActions import TaskBulkActions
+from core.server.taskRollover import rollover_tasks
+from core.server.recurrence import STATE_DONE, STATE_SKIPPED
+from .recurringTaskDialog import RecurringTaskDialog
+from core.style import set_style_role, current_theme
 
 
-class TodayTODOView(QWidget):
+class TodayTODOView(QWidget, TaskBulkActions):
     diary_saved = pyqtSignal(QDateTime) 
     def __init__(self, file_manager):
         super().__init__()
@@ -21,67 +29,56 @@ class TodayTODOView(QWidget):
         layout = QVBoxLayout()
         
         todo_label = QLabel("今日待办事项")
-        todo_label.setFont(QFont("Arial", 20, QFont.Weight.Bold))
-        todo_label.setStyleSheet("color: #5D3FD3; padding: 10px;")
+        todo_label.setFont(current_theme().font("title"))
+        set_style_role(todo_label, role="title")
         todo_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
-        self.todo_list = QListWidget()
-        self.todo_list.setStyleSheet("""
-            QListWidget {
-                border: 1px solid #E0E0E0;
-                border-radius: 6px;
-                padding: 5px;
-            }
-            QListWidget::item {
-                padding: 8px;
-                border-bottom: 1px solid #EEEEEE;
-            }
-            QListWidget::item:selected {
-                background-color: #EDE7F6;
-            }
-        """)
-        self.todo_list.itemDoubleClicked.connect(self.toggle_task_completion)
+        self.todo_model = TaskListModel(self)
+        self.todo_list = QListView()
+        self.todo_list.setModel(self.todo_model)
+        self.todo_list.setItemDelegate(TaskItemDelegate(font_size=18, status_size=26,
+                                                        min_height=50, parent=self.todo_list))
+        self.todo_list.setUniformItemSizes(True)
+        set_style_role(self.todo_list, role="itemList")
+        self.enable_multi_selection()
+        self.todo_list.doubleClicked.connect(self.toggle_task_completion)
         self.todo_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.todo_list.customContextMenuRequested.connect(self.show_todo_context_menu)
         # 添加新任务区域
         add_task_layout = QHBoxLayout()
         self.new_task_input = QLineEdit()
-        self.new_task_input.setPlaceholderText("添加新任务...")
-        self.new_task_input.setStyleSheet("padding: 10px; font-size: 16px; border-radius: 6px;")
+        self.new_task_input.setPlaceholderText("添加新任务...  例如 { 工作, due:2026-10-20, remind:09:00}写周报")
+        set_style_role(self.new_task_input, role="taskInput")
         
         # 回车键添加任务
         self.new_task_input.returnPressed.connect(self.add_task)
 
         add_btn = QPushButton("添加")
-        add_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #5D3FD3;
-                color: white;
-                padding: 10px 20px;
-                font-weight: bold;
-                border-radius: 6px;
-                min-width: 80px;
-            }
-        """)
+        set_style_role(add_btn, variant="primary")
         add_btn.clicked.connect(self.add_task)
         
         # 高级添加按钮
         advanced_add_btn = QPushButton("高级添加")
-        advanced_add_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                padding: 10px 20px;
-                font-weight: bold;
-                border-radius: 6px;
-                min-width: 80px;
-            }
-        """)
+        set_style_role(advanced_add_btn, variant="success")
         advanced_add_btn.clicked.connect(self.show_advanced_add_dialog)
         
+        # 顺延未完成任务按钮
+        rollover_btn = QPushButton("顺延未完成")
+        rollover_btn.setToolTip("把最近几天未完成的任务移动或复制到今天")
+        set_style_role(rollover_btn, variant="warning")
+        rollover_btn.clicked.connect(self.show_rollover_dialog)
+        
+        # 循环任务管理按钮
+        recurring_btn = QPushButton("循环任务")
+        recurring_btn.setToolTip("管理每天 / 每周 / 每月重复的任务")
+        set_style_role(recurring_btn, variant="info")
+        recurring_btn.clicked.connect(self.show_recurring_dialog)
+        
         add_task_layout.addWidget(self.new_task_input)
         add_task_layout.addWidget(add_btn)
         add_task_layout.addWidget(advanced_add_btn)
+        add_task_layout.addWidget(rollover_btn)
+        add_task_layout.addWidget(recurring_btn)
         
         layout.addWidget(todo_label)
         layout.addWidget(self.todo_list)
@@ -92,164 +89,53 @@ class TodayTODOView(QWidget):
     
     def refresh(self):
         """刷新今日待办列表"""
-        self.todo_list.clear()
         self.load_today()
 
-    def add_task_to_list(self, task_text, completed=False, priority=None, tags=None):
-        # 创建列表项
-        item = QListWidgetItem()
-        # 创建自定义小部件来显示任务
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(2, 2, 2, 2)
-        layout.setSpacing(4)  # 设置控件间距
-        
-        # 状态图标
-        status_label = QLabel("✓" if completed else "◌")
-        status_label.setFont(QFont("Arial", 26))
-        status_label.setStyleSheet(f"color: {'#757575' if completed else '#5D3FD3'}; min-width: 20px;")
-        layout.addWidget(status_label)
-        
-        # 任务文本
-        task_label = QLabel(task_text if task_text.strip() else "(无标题任务)")
-        # task_label = QLabel(task_text)
-        task_label.setFont(QFont("Arial", 18))
-        task_label.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
-        if completed:
-            task_label.setStyleSheet("color: #757575; text-decoration: line-through;")
-        layout.addWidget(task_label, 1)  # 添加伸缩因子1
-        
-        # 优先级标签
-        if priority:
-            priority_label = QLabel(priority)
-            priority_label.setFont(QFont("Arial", 18,))
-            priority_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            
-            # 根据优先级设置颜色
-            priority = priority.lower()
-            if priority == 'high':
-                bg_color = "#FF6B6B"
-            elif priority == 'medium':
-                bg_color = "#FFD166"
-            elif priority == 'low':
-                bg_color = "#06D6A0"
-            else:
-                bg_color = "#5D3FD3"
-            
-            priority_label.setStyleSheet(f"""
-                background-color: {bg_color};
-                color: {'white' if priority != 'medium' else 'black'};
-                border-radius: 10px;
-                min-width: 50px;
-            """)
-            layout.addWidget(priority_label)
-        
-        # 标签徽章
-        if tags:
-            tags_widget = QWidget()
-            tags_layout = QHBoxLayout(tags_widget)
-            tags_layout.setContentsMargins(0, 0, 0, 0)
-            tags_layout.setSpacing(2)
-            
-            # 标签颜色映射
-            tag_colors = {
-                "工作": "#5D3FD3",
-                "学习": "#06D6A0",
-                "生活": "#FFD166",
-                "重要": "#FF6B6B",
-                "紧急": "#EF476F",
-                "个人": "#118AB2"
-            }
-            
-            for tag in tags:
-                tag_label = QLabel(f"#{tag}")
-                tag_label.setFont(QFont("Arial", 18))
-                tag_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                tag_label.setStyleSheet(f"""
-                    background-color: {tag_colors.get(tag, '#6C757D')};
-                    color: white;
-                    border-radius: 10px;
-                    min-width: 50px;
-                """)
-                tags_layout.addWidget(tag_label)
-            
-            layout.addWidget(tags_widget)
-        
-        # 设置小部件
-        # widget.setLayout(layout)
-        widget.adjustSize()  # 关键：确保计算正确尺寸
-        min_height = max(widget.sizeHint().height(), 50)  # 最小高度40px
-        item.setSizeHint(QSize(widget.sizeHint().width(), min_height))
-        # 添加到列表
-        self.todo_list.addItem(item)
-        self.todo_list.setItemWidget(item, widget)
-        
-        # 存储原始数据
-        item.setData(Qt.ItemDataRole.UserRole, {
+    def add_task_to_list(self, task_text, completed=False, priority=None, tags=None, task_id=None,
+                         recurrence=None, due=None, remind=None):
+        """向待办列表添加一项任务（由委托直接绘制，不创建控件）"""
+        self.todo_model.append_task(self.make_task_data(
+            task_text, completed, priority, tags, task_id, recurrence, due, remind))
+
+    def make_task_data(self, task_text, completed=False, priority=None, tags=None, task_id=None,
+                       recurrence=None, due=None, remind=None):
+        """生成列表模型中保存的任务字典"""
+        return {
+            'id': task_id or new_task_id(),
             'text': task_text,
             'completed': completed,
             'priority': priority,
-            'tags': tags
-        })
+            'tags': tags,
+            'due': due,
+            'remind': remind,
+            'recurrence': recurrence
+        }
 
     def get_tags_and_priority(self, task_text):
         """从任务文本中提取标签和优先级"""
-        tags = []
-        priority = None
-        
-        # 查找标签部分
-        if '{' in task_text and '}' in task_text:
-            # print(f"Found tags in task: {task_text}")
-            tag_start = task_text.find('{')
-            tag_end = task_text.find('}', tag_start)
-            if tag_end != -1:
-                tag_content = task_text[tag_start+1:tag_end]
-                task_text = task_text[tag_end+1:].strip()
-                
-                # 解析标签和优先级
-                parts = [p.strip() for p in tag_content.split(',')]
-                for part in parts:
-                    if ':' in part:
-                        key, value = map(str.strip, part.split(':', 1))
-                        if key.lower() == 'priority':
-                            priority = value
-                    else:
-                        tags.append(part)
-        return task_text, tags, priority
+        return parse_tags_and_priority(task_text)
+
+    def get_task_fields(self, task_text):
+        """从任务文本中提取标签、优先级、截止日期和提醒时间"""
+        return parse_task_fields(task_text)
     
     def load_today(self):
         today = QDate.currentDate()
         self.today = today
-        self.todo_list.clear() 
-        # 加载今天的日记
-        diary_content = self.file_manager.load_diary(today)
-        
-        # 提取TODO部分
-        in_todo = False
-        for line in diary_content.splitlines():
-            if line.startswith("## TODO"):
-                in_todo = True
-                continue
-            elif line.startswith("## ") and in_todo:
-                break
-            
-            if in_todo and line.strip() and line.startswith('- '):
-                # 改进的任务解析逻辑
-                if line.startswith('- [x]') or line.startswith('- [X]'):
-                    # 已完成任务
-                    task_text = line[5:].strip()  # 移除 "- [x]"
-                    completed = True
-                elif line.startswith('- [ ]'):
-                    # 未完成任务
-                    task_text = line[5:].strip()  # 移除 "- [ ]"
-                    completed = False
-                else:
-                    # 处理不规范的格式
-                    task_text = line.lstrip('- []').strip()
-                    # 检查是否包含完成标记
-                    completed = '[x]' in line or '[X]' in line
-                task_text, tags, priority = self.get_tags_and_priority(task_text)
-                self.add_task_to_list(task_text, completed, priority, tags)
+        # 加载今天的日记（任务已解析并带有稳定 ID）
+        document = self.file_manager.load_diary_document(today)
+        # 今天出现的循环任务（调度器已预先展开，直接按日期查表）
+        scheduler = self.file_manager.get_recurrence_scheduler()
+        tasks = document['todos'] + scheduler.tasks_for(today.toString('yyyy-MM-dd'))
+
+        # 一次性放入模型，只触发一次重置
+        self.todo_model.set_tasks([
+            self.make_task_data(task['text'], task['completed'], task['priority'],
+                                list(task['tags']), task_id=task['id'],
+                                recurrence=task.get('recurrence'),
+                                due=task.get('due'), remind=task.get('remind'))
+            for task in tasks
+        ])
                 
     def add_task(self):
         task_text = self.new_task_input.text().strip()
@@ -257,11 +143,53 @@ class TodayTODOView(QWidget):
             return
         # 清空输入框
         self.new_task_input.clear()
-        task_text, tags, priority = self.get_tags_and_priority(task_text)
-        self.add_task_to_list(task_text, completed=False, priority=priority, tags=tags)
+        fields = self.get_task_fields(task_text)
+        self.add_task_to_list(fields['text'], completed=False, priority=fields['priority'],
+                              tags=fields['tags'], due=fields['due'], remind=fields['remind'])
         # 更新日记文件
         self.update_diary_tasks()
     
+    def show_rollover_dialog(self):
+        """把最近 N 天的未完成任务顺延到今天"""
+        days, ok = QInputDialog.getInt(
+            self, "顺延未完成任务", "顺延最近几天的未完成任务:", 1, 1, 3650)
+        if not ok:
+            return
+
+        modes = ["移动到今天", "复制到今天"]
+        mode_text, ok = QInputDialog.getItem(
+            self, "顺延方式", "请选择顺延方式:", modes, 0, False)
+        if not ok:
+            return
+        mode = "move" if mode_text == modes[0] else "copy"
+
+        today = QDate.currentDate()
+        count = rollover_tasks(self.file_manager, today.addDays(-days), today.addDays(-1),
+                               today, mode)
+        if count < 0:
+            QMessageBox.critical(self, "错误", "顺延任务失败，日记未被修改")
+            return
+        if count == 0:
+            QMessageBox.information(self, "提示", "没有需要顺延的未完成任务")
+            return
+
+        self.load_today()
+        self.diary_saved.emit(QDateTime.currentDateTime())
+        QMessageBox.information(self, "完成", f"已{mode_text} {count} 项任务")
+
+    def show_recurring_dialog(self):
+        """显示循环任务管理对话框"""
+        dialog = RecurringTaskDialog(self.file_manager.get_recurrence_scheduler(),
+                                     self.file_manager.get_todo_tags(), self)
+        dialog.exec()
+        self.load_today()
+
+    def save_recurring_state(self, task_data):
+        """保存循环任务在今天的完成状态（不写日记文件）"""
+        scheduler = self.file_manager.get_recurrence_scheduler()
+        scheduler.set_state(self.today.toString('yyyy-MM-dd'), task_data['recurrence'],
+                            STATE_DONE if task_data['completed'] else None)
+
     def show_advanced_add_dialog(self):
         """显示高级添加任务对话框"""
         dialog = QDialog(self)
@@ -274,7 +202,7 @@ class TodayTODOView(QWidget):
         
         # 任务内容
         task_label = QLabel("任务内容:")
-        task_label.setStyleSheet("font-weight: bold;")
+        set_style_role(task_label, role="formLabel")
         self.task_input = QLineEdit()
         self.task_input.setPlaceholderText("输入任务内容")
         
@@ -287,22 +215,15 @@ class TodayTODOView(QWidget):
         
         # 优先级选择
         priority_label = QLabel("优先级:")
-        priority_label.setStyleSheet("font-weight: bold;")
+        set_style_role(priority_label, role="formLabel")
         self.priority_combo = QPushButton("选择优先级")
-        self.priority_combo.setStyleSheet("""
-            QPushButton {
-                text-align: left;
-                padding: 8px;
-                border: 1px solid #E0E0E0;
-                border-radius: 4px;
-            }
-        """)
+        set_style_role(self.priority_combo, role="picker")
         self.selected_priority = None
         self.priority_combo.clicked.connect(self.show_priority_menu)
         
         # 标签选择区域
         tags_label = QLabel("选择标签 (点击添加):")
-        tags_label.setStyleSheet("font-weight: bold; margin-top: 10px;")
+        set_style_role(tags_label, role="formLabel")
         
         # 标签按钮滚动区域
         tags_scroll = QScrollArea()
@@ -337,27 +258,10 @@ class TodayTODOView(QWidget):
         
         self.new_todo_tag_input = QLineEdit()
         self.new_todo_tag_input.setPlaceholderText("添加新标签...")
-        self.new_todo_tag_input.setStyleSheet("""
-            QLineEdit {
-                padding: 6px 10px;
-                border: 1px solid #E0E0E0;
-                border-radius: 4px;
-            }
-        """)
+        set_style_role(self.new_todo_tag_input, role="search")
         
         add_tag_btn = QPushButton("添加到标签库")
-        add_tag_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                padding: 6px 12px;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-        """)
+        set_style_role(add_tag_btn, variant="success")
         add_tag_btn.clicked.connect(self.add_new_todo_tag_to_library)
         
         new_tag_layout.addWidget(QLabel("新标签:"))
@@ -369,30 +273,11 @@ class TodayTODOView(QWidget):
         btn_layout.setContentsMargins(0, 15, 0, 0)
         
         create_btn = QPushButton("创建任务")
-        create_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #5D3FD3;
-                color: white;
-                padding: 8px 16px;
-                font-weight: bold;
-                border-radius: 6px;
-            }
-            QPushButton:hover {
-                background-color: #4A2FB8;
-            }
-        """)
+        set_style_role(create_btn, variant="primary")
         create_btn.clicked.connect(lambda: self.do_create_task(dialog))
         
         cancel_btn = QPushButton("取消")
-        cancel_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #EEEEEE;
-                color: #424242;
-                padding: 8px 16px;
-                font-weight: bold;
-                border-radius: 6px;
-            }
-        """)
+        set_style_role(cancel_btn, variant="secondary")
         cancel_btn.clicked.connect(dialog.reject)
         
         btn_layout.addStretch()
@@ -445,23 +330,7 @@ class TodayTODOView(QWidget):
         for tag in tags:
             tag_btn = QPushButton(f"#{tag}")
             tag_btn.setCheckable(True)
-            tag_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #E8EAF6;
-                    color: #3F51B5;
-                    border: 1px solid #C5CAE9;
-                    border-radius: 15px;
-                    padding: 5px 12px;
-                    font-size: 12px;
-                }
-                QPushButton:hover {
-                    background-color: #C5CAE9;
-                }
-                QPushButton:checked {
-                    background-color: #3F51B5;
-                    color: white;
-                }
-            """)
+            set_style_role(tag_btn, role="tagChip")
             tag_btn.clicked.connect(lambda checked, t=tag: self.toggle_todo_tag(t, checked))
             self.tags_button_layout.addWidget(tag_btn)
         
@@ -529,92 +398,83 @@ class TodayTODOView(QWidget):
         dialog.accept()
 
     def show_todo_context_menu(self, pos):
-        item = self.todo_list.itemAt(pos)
-        if not item:
+        index = self.todo_list.indexAt(pos)
+        if not index.isValid():
             return
             
         menu = QMenu(self)
+
+        # 多选时显示批量操作
+        rows = self.selected_task_rows()
+        if len(rows) > 1 and index.row() in rows:
+            self.build_bulk_menu(menu, rows)
+            menu.exec(self.todo_list.mapToGlobal(pos))
+            return
         
         # 获取任务数据
-        task_data = item.data(Qt.ItemDataRole.UserRole)
+        task_data = index.data(Qt.ItemDataRole.UserRole)
         completed = task_data['completed']
         
         # 切换完成状态
         status_action = menu.addAction("标记为已完成" if not completed else "标记为未完成")
-        status_action.triggered.connect(lambda: self.toggle_task_completion(item))
+        status_action.triggered.connect(lambda: self.toggle_task_completion(index))
         
         # 编辑任务
         edit_action = menu.addAction("编辑任务")
-        edit_action.triggered.connect(lambda: self.edit_task(item))
+        edit_action.triggered.connect(lambda: self.edit_task(index))
         
         # 编辑标签和优先级
         edit_tags_action = menu.addAction("编辑标签和优先级")
-        edit_tags_action.triggered.connect(lambda: self.edit_task_tags_priority(item))
+        edit_tags_action.triggered.connect(lambda: self.edit_task_tags_priority(index))
         
         menu.addSeparator()
         
-        # 删除任务
-        delete_action = menu.addAction("删除任务")
-        delete_action.triggered.connect(lambda: self.delete_task(item))
+        # 删除任务（循环任务为跳过本次）
+        delete_action = menu.addAction("跳过本次" if task_data.get('recurrence') else "删除任务")
+        delete_action.triggered.connect(lambda: self.delete_task(index))
         
         menu.exec(self.todo_list.mapToGlobal(pos))
 
-    def toggle_task_completion(self, item):
+    def toggle_task_completion(self, index):
         """切换任务完成状态"""
         # 获取当前任务数据
-        task_data = item.data(Qt.ItemDataRole.UserRole)
+        task_data = index.data(Qt.ItemDataRole.UserRole)
         task_data['completed'] = not task_data['completed']
-        item.setData(Qt.ItemDataRole.UserRole, task_data)
-        
-        # 直接更新显示
-        widget = self.todo_list.itemWidget(item)
-        # layout, status, text, priority, tags
-        
-        if widget:
-            # 找到状态标签并更新
-            status_label = widget.children()[1]
-            if status_label:
-                status_label.setText("✓" if task_data['completed'] else "◌")
-                status_label.setStyleSheet(f"color: {'#757575' if task_data['completed'] else '#5D3FD3'};")
-            
-            text_label = widget.children()[2]
-            if text_label:
-                if task_data['completed']:
-                    text_label.setStyleSheet("color: #757575; text-decoration: line-through;")
-                else:
-                    text_label.setStyleSheet("text-decoration: none;")
+        # 只会触发这一行重绘，不重建任何控件
+        self.todo_model.setData(index, task_data, Qt.ItemDataRole.UserRole)
+
+        if task_data.get('recurrence'):
+            self.save_recurring_state(task_data)
+            return
 
         # 更新日记文件
         self.update_diary_tasks()
 
-    def edit_task(self, item):
+    def edit_task(self, index):
         """编辑任务"""
-        task_data = item.data(Qt.ItemDataRole.UserRole)
+        task_data = index.data(Qt.ItemDataRole.UserRole)
         
         # 弹出编辑对话框
         new_text, ok = QInputDialog.getText(self, "编辑任务", "任务内容:", 
                                        text=task_data['text'])
         if not ok or not new_text.strip():
             return
-            # 更新数据
+        # 更新数据
         task_data['text'] = new_text.strip()
-        item.setData(Qt.ItemDataRole.UserRole, task_data)
-        
-        # 直接更新显示，避免重新加载整个列表
-        widget = self.todo_list.itemWidget(item)
-        # layout, status, text, priority, tags
+        self.todo_model.setData(index, task_data, Qt.ItemDataRole.UserRole)
+
+        if task_data.get('recurrence'):
+            # 循环任务修改的是规则本身
+            scheduler = self.file_manager.get_recurrence_scheduler()
+            scheduler.update_rule(task_data['recurrence'], text=task_data['text'])
+            return
 
-        if widget:
-            # 找到任务文本标签
-            text_label = widget.children()[2]
-            if text_label:
-                text_label.setText(new_text.strip())
         # 保存日记
         self.update_diary_tasks()
     
-    def edit_task_tags_priority(self, item):
+    def edit_task_tags_priority(self, index):
         """编辑任务的标签和优先级"""
-        task_data = item.data(Qt.ItemDataRole.UserRole)
+        task_data = index.data(Qt.ItemDataRole.UserRole)
         
         dialog = QDialog(self)
         dialog.setWindowTitle("编辑任务标签和优先级")
@@ -626,21 +486,14 @@ class TodayTODOView(QWidget):
         
         # 任务内容显示（只读）
         task_label = QLabel(f"任务: {task_data['text']}")
-        task_label.setStyleSheet("font-weight: bold; font-size: 14px; color: #333;")
+        set_style_role(task_label, role="heading")
         task_label.setWordWrap(True)
         
         # 优先级选择
         priority_label = QLabel("优先级:")
-        priority_label.setStyleSheet("font-weight: bold;")
+        set_style_role(priority_label, role="formLabel")
         self.edit_priority_combo = QPushButton("选择优先级")
-        self.edit_priority_combo.setStyleSheet("""
-            QPushButton {
-                text-align: left;
-                padding: 8px;
-                border: 1px solid #E0E0E0;
-                border-radius: 4px;
-            }
-        """)
+        set_style_role(self.edit_priority_combo, role="picker")
         self.edit_selected_priority = task_data.get('priority')
         
         # 设置当前优先级显示
@@ -655,7 +508,7 @@ class TodayTODOView(QWidget):
         
         # 标签选择区域
         tags_label = QLabel("选择标签 (点击选择/取消):")
-        tags_label.setStyleSheet("font-weight: bold; margin-top: 10px;")
+        set_style_role(tags_label, role="formLabel")
         
         # 标签按钮滚动区域
         tags_scroll = QScrollArea()
@@ -689,30 +542,11 @@ class TodayTODOView(QWidget):
         btn_layout.setContentsMargins(0, 15, 0, 0)
         
         save_btn = QPushButton("保存")
-        save_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #5D3FD3;
-                color: white;
-                padding: 8px 16px;
-                font-weight: bold;
-                border-radius: 6px;
-            }
-            QPushButton:hover {
-                background-color: #4A2FB8;
-            }
-        """)
-        save_btn.clicked.connect(lambda: self.save_task_edit(dialog, item))
+        set_style_role(save_btn, variant="primary")
+        save_btn.clicked.connect(lambda: self.save_task_edit(dialog, index))
         
         cancel_btn = QPushButton("取消")
-        cancel_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #EEEEEE;
-                color: #424242;
-                padding: 8px 16px;
-                font-weight: bold;
-                border-radius: 6px;
-            }
-        """)
+        set_style_role(cancel_btn, variant="secondary")
         cancel_btn.clicked.connect(dialog.reject)
         
         btn_layout.addStretch()
@@ -764,23 +598,7 @@ class TodayTODOView(QWidget):
             tag_btn = QPushButton(f"#{tag}")
             tag_btn.setCheckable(True)
             tag_btn.setChecked(tag in self.edit_selected_tags)
-            tag_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #E8EAF6;
-                    color: #3F51B5;
-                    border: 1px solid #C5CAE9;
-                    border-radius: 15px;
-                    padding: 5px 12px;
-                    font-size: 12px;
-                }
-                QPushButton:hover {
-                    background-color: #C5CAE9;
-                }
-                QPushButton:checked {
-                    background-color: #3F51B5;
-                    color: white;
-                }
-            """)
+            set_style_role(tag_btn, role="tagChip")
             tag_btn.clicked.connect(lambda checked, t=tag: self.toggle_edit_todo_tag(t, checked))
             self.edit_tags_button_layout.addWidget(tag_btn)
         
@@ -794,145 +612,61 @@ class TodayTODOView(QWidget):
         else:
             self.edit_selected_tags.discard(tag)
     
-    def save_task_edit(self, dialog, item):
+    def save_task_edit(self, dialog, index):
         """保存任务编辑"""
-        task_data = item.data(Qt.ItemDataRole.UserRole)
+        task_data = index.data(Qt.ItemDataRole.UserRole)
         
-        # 更新数据
+        # 更新数据（委托会自动重绘这一行）
         task_data['priority'] = self.edit_selected_priority
         task_data['tags'] = list(self.edit_selected_tags) if self.edit_selected_tags else None
         
-        item.setData(Qt.ItemDataRole.UserRole, task_data)
-        
-        # 重新创建显示组件
-        self.refresh_task_display(item)
+        self.todo_model.setData(index, task_data, Qt.ItemDataRole.UserRole)
         
-        # 保存到日记
-        self.update_diary_tasks()
+        if task_data.get('recurrence'):
+            scheduler = self.file_manager.get_recurrence_scheduler()
+            scheduler.update_rule(task_data['recurrence'], priority=task_data['priority'],
+                                  tags=task_data['tags'] or [])
+        else:
+            # 保存到日记
+            self.update_diary_tasks()
         
         dialog.accept()
     
-    def refresh_task_display(self, item):
-        """刷新单个任务的显示"""
-        task_data = item.data(Qt.ItemDataRole.UserRole)
-        
-        # 重新创建任务显示组件
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(2, 2, 2, 2)
-        layout.setSpacing(4)
-        
-        # 状态图标
-        status_label = QLabel("✓" if task_data['completed'] else "◌")
-        status_label.setFont(QFont("Arial", 26))
-        status_label.setStyleSheet(f"color: {'#757575' if task_data['completed'] else '#5D3FD3'}; min-width: 20px;")
-        layout.addWidget(status_label)
-        
-        # 任务文本
-        task_label = QLabel(task_data['text'] if task_data['text'].strip() else "(无标题任务)")
-        task_label.setFont(QFont("Arial", 18))
-        task_label.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
-        if task_data['completed']:
-            task_label.setStyleSheet("color: #757575; text-decoration: line-through;")
-        layout.addWidget(task_label, 1)
-        
-        # 优先级标签
-        if task_data.get('priority'):
-            priority = task_data['priority']
-            priority_label = QLabel(priority)
-            priority_label.setFont(QFont("Arial", 18))
-            priority_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            
-            # 根据优先级设置颜色
-            priority_lower = priority.lower()
-            if priority_lower == 'high':
-                bg_color = "#FF6B6B"
-            elif priority_lower == 'medium':
-                bg_color = "#FFD166"
-            elif priority_lower == 'low':
-                bg_color = "#06D6A0"
-            else:
-                bg_color = "#5D3FD3"
-            
-            priority_label.setStyleSheet(f"""
-                background-color: {bg_color};
-                color: {'white' if priority_lower != 'medium' else 'black'};
-                border-radius: 10px;
-                min-width: 50px;
-            """)
-            layout.addWidget(priority_label)
-        
-        # 标签徽章
-        if task_data.get('tags'):
-            tags_widget = QWidget()
-            tags_layout = QHBoxLayout(tags_widget)
-            tags_layout.setContentsMargins(0, 0, 0, 0)
-            tags_layout.setSpacing(2)
-            
-            # 标签颜色映射
-            tag_colors = {
-                "工作": "#5D3FD3",
-                "学习": "#06D6A0",
-                "生活": "#FFD166",
-                "重要": "#FF6B6B",
-                "紧急": "#EF476F",
-                "个人": "#118AB2"
-            }
-            
-            for tag in task_data['tags']:
-                tag_label = QLabel(f"#{tag}")
-                tag_label.setFont(QFont("Arial", 18))
-                tag_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                tag_label.setStyleSheet(f"""
-                    background-color: {tag_colors.get(tag, '#6C757D')};
-                    color: white;
-                    border-radius: 10px;
-                    min-width: 50px;
-                """)
-                tags_layout.addWidget(tag_label)
-            
-            layout.addWidget(tags_widget)
-        
-        # 设置小部件
-        widget.adjustSize()
-        min_height = max(widget.sizeHint().height(), 50)
-        item.setSizeHint(QSize(widget.sizeHint().width(), min_height))
-        
-        # 更新列表项
-        self.todo_list.setItemWidget(item, widget)
-            
-    def delete_task(self, item):
-        row = self.todo_list.row(item)
-        self.todo_list.takeItem(row)  # 这会删除项
-        
+    def delete_task(self, index):
+        task_data = index.data(Qt.ItemDataRole.UserRole)
+        self.todo_model.remove_row(index.row())
+        
+        if task_data.get('recurrence'):
+            # 循环任务只跳过今天这一次
+            scheduler = self.file_manager.get_recurrence_scheduler()
+            scheduler.set_state(self.today.toString('yyyy-MM-dd'), task_data['recurrence'],
+                                STATE_SKIPPED)
+            return
+
         # 不需要重新加载列表
         self.update_diary_tasks()
 
+    # ==================== 批量操作接口 ====================
+    def task_date(self):
+        return self.today
+
+    def persist_tasks(self):
+        self.update_diary_tasks()
+
+    def notify_saved(self):
+        self.diary_saved.emit(QDateTime.currentDateTime())
+
     def update_diary_tasks(self):
         diary_content = self.file_manager.load_diary(self.today)
         if self.today != QDate.currentDate():
             QMessageBox(text="警告: 更新的日期不是今天，可能导致数据不一致！")
         # 重建TODO部分
         new_todo = "## TODO\n"
-        for i in range(self.todo_list.count()):
-            item = self.todo_list.item(i)
-            data = item.data(Qt.ItemDataRole.UserRole)
-            # 根据完成状态添加不同标记
-            mark = "[x]" if data['completed'] else "[ ]"
-            
-            # 重建标签/优先级部分
-            tag_parts = []
-            if data.get('priority'):
-                tag_parts.append(f"priority:{data['priority']}")
-            if data.get('tags'):
-                tag_parts.extend(data['tags'])
-            
-            # 构建行
-            line = f"- {mark} "
-            if tag_parts:
-                line += "{" + f" {', '.join(tag_parts)}" + "}"
-            line += data['text']
-            new_todo += line + "\n"
+        for data in self.todo_model.tasks():
+            if data.get('recurrence'):
+                # 循环任务由调度器保存，不写入日记
+                continue
+            new_todo += format_task_line(data) + "\n"
         # 更新日记内容
         if "## TODO" in diary_content:
             # 替换现有的TODO部分
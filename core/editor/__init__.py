@@ -1,2 +1,4 @@
 from .diaryEditor import DiaryEditor
-from .noteEditor import NoteEditor
\ No newline at end of file
+from .noteEditor import NoteEditor
+from .taskItemDelegate import TaskListModel, TaskItemDelegate
+from .taskBulkActions import TaskBulkActions
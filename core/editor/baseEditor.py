@@ -2,6 +2,7 @@ import os
 from PyQt6.QtWidgets import QWidget, QDialog, QVBoxLayout, QPushButton, QHBoxLayout
 from PyQt6.QtCore import pyqtSignal
 from .textEditWithContextMenu import TextEditWithContextMenu
+from core.style import set_style_role
 
 
 class BaseEditor(QWidget):
@@ -47,27 +48,11 @@ class BaseEditorDialog(QDialog):
         btn_layout = QHBoxLayout()
         
         cancel_btn = QPushButton("取消")
-        cancel_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #EEEEEE;
-                color: #424242;
-                padding: 8px 16px;
-                font-weight: bold;
-                border-radius: 6px;
-            }
-        """)
+        set_style_role(cancel_btn, variant="secondary")
         cancel_btn.clicked.connect(self.reject)
         
         save_btn = QPushButton("保存")
-        save_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #5D3FD3;
-                color: white;
-                padding: 8px 16px;
-                font-weight: bold;
-                border-radius: 6px;
-            }
-        """)
+        set_style_role(save_btn, variant="primary")
         save_btn.clicked.connect(self._on_save)
         
         btn_layout.addStretch()
@@ -1,14 +1,19 @@
 import os
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QListWidget, QListWidgetItem,
-    QMessageBox, QInputDialog, QLabel, QMenu, QSizePolicy
+    QVBoxLayout, QHBoxLayout,
+    QPushButton, QListWidget, QListWidgetItem, QListView,
+    QMessageBox, QInputDialog, QLabel, QMenu
 )
-from PyQt6.QtCore import Qt, QDate, pyqtSignal, QSize, QDateTime, QTime
-from PyQt6.QtGui import QFont, QAction, QTextCursor
+from PyQt6.QtCore import Qt, QDate, pyqtSignal, QDateTime, QTime
+from PyQt6.QtGui import QAction, QTextCursor
 from .baseEditor import BaseEditor
+from .taskItemDelegate import TaskListModel, TaskItemDelegate
+from .taskBulkActions import TaskBulkActions
+from core.server.diaryParser import format_task_line
+from core.server.recurrence import STATE_DONE, STATE_SKIPPED
+from core.style import set_style_role, current_theme
 
-class DiaryEditor(BaseEditor):
+class DiaryEditor(BaseEditor, TaskBulkActions):
     diary_saved = pyqtSignal(QDateTime) 
     open_note_signal = pyqtSignal(str)  # 新增信号用于打开笔记
     def __init__(self, file_manager, text_processor):
@@ -23,22 +28,15 @@ class DiaryEditor(BaseEditor):
         # TODO部分
         todo_layout = QVBoxLayout()
         todo_label = QLabel("今日待办")
-        todo_label.setFont(QFont("Arial", 14, QFont.Weight.Bold))
-        self.todo_list = QListWidget()
-        self.todo_list.setStyleSheet("""
-            QListWidget {
-                border: 1px solid #E0E0E0;
-                border-radius: 6px;
-                padding: 5px;
-            }
-            QListWidget::item {
-                padding: 8px;
-                border-bottom: 1px solid #EEEEEE;
-            }
-            QListWidget::item:selected {
-                background-color: #EDE7F6;
-            }
-        """)
+        todo_label.setFont(current_theme().font("heading"))
+        self.todo_model = TaskListModel(self)
+        self.todo_list = QListView()
+        self.todo_list.setModel(self.todo_model)
+        self.todo_list.setItemDelegate(TaskItemDelegate(font_size=12, status_size=22,
+                                                        min_height=40, parent=self.todo_list))
+        self.todo_list.setUniformItemSizes(True)
+        set_style_role(self.todo_list, role="itemList")
+        self.enable_multi_selection()
         self.todo_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.todo_list.customContextMenuRequested.connect(self.show_todo_context_menu)
 
@@ -48,11 +46,11 @@ class DiaryEditor(BaseEditor):
         # 笔记部分
         note_layout = QVBoxLayout()
         note_label = QLabel("当日笔记")
-        note_label.setFont(QFont("Arial", 14, QFont.Weight.Bold))
+        note_label.setFont(current_theme().font("heading"))
         
         self.note_list = QListWidget()
         self.note_list.itemClicked.connect(self.open_note)
-        self.note_list.setStyleSheet(self.todo_list.styleSheet())
+        set_style_role(self.note_list, role="itemList")
         
         note_layout.addWidget(note_label)
         note_layout.addWidget(self.note_list)
@@ -60,21 +58,12 @@ class DiaryEditor(BaseEditor):
         # 总结部分
         summary_layout = QVBoxLayout()
         summary_label = QLabel("每日总结")
-        summary_label.setFont(QFont("Arial", 14, QFont.Weight.Bold))
+        summary_label.setFont(current_theme().font("heading"))
         
         self.summary_edit = self.create_text_editor()
         
         save_btn = QPushButton("保存日记")
-        save_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #5D3FD3;
-                color: white;
-                padding: 10px;
-                border-radius: 6px;
-                font-weight: bold;
-                margin-top: 10px;
-            }
-        """)
+        set_style_role(save_btn, variant="primary")
         save_btn.clicked.connect(self.save_diary)
         
         summary_layout.addWidget(summary_label)
@@ -92,274 +81,125 @@ class DiaryEditor(BaseEditor):
     def load_date(self, date):
         self.current_date = date
         
-        # 加载日记内容
-        content = self.file_manager.load_diary(date)
-        # print(content)
-        # 解析内容
-        self.todo_list.clear()
+        # 加载日记内容（优先使用后台预读的解析结果）
+        document = self.file_manager.load_diary_document(date)
         self.note_list.clear()
         self.summary_edit.clear()
-        
-        in_todo = False
-        in_notes = False
-        in_summary = False
-        
-        for line in content.splitlines():
-            if line.startswith("## TODO"):
-                in_todo = True
-                in_notes = False
-                in_summary = False
-                continue
-            elif line.startswith("## Notes"):
-                in_todo = False
-                in_notes = True
-                in_summary = False
-                continue
-            elif line.startswith("## Summary"):
-                in_todo = False
-                in_notes = False
-                in_summary = True
-                continue
-                
-            if in_todo and line.strip():
-                # 提取任务文本（去掉Markdown标记）
-                # print(f"Processing line: {line}")
-                if line.startswith('- [x]') or line.startswith('- [X]'):
-                # 已完成任务
-                    task_text = line[5:].strip()  # 移除 "- [x]"
-                    completed = True
-                elif line.startswith('- [ ]'):
-                # 未完成任务
-                    task_text = line[5:].strip()  # 移除 "- [ ]"
-                    completed = False
-                else:
-                    # 处理不规范的格式
-                    task_text = line.lstrip('- []').strip()
-                    completed = '[x]' in line or '[X]' in line
-                # 尝试从任务文本中提取标签和优先级
-                tags = []
-                priority = None
-                
-                # 查找标签部分
-                if '{' in task_text and '}' in task_text:
-                    # print(f"Found tags in task: {task_text}")
-                    tag_start = task_text.find('{')
-                    tag_end = task_text.find('}', tag_start)
-                    if tag_end != -1:
-                        tag_content = task_text[tag_start+1:tag_end]
-                        task_text = task_text[tag_end+1:].strip()
-                        
-                        # 解析标签和优先级
-                        parts = [p.strip() for p in tag_content.split(',')]
-                        for part in parts:
-                            if ':' in part:
-                                key, value = map(str.strip, part.split(':', 1))
-                                if key.lower() == 'priority':
-                                    priority = value
-                            else:
-                                tags.append(part)
-                
-                # 创建列表项
-                item = QListWidgetItem()
-                
-                # 创建自定义小部件来显示任务
-                widget = QWidget()
-                layout = QHBoxLayout(widget)
-                layout.setContentsMargins(2, 2, 2, 2)
-                layout.setSpacing(2)  # 设置控件间距
-                
-                # 状态图标
-                status_label = QLabel("✓" if completed else "◌")
-                status_label.setFont(QFont("Arial", 22))
-                status_label.setStyleSheet(f"color: {'#757575' if completed else '#5D3FD3'}; min-width: 20px;")
-                layout.addWidget(status_label)
-                
-                # 任务文本
-                task_label = QLabel(task_text if task_text.strip() else "(无标题任务)")
-                # task_label = QLabel(task_text)
-                task_label.setFont(QFont("Arial", 12))
-                task_label.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
-                if completed:
-                    task_label.setStyleSheet("color: #757575; text-decoration: line-through;")
-                layout.addWidget(task_label, 1)  # 添加伸缩因子1
-                
-                # 优先级标签
-                if priority:
-                    priority_label = QLabel(priority)
-                    priority_label.setFont(QFont("Arial", 12))
-                    priority_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                    
-                    # 根据优先级设置颜色
-                    priority = priority.lower()
-                    if priority == 'high':
-                        bg_color = "#FF6B6B"
-                    elif priority == 'medium':
-                        bg_color = "#FFD166"
-                    elif priority == 'low':
-                        bg_color = "#06D6A0"
-                    else:
-                        bg_color = "#5D3FD3"
-                    
-                    priority_label.setStyleSheet(f"""
-                        background-color: {bg_color};
-                        color: {'white' if priority != 'medium' else 'black'};
-                        border-radius: 10px;
-                        min-width: 40px;
-                    """)
-                    layout.addWidget(priority_label)
-                
-                # 标签徽章
-                if tags:
-                    tags_widget = QWidget()
-                    tags_layout = QHBoxLayout(tags_widget)
-                    tags_layout.setContentsMargins(0, 0, 0, 0)
-                    tags_layout.setSpacing(2)
-                    
-                    # 标签颜色映射
-                    tag_colors = {
-                        "工作": "#5D3FD3",
-                        "学习": "#06D6A0",
-                        "生活": "#FFD166",
-                        "重要": "#FF6B6B",
-                        "紧急": "#EF476F",
-                        "个人": "#118AB2"
-                    }
-                    
-                    for tag in tags:
-                        tag_label = QLabel(f"#{tag}")
-                        tag_label.setFont(QFont("Arial", 12))
-                        tag_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                        tag_label.setStyleSheet(f"""
-                            background-color: {tag_colors.get(tag, '#6C757D')};
-                            color: white;
-                            border-radius: 10px;
-                            min-width: 40px;
-                        """)
-                        tags_layout.addWidget(tag_label)
-                    
-                    layout.addWidget(tags_widget)
-                
-                # 设置小部件
-                # widget.setLayout(layout)
-                widget.adjustSize()  # 关键：确保计算正确尺寸
-                min_height = max(widget.sizeHint().height(), 40)  # 最小高度40px
-                item.setSizeHint(QSize(widget.sizeHint().width(), min_height))
-                # item.setSizeHint(widget.sizeHint())
 
-                # 添加到列表
-                self.todo_list.addItem(item)
-                self.todo_list.setItemWidget(item, widget)
-                
-                # 存储原始数据
-                item.setData(Qt.ItemDataRole.UserRole, {
-                    'text': task_text,
-                    'completed': completed,
-                    'priority': priority,
-                    'tags': tags
-                })
-                
-            elif in_notes and line.strip():
-                # 解析笔记条目
-                today = self.current_date.toString("yyyyMMdd")
-                if line.startswith('- ['):
-                    start = line.find('[')
-                    end = line.find(']', start)
-                    if end != -1:
-                        time_str = line[start+1:end]
-                        note_title_start = line.find('[[')
-                        note_title_end = line.find(']]', note_title_start)
-                        if note_title_end != -1:
-                            note_title = line[note_title_start+2:note_title_end]
-                            note_text = line[note_title_end+3:].strip()
-                            filename = today + "_" + note_title + ".md"
-                            item = QListWidgetItem(f"{time_str} - {note_title}")
-                            item.setData(Qt.ItemDataRole.UserRole, filename)
-                            self.note_list.addItem(item)
-            elif in_summary:
-                self.summary_edit.append(line)
+        # 当天的任务和循环任务一次性放入模型，只触发一次重置
+        scheduler = self.file_manager.get_recurrence_scheduler()
+        tasks = document['todos'] + scheduler.tasks_for(date.toString('yyyy-MM-dd'))
+        self.todo_model.set_tasks([self.make_task_data(task) for task in tasks])
+
+        today = self.current_date.toString("yyyyMMdd")
+        for time_str, note_title in document['notes']:
+            filename = today + "_" + note_title + ".md"
+            item = QListWidgetItem(f"{time_str} - {note_title}")
+            item.setData(Qt.ItemDataRole.UserRole, filename)
+            self.note_list.addItem(item)
+
+        for line in document['summary']:
+            self.summary_edit.append(line)
         
         # 将光标移到开始位置
         self.summary_edit.moveCursor(QTextCursor.MoveOperation.Start)
 
+    def make_task_data(self, task):
+        """把解析得到的任务转换为列表模型中保存的任务字典"""
+        return {
+            'id': task['id'],
+            'text': task['text'],
+            'completed': task['completed'],
+            'priority': task['priority'],
+            'tags': list(task['tags']),
+            'due': task.get('due'),
+            'remind': task.get('remind'),
+            'recurrence': task.get('recurrence')
+        }
+
+    def add_task_to_list(self, task):
+        """向待办列表添加一项任务（由委托直接绘制，不创建控件）"""
+        self.todo_model.append_task(self.make_task_data(task))
+
     def show_todo_context_menu(self, pos):
-        item = self.todo_list.itemAt(pos)
-        if not item:
+        index = self.todo_list.indexAt(pos)
+        if not index.isValid():
             return
             
         menu = QMenu(self)
+
+        # 多选时显示批量操作
+        rows = self.selected_task_rows()
+        if len(rows) > 1 and index.row() in rows:
+            self.build_bulk_menu(menu, rows)
+            menu.exec(self.todo_list.mapToGlobal(pos))
+            return
         
         # 获取任务数据
-        task_data = item.data(Qt.ItemDataRole.UserRole)
+        task_data = index.data(Qt.ItemDataRole.UserRole)
         completed = task_data['completed']
         
         # 切换完成状态
         status_action = menu.addAction("标记为已完成" if not completed else "标记为未完成")
-        status_action.triggered.connect(lambda: self.toggle_task_completion(item))
+        status_action.triggered.connect(lambda: self.toggle_task_completion(index))
         
         # 编辑任务
         edit_action = menu.addAction("编辑任务")
-        edit_action.triggered.connect(lambda: self.edit_task(item))
+        edit_action.triggered.connect(lambda: self.edit_task(index))
         
-        # 删除任务
-        delete_action = menu.addAction("删除任务")
-        delete_action.triggered.connect(lambda: self.delete_task(item))
+        # 删除任务（循环任务为跳过本次）
+        delete_action = menu.addAction("跳过本次" if task_data.get('recurrence') else "删除任务")
+        delete_action.triggered.connect(lambda: self.delete_task(index))
         
         menu.exec(self.todo_list.mapToGlobal(pos))
     
-    def toggle_task_completion(self, item):
-        task_data = item.data(Qt.ItemDataRole.UserRole)
+    def toggle_task_completion(self, index):
+        task_data = index.data(Qt.ItemDataRole.UserRole)
         task_data['completed'] = not task_data['completed']
-        item.setData(Qt.ItemDataRole.UserRole, task_data)
-        
-        # 不要重新加载整个列表
-        # 直接更新显示
-        widget = self.todo_list.itemWidget(item)
-        # layout, status, text, priority, tags
-        
-        if widget:
-            # 找到状态标签并更新
-            status_label = widget.children()[1]
-            if status_label:
-                status_label.setText("✓" if task_data['completed'] else "◌")
-                status_label.setStyleSheet(f"color: {'#757575' if task_data['completed'] else '#5D3FD3'};")
-            
-            text_label = widget.children()[2]
-            if text_label:
-                if task_data['completed']:
-                    text_label.setStyleSheet("color: #757575; text-decoration: line-through;")
-                else:
-                    text_label.setStyleSheet("text-decoration: none;")
+        # 只会触发这一行重绘，不重建任何控件
+        self.todo_model.setData(index, task_data, Qt.ItemDataRole.UserRole)
+
+        # 循环任务只记录本次出现的状态，不写入日记
+        if task_data.get('recurrence'):
+            self.file_manager.get_recurrence_scheduler().set_state(
+                self.current_date.toString('yyyy-MM-dd'), task_data['recurrence'],
+                STATE_DONE if task_data['completed'] else None
+            )
+            return
         
         self.save_diary()
     
-    def edit_task(self, item):
+    def edit_task(self, index):
         """编辑任务"""
-        task_data = item.data(Qt.ItemDataRole.UserRole)
+        task_data = index.data(Qt.ItemDataRole.UserRole)
         
         # 弹出编辑对话框
         new_text, ok = QInputDialog.getText(self, "编辑任务", "任务内容:", 
                                        text=task_data['text'])
         if not ok or not new_text.strip():
             return
-            # 更新数据
+        # 更新数据
         task_data['text'] = new_text.strip()
-        item.setData(Qt.ItemDataRole.UserRole, task_data)
-        
-        # 直接更新显示，避免重新加载整个列表
-        widget = self.todo_list.itemWidget(item)
-        # layout, status, text, priority, tags
+        self.todo_model.setData(index, task_data, Qt.ItemDataRole.UserRole)
 
-        if widget:
-            # 找到任务文本标签
-            text_label = widget.children()[2]
-            if text_label:
-                text_label.setText(new_text.strip())
+        # 循环任务修改的是规则本身
+        recurrence = task_data.get('recurrence')
+        if recurrence:
+            self.file_manager.get_recurrence_scheduler().update_rule(recurrence, text=new_text.strip())
+            return
         # 保存日记
         self.save_diary()
             
-    def delete_task(self, item):
-        row = self.todo_list.row(item)
-        self.todo_list.takeItem(row)  # 这会删除项
+    def delete_task(self, index):
+        task_data = index.data(Qt.ItemDataRole.UserRole)
+        self.todo_model.remove_row(index.row())
+
+        # 循环任务只跳过本次出现
+        if task_data.get('recurrence'):
+            self.file_manager.get_recurrence_scheduler().set_state(
+                self.current_date.toString('yyyy-MM-dd'), task_data['recurrence'], STATE_SKIPPED
+            )
+            return
         
         # 不需要重新加载列表
         self.save_diary()
@@ -419,28 +259,23 @@ class DiaryEditor(BaseEditor):
         else:
             print(f"未在当前日记中找到笔记: {filename}")
 
+    # ==================== 批量操作接口 ====================
+    def task_date(self):
+        return self.current_date
+
+    def persist_tasks(self):
+        self.save_diary()
+
+    def notify_saved(self):
+        self.diary_saved.emit(QDateTime.currentDateTime())
+
     def save_diary(self):
         # 构建Markdown内容
         content = "## TODO\n"
-        for i in range(self.todo_list.count()):
-            item = self.todo_list.item(i)
-            data = item.data(Qt.ItemDataRole.UserRole)
-            # 根据完成状态添加不同标记
-            mark = "[x]" if data['completed'] else "[ ]"
-            
-            # 重建标签/优先级部分
-            tag_parts = []
-            if data.get('priority'):
-                tag_parts.append(f"priority:{data['priority']}")
-            if data.get('tags'):
-                tag_parts.extend(data['tags'])
-            
-            # 构建行
-            line = f"- {mark} "
-            if tag_parts:
-                line += "{" + f" {', '.join(tag_parts)}" + "}"
-            line += data['text']
-            content += line + "\n"
+        for data in self.todo_model.tasks():
+            if data.get('recurrence'):
+                continue  # 循环任务由调度器管理，不写入日记
+            content += format_task_line(data) + "\n"
         
         content += "\n## Notes\n"
         for i in range(self.note_list.count()):
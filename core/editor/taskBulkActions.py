@@ -0,0 +1,219 @@
+from PyQt6.QtWidgets import (
+    QAbstractItemView, QDialog, QVBoxLayout, QHBoxLayout, QLabel, QDateEdit,
+    QPushButton, QInputDialog, QMessageBox
+)
+from PyQt6.QtCore import Qt
+from core.server.recurrence import STATE_DONE, STATE_SKIPPED
+from core.server.taskRollover import move_tasks
+from core.style import set_style_role
+
+
+class TaskBulkActions:
+    """
+    待办列表的多选批量操作（今日待办和日记编辑器共用）
+    使用方需要提供 todo_list、todo_model、file_manager，并实现：
+        task_date()      当前列表对应的 QDate
+        persist_tasks()  把列表写回日记（只保存一次并发出一次 diary_saved）
+        notify_saved()   不经过 persist_tasks 写入日记后发出 diary_saved
+    每个批量操作最多只写一次日记文件（移动时为来源和目标两个文件的一次批量提交）。
+    """
+
+    def enable_multi_selection(self):
+        self.todo_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+
+    def selected_task_rows(self):
+        """当前选中的行号（升序）"""
+        return sorted(index.row() for index in self.todo_list.selectionModel().selectedRows())
+
+    def build_bulk_menu(self, menu, rows):
+        """在右键菜单中添加批量操作"""
+        count = len(rows)
+        menu.addSection(f"已选中 {count} 项")
+
+        done_action = menu.addAction("全部标记为已完成")
+        done_action.triggered.connect(lambda: self.bulk_set_completed(rows, True))
+        undone_action = menu.addAction("全部标记为未完成")
+        undone_action.triggered.connect(lambda: self.bulk_set_completed(rows, False))
+
+        priority_menu = menu.addMenu("设置优先级")
+        for value, text in [("High", "高优先级"), ("Medium", "中优先级"),
+                            ("Low", "低优先级"), (None, "无优先级")]:
+            action = priority_menu.addAction(text)
+            action.triggered.connect(lambda checked, v=value: self.bulk_set_priority(rows, v))
+
+        add_tag_action = menu.addAction("添加标签...")
+        add_tag_action.triggered.connect(lambda: self.bulk_edit_tag(rows, add=True))
+        remove_tag_action = menu.addAction("移除标签...")
+        remove_tag_action.triggered.connect(lambda: self.bulk_edit_tag(rows, add=False))
+
+        move_action = menu.addAction("移动到日期...")
+        move_action.triggered.connect(lambda: self.bulk_move(rows))
+
+        menu.addSeparator()
+        delete_action = menu.addAction(f"删除 {count} 项")
+        delete_action.triggered.connect(lambda: self.bulk_delete(rows))
+
+    # ==================== 批量修改 ====================
+    def _apply_bulk(self, rows, update, rule_changes=None):
+        """对选中行执行 update(task_data)，最后统一保存一次
+
+        Args:
+            update: 修改任务字典的函数，返回 False 表示该任务未变化
+            rule_changes: 循环任务对应的规则修改函数，返回字段字典或 None
+        """
+        diary_changed = False
+        rule_updates = {}
+        for row in rows:
+            index = self.todo_model.index(row)
+            task_data = index.data(Qt.ItemDataRole.UserRole)
+            if update(task_data) is False:
+                continue
+            self.todo_model.setData(index, task_data, Qt.ItemDataRole.UserRole)
+            if task_data.get('recurrence'):
+                if rule_changes is not None:
+                    rule_updates[task_data['recurrence']] = rule_changes(task_data)
+            else:
+                diary_changed = True
+
+        if rule_updates:
+            self.file_manager.get_recurrence_scheduler().update_rules(rule_updates)
+        if diary_changed:
+            self.persist_tasks()
+
+    def bulk_set_completed(self, rows, completed):
+        states = {}
+
+        def update(task_data):
+            if task_data['completed'] == completed:
+                return False
+            task_data['completed'] = completed
+            if task_data.get('recurrence'):
+                states[task_data['recurrence']] = STATE_DONE if completed else None
+
+        self._apply_bulk(rows, update)
+        if states:
+            self.file_manager.get_recurrence_scheduler().set_states(
+                self.task_date().toString('yyyy-MM-dd'), states)
+
+    def bulk_set_priority(self, rows, priority):
+        def update(task_data):
+            if task_data.get('priority') == priority:
+                return False
+            task_data['priority'] = priority
+
+        self._apply_bulk(rows, update, lambda task_data: {'priority': priority})
+
+    def bulk_edit_tag(self, rows, add=True):
+        """给选中任务统一添加或移除一个标签"""
+        if add:
+            choices = self.file_manager.get_todo_tags()
+        else:
+            choices = sorted({tag for row in rows
+                              for tag in self.todo_model.task(row).get('tags') or []})
+            if not choices:
+                QMessageBox.information(self, "提示", "选中的任务没有标签")
+                return
+        tag, ok = QInputDialog.getItem(self, "添加标签" if add else "移除标签", "标签:",
+                                       choices, 0, add)
+        tag = tag.strip().lstrip('#')
+        if not ok or not tag:
+            return
+
+        def update(task_data):
+            tags = list(task_data.get('tags') or [])
+            if add and tag not in tags:
+                tags.append(tag)
+            elif not add and tag in tags:
+                tags.remove(tag)
+            else:
+                return False
+            task_data['tags'] = tags or None
+
+        self._apply_bulk(rows, update, lambda task_data: {'tags': list(task_data['tags'] or [])})
+
+    def bulk_delete(self, rows):
+        reply = QMessageBox.question(
+            self, "批量删除", f"确定删除选中的 {len(rows)} 项任务吗？\n（循环任务只跳过本次）",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+
+        states = {}
+        diary_changed = False
+        selected = set(rows)
+        kept = []
+        for row, task_data in enumerate(self.todo_model.tasks()):
+            if row not in selected:
+                kept.append(task_data)
+            elif task_data.get('recurrence'):
+                states[task_data['recurrence']] = STATE_SKIPPED
+            else:
+                diary_changed = True
+        # 一次性替换模型，避免逐行删除
+        self.todo_model.set_tasks(kept)
+
+        if states:
+            self.file_manager.get_recurrence_scheduler().set_states(
+                self.task_date().toString('yyyy-MM-dd'), states)
+        if diary_changed:
+            self.persist_tasks()
+
+    def bulk_move(self, rows):
+        """把选中的任务移动到其他日期（循环任务不参与移动）"""
+        moving_rows = [row for row in rows if not self.todo_model.task(row).get('recurrence')]
+        if not moving_rows:
+            QMessageBox.information(self, "提示", "循环任务不能移动到其他日期")
+            return
+
+        source_date = self.task_date()
+        target_date = self.ask_target_date(source_date)
+        if target_date is None or target_date == source_date:
+            return
+
+        moving = set(moving_rows)
+        moved, remaining, kept = [], [], []
+        for row, task_data in enumerate(self.todo_model.tasks()):
+            if row in moving:
+                moved.append(task_data)
+                continue
+            kept.append(task_data)
+            if not task_data.get('recurrence'):
+                remaining.append(task_data)
+
+        count = move_tasks(self.file_manager, source_date, remaining, moved, target_date)
+        if count < 0:
+            QMessageBox.critical(self, "错误", "移动任务失败，日记未被修改")
+            return
+
+        self.todo_model.set_tasks(kept)
+        self.notify_saved()
+
+    def ask_target_date(self, current):
+        """弹出日期选择框，取消时返回 None"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("移动到日期")
+        layout = QVBoxLayout(dialog)
+
+        date_edit = QDateEdit(current.addDays(1))
+        date_edit.setCalendarPopup(True)
+        date_edit.setDisplayFormat("yyyy-MM-dd")
+        layout.addWidget(QLabel("目标日期:"))
+        layout.addWidget(date_edit)
+
+        btn_layout = QHBoxLayout()
+        cancel_btn = QPushButton("取消")
+        set_style_role(cancel_btn, variant="secondary")
+        cancel_btn.clicked.connect(dialog.reject)
+        ok_btn = QPushButton("移动")
+        set_style_role(ok_btn, variant="primary")
+        ok_btn.clicked.connect(dialog.accept)
+        btn_layout.addStretch()
+        btn_layout.addWidget(cancel_btn)
+        btn_layout.addWidget(ok_btn)
+        layout.addLayout(btn_layout)
+
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return None
+        return date_edit.date()
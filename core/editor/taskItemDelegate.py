@@ -0,0 +1,187 @@
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt6.QtCore import Qt, QSize, QRect, QAbstractListModel, QModelIndex
+from PyQt6.QtGui import QFont, QColor, QFontMetrics, QPainter
+from core.server.diaryParser import format_task_schedule
+from core.style import (
+    current_theme, PRIORITY_COLORS, DEFAULT_PRIORITY_COLOR, TAG_COLORS, DEFAULT_TAG_COLOR
+)
+
+
+class TaskListModel(QAbstractListModel):
+    """
+    待办任务列表模型
+    每行保存一个任务字典（与日记解析结果结构相同），通过
+    Qt.ItemDataRole.UserRole 读写；今日待办和日记编辑器共用。
+    """
+    TaskRole = Qt.ItemDataRole.UserRole
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._tasks = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._tasks)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        task = self._tasks[index.row()]
+        if role == self.TaskRole:
+            return task
+        if role == Qt.ItemDataRole.DisplayRole:
+            return task['text']
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != self.TaskRole:
+            return False
+        self._tasks[index.row()] = value
+        self.dataChanged.emit(index, index)
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    # ==================== 便捷接口 ====================
+    def set_tasks(self, tasks):
+        """一次性替换全部任务（只触发一次重置）"""
+        self.beginResetModel()
+        self._tasks = list(tasks)
+        self.endResetModel()
+
+    def append_task(self, task):
+        row = len(self._tasks)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._tasks.append(task)
+        self.endInsertRows()
+
+    def remove_row(self, row):
+        if 0 <= row < len(self._tasks):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._tasks[row]
+            self.endRemoveRows()
+
+    def task(self, row):
+        return self._tasks[row]
+
+    def tasks(self):
+        return list(self._tasks)
+
+    def clear(self):
+        self.set_tasks([])
+
+
+class TaskItemDelegate(QStyledItemDelegate):
+    """
+    直接绘制任务行的委托
+    状态图标、任务文本、截止日期、优先级和标签徽章都由 paint 画出，
+    不为每个任务创建 QLabel，也不需要逐行计算布局；
+    切换完成状态只会重绘对应的一行。
+    """
+
+    def __init__(self, font_size=12, status_size=22, min_height=40, parent=None):
+        super().__init__(parent)
+        self.text_font = QFont("Arial", font_size)
+        self.done_font = QFont(self.text_font)
+        self.done_font.setStrikeOut(True)
+        self.status_font = QFont("Arial", status_size)
+        self.meta_font = QFont("Arial", max(font_size - 2, 8))
+        self.pill_font = QFont("Arial", font_size)
+
+        self._text_metrics = QFontMetrics(self.text_font)
+        self._meta_metrics = QFontMetrics(self.meta_font)
+        self._pill_metrics = QFontMetrics(self.pill_font)
+        self._status_width = QFontMetrics(self.status_font).horizontalAdvance("◌") + 8
+        self._color_cache = {}
+        self._height = max(min_height,
+                           QFontMetrics(self.status_font).height() + 8,
+                           self._pill_metrics.height() + 16)
+
+    def sizeHint(self, option, index):
+        # 所有行等高，配合 setUniformItemSizes 可以跳过逐行测量
+        return QSize(option.rect.width(), self._height)
+
+    def _qcolor(self, value):
+        """徽章颜色缓存，避免每次绘制都创建 QColor"""
+        color = self._color_cache.get(value)
+        if color is None:
+            color = QColor(value)
+            self._color_cache[value] = color
+        return color
+
+    def _pill_width(self, text):
+        return max(self._pill_metrics.horizontalAdvance(text) + 16, 40)
+
+    def _draw_pill(self, painter, right, rect, text, bg_color, fg_color):
+        """在 right 左侧画一个圆角徽章，返回徽章左边界"""
+        width = self._pill_width(text)
+        height = self._pill_metrics.height() + 4
+        pill_rect = QRect(right - width, rect.center().y() - height // 2, width, height)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self._qcolor(bg_color))
+        painter.drawRoundedRect(pill_rect, 10, 10)
+        painter.setPen(self._qcolor(fg_color))
+        painter.setFont(self.pill_font)
+        painter.drawText(pill_rect, Qt.AlignmentFlag.AlignCenter, text)
+        return pill_rect.left()
+
+    def paint(self, painter, option, index):
+        task = index.data(TaskListModel.TaskRole)
+        if not task:
+            return
+
+        # 背景和选中状态仍由样式绘制，保持与样式表一致
+        style = option.widget.style() if option.widget else None
+        if style is not None:
+            style.drawPrimitive(QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, option.widget)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = option.rect.adjusted(6, 0, -6, 0)
+        completed = task.get('completed')
+
+        # 行分隔线
+        theme = current_theme()
+        painter.setPen(theme.color("divider"))
+        painter.drawLine(option.rect.bottomLeft(), option.rect.bottomRight())
+
+        # 状态图标
+        painter.setFont(self.status_font)
+        painter.setPen(theme.color("muted" if completed else "primary"))
+        status_rect = QRect(rect.left(), rect.top(), self._status_width, rect.height())
+        painter.drawText(status_rect, Qt.AlignmentFlag.AlignCenter, "✓" if completed else "◌")
+
+        # 从右向左绘制标签、优先级和截止日期
+        right = rect.right()
+        for tag in reversed(task.get('tags') or []):
+            right = self._draw_pill(painter, right, rect, f"#{tag}",
+                                    TAG_COLORS.get(tag, DEFAULT_TAG_COLOR), "white") - 2
+
+        priority = task.get('priority')
+        if priority:
+            bg_color, fg_color = PRIORITY_COLORS.get(priority.lower(), DEFAULT_PRIORITY_COLOR)
+            right = self._draw_pill(painter, right, rect, priority, bg_color, fg_color) - 4
+
+        schedule = format_task_schedule(task.get('due'), task.get('remind'))
+        if schedule:
+            width = self._meta_metrics.horizontalAdvance(schedule)
+            painter.setFont(self.meta_font)
+            painter.setPen(theme.color("muted"))
+            painter.drawText(QRect(right - width, rect.top(), width, rect.height()),
+                             Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignRight, schedule)
+            right -= width + 8
+
+        # 任务文本（循环任务带 ↻ 标记，过长时省略）
+        text = task['text'] if task['text'].strip() else "(无标题任务)"
+        if task.get('recurrence'):
+            text = f"↻ {text}"
+        text_left = status_rect.right() + 4
+        text_rect = QRect(text_left, rect.top(), max(right - text_left, 0), rect.height())
+        painter.setFont(self.done_font if completed else self.text_font)
+        painter.setPen(theme.color("muted") if completed else option.palette.text().color())
+        elided = self._text_metrics.elidedText(text, Qt.TextElideMode.ElideRight, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, elided)
+
+        painter.restore()
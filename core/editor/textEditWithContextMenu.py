@@ -1,12 +1,31 @@
 from PyQt6.QtWidgets import QTextEdit, QMenu, QMessageBox, QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTextBrowser
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QObject, pyqtSignal
 from PyQt6.QtGui import QAction, QTextCursor
+from core.style import set_style_role
+
+
+class TextJobSignals(QObject):
+    """把 TextProcessor 任务在工作线程中的回调转发到界面线程"""
+    token_received = pyqtSignal(str)
+    stats_updated = pyqtSignal(object, object)   # 首字延迟（秒）, 每秒 token 数
+    result_ready = pyqtSignal(str, str)          # 处理结果, 使用的方法
+    failed = pyqtSignal(str)
+
+    def emit_done(self, job):
+        try:
+            result = job.result()
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        if result is not None:
+            self.result_ready.emit(*result)
 
 
 class TextComparisonDialog(QDialog):
     """
     文本对比预览对话框
     用于显示原文本和处理后文本的对比
+    processed_text 为 None 时进入流式模式：生成的文本逐段追加，完成后才能应用
     """
     
     def __init__(self, original_text, processed_text, method, action_type, parent=None):
@@ -29,9 +48,15 @@ class TextComparisonDialog(QDialog):
         layout = QVBoxLayout(self)
         
         # 处理方法信息
-        method_label = QLabel(f"处理方法: {method}")
-        method_label.setStyleSheet("font-weight: bold; color: #666;")
-        layout.addWidget(method_label)
+        self.method_label = QLabel(f"处理方法: {method}")
+        set_style_role(self.method_label, role="methodLabel")
+        layout.addWidget(self.method_label)
+        
+        # 流式生成统计（首字延迟、生成速度）
+        self.stats_label = QLabel()
+        set_style_role(self.stats_label, role="muted")
+        self.stats_label.setVisible(processed_text is None)
+        layout.addWidget(self.stats_label)
         
         # 原文本显示
         layout.addWidget(QLabel("原文本:"))
@@ -42,26 +67,54 @@ class TextComparisonDialog(QDialog):
         
         # 处理后文本显示
         layout.addWidget(QLabel("处理后文本:"))
-        processed_browser = QTextBrowser()
-        processed_browser.setPlainText(processed_text)
-        processed_browser.setMaximumHeight(150)
-        layout.addWidget(processed_browser)
+        self.processed_browser = QTextBrowser()
+        self.processed_browser.setPlainText(processed_text or "")
+        self.processed_browser.setMaximumHeight(150)
+        layout.addWidget(self.processed_browser)
         
         # 按钮布局
         button_layout = QHBoxLayout()
         
-        accept_btn = QPushButton("应用更改")
-        accept_btn.clicked.connect(self.accept_replacement)
-        accept_btn.setStyleSheet("QPushButton { background-color: #4CAF50; color: white; padding: 8px; }")
+        self.accept_btn = QPushButton("应用更改")
+        self.accept_btn.clicked.connect(self.accept_replacement)
+        set_style_role(self.accept_btn, variant="success")
+        self.accept_btn.setEnabled(processed_text is not None)
         
         reject_btn = QPushButton("取消")
         reject_btn.clicked.connect(self.reject_replacement)
-        reject_btn.setStyleSheet("QPushButton { background-color: #f44336; color: white; padding: 8px; }")
+        set_style_role(reject_btn, variant="danger")
         
         button_layout.addWidget(reject_btn)
-        button_layout.addWidget(accept_btn)
+        button_layout.addWidget(self.accept_btn)
         layout.addLayout(button_layout)
     
+    # ==================== 流式模式 ====================
+    def append_text(self, piece):
+        """追加一段生成的文本"""
+        cursor = self.processed_browser.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(piece)
+        self.processed_browser.setTextCursor(cursor)
+    
+    def update_stats(self, ttft, tokens_per_second):
+        """显示首字延迟和生成速度"""
+        parts = []
+        if ttft is not None:
+            parts.append(f"首字延迟: {ttft * 1000:.0f} ms")
+        if tokens_per_second is not None:
+            parts.append(f"生成速度: {tokens_per_second:.1f} tokens/s")
+        self.stats_label.setText("    ".join(parts))
+    
+    def set_result(self, processed_text, method):
+        """生成结束：显示清理后的最终结果并允许应用"""
+        self.processed_text = processed_text
+        self.method_label.setText(f"处理方法: {method}")
+        self.processed_browser.setPlainText(processed_text)
+        self.accept_btn.setEnabled(True)
+    
+    def set_error(self, message):
+        self.method_label.setText(f"处理失败: {message}")
+    
     def accept_replacement(self):
         """用户确认替换"""
         self.accepted_replacement = True
@@ -87,6 +140,7 @@ class TextEditWithContextMenu(QTextEdit):
     def __init__(self, text_processor=None, parent=None):
         super().__init__(parent)
         self.text_processor = text_processor
+        self.current_job = None   # 正在进行的高级文本处理任务
         
         # 设置右键菜单
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
@@ -139,15 +193,31 @@ class TextEditWithContextMenu(QTextEdit):
             action.triggered.connect(func)
             advanced_process_menu.addAction(action)
         
+        add_word_action = QAction("添加到词典", self)
+        add_word_action.triggered.connect(self.add_selection_to_dictionary)
+        advanced_process_menu.addAction(add_word_action)
+        
         menu.exec(self.mapToGlobal(pos))
     
+    def add_selection_to_dictionary(self):
+        """把选中的单词加入用户拼写词典"""
+        word = self.textCursor().selectedText().strip()
+        if not word or any(ch.isspace() for ch in word):
+            QMessageBox.information(self, "提示", "请先选择一个单词")
+            return
+        if self.text_processor and self.text_processor.add_user_word(word):
+            QMessageBox.information(self, "添加到词典", f"已将 \"{word}\" 加入词典")
+        else:
+            QMessageBox.warning(self, "添加到词典", "添加失败")
+    
     def text_process_function(self, action_type, is_basic=True):
         """
         文本处理功能
         is_basic: True为基本处理(直接替换), False为高级处理(需要用户确认)
         """
         cursor = self.textCursor()
-        selected_text = cursor.selectedText()
+        # selectedText() 用 U+2029 分隔段落，统一为换行后再处理
+        selected_text = cursor.selectedText().replace('\u2029', '\n')
         
         if not selected_text:
             QMessageBox.information(self, "提示", "请先选择文本")
@@ -167,30 +237,13 @@ class TextEditWithContextMenu(QTextEdit):
                 else:
                     new_text = f"<strong>{selected_text}</strong>"
                 method = "基本方法"
-            elif action_type == 'spell_check':
-                if hasattr(self, 'text_processor') and self.text_processor:
-                    new_text, method = self.text_processor.spell_check(selected_text)
-                else:
-                    new_text = selected_text
-                    method = "TextProcessor 不可用"
-            elif action_type == 'translate':
-                if hasattr(self, 'text_processor') and self.text_processor:
-                    new_text, method = self.text_processor.translate(selected_text)
-                else:
-                    new_text = selected_text
-                    method = "TextProcessor 不可用"
-            elif action_type == 'polish':
-                if hasattr(self, 'text_processor') and self.text_processor:
-                    new_text, method = self.text_processor.polish(selected_text)
-                else:
-                    new_text = selected_text
-                    method = "TextProcessor 不可用"
-            elif action_type == 'summarize':
+            elif action_type in ('spell_check', 'translate', 'polish', 'summarize'):
                 if hasattr(self, 'text_processor') and self.text_processor:
-                    new_text, method = self.text_processor.summarize(selected_text)
-                else:
-                    new_text = selected_text
-                    method = "TextProcessor 不可用"
+                    # 大模型输出边生成边显示
+                    self.run_streaming_process(action_type, cursor, selected_text)
+                    return
+                new_text = selected_text
+                method = "TextProcessor 不可用"
             else:
                 raise ValueError(f"未知操作类型: {action_type}")
             
@@ -228,3 +281,37 @@ class TextEditWithContextMenu(QTextEdit):
         except Exception as e:
             QMessageBox.critical(self, "处理错误", f"文本处理时发生错误:\n{str(e)}")
             print(f"TextProcessor 错误: {e}")
+    
+    def run_streaming_process(self, action_type, cursor, selected_text):
+        """在后台任务中处理文本，预览对话框先打开并逐段显示生成结果"""
+        # 新请求开始时放弃之前未完成的请求
+        self.cancel_current_job()
+        
+        dialog = TextComparisonDialog(selected_text, None, "生成中...", action_type, self)
+        # 信号对象不设父对象：任务线程可能在对话框销毁后才结束
+        signals = TextJobSignals()
+        signals.token_received.connect(dialog.append_text)
+        signals.stats_updated.connect(dialog.update_stats)
+        signals.result_ready.connect(dialog.set_result)
+        signals.failed.connect(dialog.set_error)
+        self.current_job = self.text_processor.submit(
+            action_type, selected_text,
+            on_token=signals.token_received.emit,
+            on_stats=signals.stats_updated.emit,
+            on_done=signals.emit_done)
+        
+        result = dialog.exec()
+        # 对话框关闭（应用、取消或直接关闭）后不再需要生成结果
+        self.cancel_current_job()
+        
+        if (result == QDialog.DialogCode.Accepted and dialog.accepted_replacement
+                and dialog.processed_text is not None):
+            cursor.insertText(dialog.processed_text)
+            QMessageBox.information(self, "处理完成", "文本已成功替换")
+        dialog.deleteLater()
+    
+    def cancel_current_job(self):
+        """取消正在进行的文本处理任务"""
+        if self.current_job is not None:
+            self.current_job.cancel()
+            self.current_job = None
@@ -1,3 +1,16 @@
 from .accountServer import AccountManager
 from .fileServer import FileManager
-from .textServer import TextProcessor
\ No newline at end of file
+from .textServer import TextProcessor
+from .taskStore import Task, TaskStore
+from .recurrence import RecurrenceScheduler
+from .reminders import ReminderScheduler
+from .tagRefactor import TagRefactor
+from .searchIndex import SearchIndex
+from .bloomFilter import BloomFilter, ShardBloomIndex
+from .findReplace import FindReplace
+from .noteCatalog import NoteCatalog, NoteEntry
+from .queryLanguage import Query, QueryPlanner, parse_query
+from .quickSwitcher import SwitcherIndex
+from .resultCache import ResultCache
+from .spellDictionary import CompiledDictionary
+from .symSpell import SymSpellChecker
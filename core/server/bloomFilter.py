@@ -0,0 +1,211 @@
+import os
+import json
+import math
+import base64
+import hashlib
+import threading
+from .searchIndex import scan_data_files
+
+# ======================
+# 布隆过滤器
+# ======================
+class BloomFilter:
+    """固定大小的布隆过滤器（可能误报，不会漏报）"""
+
+    def __init__(self, size_bits, num_hashes, bits=None):
+        self.size_bits = max(8, size_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.bits = bits if bits is not None else bytearray((self.size_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate=0.01):
+        """按预计元素数量和误报率计算位数和哈希函数个数"""
+        capacity = max(1, capacity)
+        size_bits = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        num_hashes = round(size_bits / capacity * math.log(2))
+        return cls(size_bits, num_hashes)
+
+    def _positions(self, item):
+        # 双重哈希：一次 blake2b 得到两个 64 位值，组合出 k 个位置
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def to_dict(self):
+        return {"m": self.size_bits, "k": self.num_hashes,
+                "bits": base64.b64encode(bytes(self.bits)).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["m"], data["k"], bytearray(base64.b64decode(data["bits"])))
+
+
+def text_ngrams(text):
+    """过滤器中登记的片段：所有二字符和三字符片段（小写）
+
+    中文常见的双字词也能用过滤器排除，不像三元组索引那样只能处理长度不少于 3 的查询。
+    """
+    text = text.lower()
+    grams = {text[i:i+2] for i in range(len(text) - 1)}
+    grams.update(text[i:i+3] for i in range(len(text) - 2))
+    return grams
+
+
+def query_ngrams(literals):
+    """查询串中用于检查过滤器的片段"""
+    grams = set()
+    for literal in literals:
+        literal = literal.lower()
+        if len(literal) == 2:
+            grams.add(literal)
+        else:
+            grams.update(literal[i:i+3] for i in range(len(literal) - 2))
+    return grams
+
+
+def shard_key(rel_path):
+    """文件所属的分片：日记按 Diary/YYYY/MM 目录，笔记按文件名中的年月"""
+    parts = rel_path.split('/')
+    if parts[0] == "Diary":
+        return "/".join(parts[:3]) if len(parts) >= 4 else "Diary"
+    name = parts[-1]
+    return f"QuickNote/{name[:6]}" if name[:6].isdigit() else "QuickNote/other"
+
+
+class ShardBloomIndex:
+    """按月分片的布隆过滤器索引
+
+    全文倒排索引的轻量替代：每个 Diary/YYYY/MM 目录和每个笔记分片只保存
+    一个很小的过滤器，查询时整月排除不可能包含查询串的文件，
+    适合磁盘较慢、不想维护完整索引的场景。与 SearchIndex 提供相同的
+    sync() / candidates() 接口。分片内任一文件变化时只重建该分片的过滤器。
+    """
+    CACHE_VERSION = 1
+    ERROR_RATE = 0.01
+
+    def __init__(self, base_path, cache_path):
+        self.base_path = base_path
+        self.cache_path = cache_path
+
+        self._filters = {}      # 分片 -> BloomFilter
+        self._signatures = {}   # 分片 -> 文件列表和修改时间的摘要
+        self._shard_files = {}  # 分片 -> [相对路径]
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    # ==================== 构建与持久化 ====================
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != self.CACHE_VERSION:
+                return
+            for shard, entry in data.get("shards", {}).items():
+                self._filters[shard] = BloomFilter.from_dict(entry["filter"])
+                self._signatures[shard] = entry["signature"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"加载布隆过滤器缓存失败: {e}")
+
+    @staticmethod
+    def _signature(files, rel_paths):
+        digest = hashlib.md5()
+        for rel_path in rel_paths:
+            digest.update(f"{rel_path}\0{files[rel_path][1]}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def _build_filter(self, files, rel_paths):
+        grams = set()
+        for rel_path in rel_paths:
+            try:
+                with open(files[rel_path][0], 'r', encoding='utf-8') as f:
+                    grams |= text_ngrams(f.read())
+            except Exception as e:
+                print(f"读取文件失败: {e}")
+        bloom = BloomFilter.for_capacity(len(grams), self.ERROR_RATE)
+        for gram in grams:
+            bloom.add(gram)
+        return bloom
+
+    def sync(self):
+        """与磁盘对账，只重建文件有变化的分片
+
+        Returns:
+            dict: 当前所有文件 {相对路径: (绝对路径, mtime)}
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load_cache()
+                self._loaded = True
+
+            files = scan_data_files(self.base_path)
+            shard_files = {}
+            for rel_path in sorted(files):
+                shard_files.setdefault(shard_key(rel_path), []).append(rel_path)
+
+            changed = bool(set(self._filters) - set(shard_files))
+            for shard in set(self._filters) - set(shard_files):
+                del self._filters[shard]
+                self._signatures.pop(shard, None)
+
+            for shard, rel_paths in shard_files.items():
+                signature = self._signature(files, rel_paths)
+                if self._signatures.get(shard) == signature and shard in self._filters:
+                    continue
+                self._filters[shard] = self._build_filter(files, rel_paths)
+                self._signatures[shard] = signature
+                changed = True
+
+            self._shard_files = shard_files
+            if changed:
+                self.flush()
+            return files
+
+    def flush(self):
+        """把所有过滤器写入缓存文件"""
+        with self._lock:
+            shards = {shard: {"signature": self._signatures[shard], "filter": bloom.to_dict()}
+                      for shard, bloom in self._filters.items()}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.CACHE_VERSION, "shards": shards}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"保存布隆过滤器缓存失败: {e}")
+
+    # ==================== 查询接口 ====================
+    def candidate_shards(self, literals):
+        """可能同时包含所有 literals 的分片，无法过滤时返回 None"""
+        grams = query_ngrams(literals)
+        if not grams:
+            return None
+        with self._lock:
+            return {shard for shard, bloom in self._filters.items()
+                    if all(gram in bloom for gram in grams)}
+
+    def candidates(self, literals):
+        """返回候选文件集合（未被过滤器排除的分片中的全部文件）
+
+        Returns:
+            set | None: 相对路径集合，无法过滤时返回 None
+        """
+        shards = self.candidate_shards(literals)
+        if shards is None:
+            return None
+        with self._lock:
+            return {rel_path for shard in shards for rel_path in self._shard_files.get(shard, ())}
+
+    def __len__(self):
+        return sum(len(rel_paths) for rel_paths in self._shard_files.values())
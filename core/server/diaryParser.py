@@ -0,0 +1,358 @@
+"""
+日记 Markdown 解析工具
+
+日记文件由 `## TODO`、`## Notes`、`## Summary` 三段组成，
+这里集中提供解析逻辑，供编辑器、视图和后台预读共用。
+"""
+import hashlib
+import uuid
+from datetime import datetime
+
+
+# ======================
+# 日记解析
+# ======================
+def new_task_id():
+    """为新建任务生成稳定 ID"""
+    return uuid.uuid4().hex[:8]
+
+
+def derive_task_id(date_key, text, ordinal):
+    """为没有 ID 的旧任务推导确定性 ID
+
+    同一天内相同文本的任务用出现序号区分，只要任务未被修改，
+    每次解析得到的 ID 都相同；下次保存时该 ID 会写回文件。
+    """
+    raw = f"{date_key}|{text}|{ordinal}".encode('utf-8')
+    return hashlib.sha1(raw).hexdigest()[:8]
+
+
+def assign_task_ids(date_key, todos, taken=None):
+    """为缺少 ID 或 ID 重复的任务补全推导 ID，返回新的任务列表
+
+    同一文件中 ID 重复时（例如复制粘贴任务行）保留第一次出现的任务，
+    后面的任务改用推导 ID；taken(task_id) 返回 True 表示该 ID 已被
+    其他日期的任务占用，同样改用推导 ID。推导 ID 与已用 ID 冲突时
+    递增序号，结果只取决于文件内容和 taken。
+    """
+    used = set()
+    seen = {}
+    result = []
+    for task in todos:
+        task_id = task.get('id')
+        if task_id and task_id not in used and not (taken and taken(task_id)):
+            used.add(task_id)
+            result.append(task)
+            continue
+        ordinal = seen.get(task['text'], 0)
+        task_id = derive_task_id(date_key, task['text'], ordinal)
+        while task_id in used or (taken and taken(task_id)):
+            ordinal += 1
+            task_id = derive_task_id(date_key, task['text'], ordinal)
+        seen[task['text']] = ordinal + 1
+        used.add(task_id)
+        task = dict(task)
+        task['id'] = task_id
+        result.append(task)
+    return result
+
+
+def resolve_task_ids(date_key, content, taken=None):
+    """把重复 ID 的解析结果写回日记内容
+
+    只改写 ID 被替换的任务行，其余内容保持不变；缺少 ID 的任务保持原样，
+    由编辑器在下次保存时写入。
+
+    Returns:
+        tuple: (新内容, 该日期全部任务 ID 列表)
+    """
+    lines = content.split("\n")
+    in_todo = False
+    positions = []
+    todos = []
+    for i, line in enumerate(lines):
+        # 与 parse_diary 的分段规则保持一致，保证任务序号相同
+        if line.startswith(("## TODO", "## Notes", "## Summary")):
+            in_todo = line.startswith("## TODO")
+            continue
+        if in_todo and line.strip():
+            positions.append(i)
+            todos.append(parse_task_line(line.rstrip("\r")))
+
+    resolved = assign_task_ids(date_key, todos, taken)
+    for i, before, after in zip(positions, todos, resolved):
+        if before.get('id') and before['id'] != after['id']:
+            ending = "\r" if lines[i].endswith("\r") else ""
+            lines[i] = format_task_line(after) + ending
+    return "\n".join(lines), [task['id'] for task in resolved]
+
+
+def parse_task_meta(task_text):
+    """从任务文本中解析花括号元数据块
+
+    Returns:
+        tuple: (task_text, tags, meta)，meta 为 `key:value` 形式的字典（键为小写）
+    """
+    tags = []
+    meta = {}
+
+    # 查找标签部分
+    if '{' in task_text and '}' in task_text:
+        tag_start = task_text.find('{')
+        tag_end = task_text.find('}', tag_start)
+        if tag_end != -1:
+            tag_content = task_text[tag_start+1:tag_end]
+            task_text = task_text[tag_end+1:].strip()
+
+            # 解析标签和键值元数据
+            parts = [p.strip() for p in tag_content.split(',')]
+            for part in parts:
+                if ':' in part:
+                    key, value = map(str.strip, part.split(':', 1))
+                    meta[key.lower()] = value
+                elif part:
+                    tags.append(part)
+    return task_text, tags, meta
+
+
+def parse_tags_and_priority(task_text):
+    """从任务文本中提取标签和优先级
+
+    任务文本形如 "{ priority:High, 工作, 学习}写周报"，花括号内
+    不带冒号的部分视为标签，`priority:` 视为优先级。
+
+    Returns:
+        tuple: (task_text, tags, priority)
+    """
+    task_text, tags, meta = parse_task_meta(task_text)
+    return task_text, tags, meta.get('priority')
+
+
+def parse_task_fields(task_text):
+    """从输入的任务文本中提取全部字段
+
+    除标签和优先级外，还支持截止日期和提醒时间，例如
+    "{ priority:High, 工作, due:2026-10-20, remind:09:30}写周报"。
+    `remind` 可以是 "yyyy-MM-dd HH:mm"，也可以只写 "HH:mm"
+    （此时相对截止日期，没有截止日期时相对日记日期）。
+
+    Returns:
+        dict: {'text', 'tags', 'priority', 'due', 'remind'}
+    """
+    task_text, tags, meta = parse_task_meta(task_text)
+    return {
+        'text': task_text,
+        'tags': tags,
+        'priority': meta.get('priority'),
+        'due': normalize_due(meta.get('due')),
+        'remind': normalize_remind(meta.get('remind'))
+    }
+
+
+def normalize_due(value):
+    """规范化截止日期为 yyyy-MM-dd，无法识别时返回 None"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value.strip().replace('/', '-'), "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def normalize_remind(value):
+    """规范化提醒时间为 "yyyy-MM-dd HH:mm" 或 "HH:mm"，无法识别时返回 None"""
+    if not value:
+        return None
+    value = " ".join(value.strip().replace('/', '-').split())
+    for fmt in ("%Y-%m-%d %H:%M", "%H:%M"):
+        try:
+            return datetime.strptime(value, fmt).strftime(fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def resolve_remind_time(date_key, due, remind):
+    """计算任务的提醒时刻
+
+    Args:
+        date_key (str): 任务所在日记日期 yyyy-MM-dd
+        due (str | None): 截止日期
+        remind (str | None): 提醒时间
+
+    Returns:
+        datetime | None
+    """
+    if not remind:
+        return None
+    try:
+        if len(remind) > 5:
+            return datetime.strptime(remind, "%Y-%m-%d %H:%M")
+        return datetime.strptime(f"{due or date_key} {remind}", "%Y-%m-%d %H:%M")
+    except ValueError:
+        return None
+
+
+def parse_task_line(line):
+    """解析 TODO 段中的一行任务
+
+    Returns:
+        dict: {'id', 'text', 'completed', 'priority', 'tags', 'due', 'remind'}
+    """
+    if line.startswith('- [x]') or line.startswith('- [X]'):
+        # 已完成任务
+        task_text = line[5:].strip()
+        completed = True
+    elif line.startswith('- [ ]'):
+        # 未完成任务
+        task_text = line[5:].strip()
+        completed = False
+    else:
+        # 处理不规范的格式
+        task_text = line.lstrip('- []').strip()
+        completed = '[x]' in line or '[X]' in line
+
+    task_text, tags, meta = parse_task_meta(task_text)
+    return {
+        'id': meta.get('id'),
+        'text': task_text,
+        'completed': completed,
+        'priority': meta.get('priority'),
+        'tags': tags,
+        'due': normalize_due(meta.get('due')),
+        'remind': normalize_remind(meta.get('remind'))
+    }
+
+
+def format_task_line(data):
+    """将任务字典格式化为 Markdown 任务行"""
+    # 根据完成状态添加不同标记
+    mark = "[x]" if data['completed'] else "[ ]"
+
+    # 重建标签/优先级部分
+    tag_parts = []
+    if data.get('priority'):
+        tag_parts.append(f"priority:{data['priority']}")
+    if data.get('tags'):
+        tag_parts.extend(data['tags'])
+    if data.get('due'):
+        tag_parts.append(f"due:{data['due']}")
+    if data.get('remind'):
+        tag_parts.append(f"remind:{data['remind']}")
+    if data.get('id'):
+        tag_parts.append(f"id:{data['id']}")
+
+    # 构建行
+    line = f"- {mark} "
+    if tag_parts:
+        line += "{" + f" {', '.join(tag_parts)}" + "}"
+    line += data['text']
+    return line
+
+
+def format_task_schedule(due, remind):
+    """生成截止日期和提醒时间的显示文本"""
+    parts = []
+    if due:
+        parts.append(f"截止 {due}")
+    if remind:
+        parts.append(f"⏰ {remind}")
+    return "  ".join(parts)
+
+
+def parse_diary(content):
+    """将日记内容解析为文档结构
+
+    Returns:
+        dict: {
+            'todos': [任务字典, ...],
+            'notes': [(time_str, note_title), ...],
+            'summary': [行, ...]
+        }
+    """
+    document = {'todos': [], 'notes': [], 'summary': []}
+    section = None
+
+    for line in content.splitlines():
+        if line.startswith("## TODO"):
+            section = 'todo'
+            continue
+        elif line.startswith("## Notes"):
+            section = 'notes'
+            continue
+        elif line.startswith("## Summary"):
+            section = 'summary'
+            continue
+
+        if section == 'todo' and line.strip():
+            document['todos'].append(parse_task_line(line))
+        elif section == 'notes' and line.strip():
+            # 笔记条目格式: - [HH:mm] [[标题]]
+            if line.startswith('- ['):
+                start = line.find('[')
+                end = line.find(']', start)
+                if end != -1:
+                    time_str = line[start+1:end]
+                    note_title_start = line.find('[[')
+                    note_title_end = line.find(']]', note_title_start)
+                    if note_title_end != -1:
+                        note_title = line[note_title_start+2:note_title_end]
+                        document['notes'].append((time_str, note_title))
+        elif section == 'summary':
+            document['summary'].append(line)
+
+    return document
+
+
+def is_document_empty(document):
+    """判断解析后的日记是否没有任何内容"""
+    if document['todos'] or document['notes']:
+        return False
+    return not any(line.strip() for line in document['summary'])
+
+
+def split_todo_section(content):
+    """把日记内容拆分为 TODO 段前、TODO 段任务行、TODO 段后三部分
+
+    Returns:
+        tuple: (before, task_lines, after)，TODO 段不存在时 task_lines 为 None
+    """
+    lines = content.splitlines()
+    start = None
+    for i, line in enumerate(lines):
+        if line.startswith("## TODO"):
+            start = i
+            break
+    if start is None:
+        return content, None, ""
+
+    end = len(lines)
+    for i in range(start + 1, len(lines)):
+        if lines[i].startswith("## "):
+            end = i
+            break
+
+    before = "\n".join(lines[:start])
+    task_lines = [line for line in lines[start + 1:end] if line.strip()]
+    after = "\n".join(lines[end:])
+    return before, task_lines, after
+
+
+def replace_todo_section(content, tasks):
+    """用任务字典列表重建日记中的 TODO 段，其余内容保持不变"""
+    new_todo = "## TODO\n" + "".join(format_task_line(task) + "\n" for task in tasks)
+
+    if not content.strip():
+        # 空日记使用完整模板
+        return new_todo + "\n## Notes\n\n## Summary\n"
+
+    before, task_lines, after = split_todo_section(content)
+    if task_lines is None:
+        # 如果不存在TODO部分，添加到开头
+        return new_todo + "\n" + content
+
+    result = before + "\n" if before else ""
+    result += new_todo
+    if after:
+        result += "\n" + after + ("\n" if content.endswith("\n") else "")
+    return result
@@ -1,8 +1,19 @@
 import os
 import json
+import bisect
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from PyQt6.QtWidgets import QMessageBox
 from PyQt6.QtCore import QDate
+from .diaryParser import parse_diary, assign_task_ids, resolve_task_ids
+from .taskStore import TaskStore
+from .recurrence import RecurrenceScheduler
+from .reminders import ReminderScheduler
+from .searchIndex import SearchIndex
+from .bloomFilter import ShardBloomIndex
+from .noteCatalog import NoteCatalog
 # ======================
 # 文件管理器
 # ======================
@@ -20,6 +31,30 @@ class FileManager:
         
         self.config_path = os.path.join(self.user_base_path, "config.json")
         self.__init_config()
+
+        # 索引等可重建数据的缓存目录
+        self.cache_dir = os.path.join(self.user_base_path, ".cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._task_store = None
+        self._recurrence_scheduler = None
+        self._reminder_scheduler = None
+        self._search_index = None
+        self._note_catalog = None
+        # 上面几个索引首次使用时才创建，可能同时来自界面线程和后台线程
+        self._lazy_lock = threading.RLock()
+
+        # 批量写入日志：上次批量写入中途退出时在这里补完
+        self.journal_path = os.path.join(self.cache_dir, "write_journal.json")
+        self._recover_write_journal()
+
+        # 日记日期索引（排序的 yyyy-MM-dd 列表，首次使用时构建）
+        self._diary_index = None
+        # 解析后日记文档的预读缓存
+        self._document_cache = OrderedDict()
+        self._document_cache_size = 32
+        self._document_versions = {}
+        self._document_lock = threading.Lock()
+        self._prefetch_executor = None
         
     def __init_config(self):
         """初始化用户的配置文件"""
@@ -29,7 +64,9 @@ class FileManager:
                 "todo_tags": ["工作", "学习", "生活", "重要"],
                 "default_view": "Diary",
                 "last_access": datetime.now().strftime("%Y-%m-%d %H:%M"),
-                "theme": "system"  # 添加用户主题偏好
+                "theme": "system",  # 添加用户主题偏好
+                "search_index": "full",  # 全文索引类型: full / bloom
+                "spell_backend": "pyspellchecker"  # 拼写纠正方式: pyspellchecker / symspell
             }
             self.__save_config(default_config)
     
@@ -122,6 +159,38 @@ class FileManager:
         config["todo_tags"] = tags
         return self.__save_config(config)
     
+    # ==================== 外观设置接口 ====================
+    def get_theme_mode(self):
+        """获取界面主题模式
+
+        Returns:
+            str: "system"（跟随系统）、"light" 或 "dark"
+        """
+        config = self.__load_config()
+        return config.get("theme", "system")
+
+    def get_spell_backend(self):
+        """获取传统拼写检查使用的纠正方式
+
+        Returns:
+            str: "pyspellchecker"（编辑距离枚举）或 "symspell"（对称删除索引）
+        """
+        config = self.__load_config()
+        return config.get("spell_backend", "pyspellchecker")
+
+    def set_theme_mode(self, mode):
+        """保存界面主题模式
+
+        Args:
+            mode (str): "system"、"light" 或 "dark"
+
+        Returns:
+            bool: 保存成功返回True，失败返回False
+        """
+        config = self.__load_config()
+        config["theme"] = mode
+        return self.__save_config(config)
+
     def get_diary_dir(self):
         """获取用户日记目录"""
         return self.user_diary_dir
@@ -139,14 +208,150 @@ class FileManager:
     def save_diary(self, date, content):
         """保存日记内容"""
         path = self.get_diary_path(date)
+        key = date.toString('yyyy-MM-dd')
+        content = self._resolve_task_ids({key: content})[key]
         try:
             with open(path, 'w', encoding='utf-8') as f:
                 f.write(content)
-            return True
         except Exception as e:
             print(f"保存日记失败: {e}")
             return False
+
+        self._on_diary_written(key, content)
+        if self._task_store is not None:
+            self._task_store.update_date(key, content, os.path.getmtime(path))
+        return True
+
+    def _on_diary_written(self, key, content):
+        """日记写入后同步日期索引和文档缓存"""
+        if self._diary_index is not None:
+            pos = bisect.bisect_left(self._diary_index, key)
+            if pos == len(self._diary_index) or self._diary_index[pos] != key:
+                self._diary_index.insert(pos, key)
+
+        document = self._parse_document(key, content)
+        with self._document_lock:
+            self._document_versions[key] = self._document_versions.get(key, 0) + 1
+            self._cache_document(key, document)
     
+    def save_diaries(self, contents, renames=None, notes=None):
+        """批量保存多天日记，作为一次原子写入
+
+        所有文件先写入临时文件，再统一替换；任务索引只更新一次。
+
+        Args:
+            contents (dict): {QDate: content}
+            renames (list | None): 同一事务中需要重命名的文件 [(旧路径, 新路径), ...]
+            notes (dict | None): 同一事务中写入的笔记 {文件名: content}
+
+        Returns:
+            bool: 全部写入成功返回True，失败时不会修改任何日记
+        """
+        if not contents and not renames and not notes:
+            return True
+
+        resolved = self._resolve_task_ids(
+            {date.toString('yyyy-MM-dd'): content for date, content in contents.items()})
+        contents = {date: resolved[date.toString('yyyy-MM-dd')] for date in contents}
+        writes = {self.get_diary_path(date): content for date, content in contents.items()}
+        for filename, content in (notes or {}).items():
+            writes[self.get_note_path(filename)] = content
+        if not self.commit_files(writes, renames):
+            return False
+
+        changes = {}
+        for date, content in contents.items():
+            key = date.toString('yyyy-MM-dd')
+            self._on_diary_written(key, content)
+            changes[key] = (content, os.path.getmtime(self.get_diary_path(date)))
+        if self._task_store is not None and changes:
+            self._task_store.update_dates(changes)
+        return True
+
+    def commit_files(self, writes, renames=None):
+        """原子地批量写入多个文件
+
+        先把每个文件写到同目录的临时文件并落盘，再记录写入日志，
+        最后逐个 os.replace。如果在替换过程中程序退出，下次启动时
+        会根据日志补完剩余的替换，因此所有文件要么全部是新内容，
+        要么全部保持原样。重命名同样记录在日志中，与写入一起生效。
+
+        Args:
+            writes (dict): {文件路径: 内容}
+            renames (list | None): [(旧路径, 新路径), ...]，新路径不能已存在
+
+        Returns:
+            bool: 成功返回True；上一批写入未完成且无法补完时不会开始新的写入
+        """
+        # 日志只记录一批写入，先补完上一批，否则新日志会覆盖未完成的替换
+        if not self._recover_write_journal():
+            print("批量写入失败: 上一次批量写入尚未完成")
+            return False
+
+        renames = list(renames or [])
+        for old_path, new_path in renames:
+            if not os.path.exists(old_path) or os.path.exists(new_path):
+                print(f"批量写入失败: 无法重命名 {old_path} -> {new_path}")
+                return False
+
+        pending = []
+        try:
+            for path, content in writes.items():
+                tmp_path = path + ".kairo-tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+                pending.append((tmp_path, path))
+
+            with open(self.journal_path, 'w', encoding='utf-8') as f:
+                json.dump(pending + renames, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            print(f"批量写入失败: {e}")
+            for tmp_path, _path in pending:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return False
+
+        return self._recover_write_journal()
+
+    def _recover_write_journal(self):
+        """执行（或补完）写入日志中记录的文件替换
+
+        Returns:
+            bool: 没有待完成的日志或全部替换成功返回True；失败时保留日志，
+                  下次写入或启动时重试
+        """
+        if not os.path.exists(self.journal_path):
+            return True
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                pending = json.load(f)
+        except ValueError:
+            # 日志本身没有写完整时还未开始替换，直接丢弃
+            try:
+                os.remove(self.journal_path)
+            except OSError as e:
+                print(f"恢复批量写入失败: {e}")
+                return False
+            return True
+        except Exception as e:
+            print(f"恢复批量写入失败: {e}")
+            return False
+        try:
+            for tmp_path, path in pending:
+                if os.path.exists(tmp_path):
+                    os.replace(tmp_path, path)
+            os.remove(self.journal_path)
+        except Exception as e:
+            print(f"恢复批量写入失败: {e}")
+            return False
+        return True
+
     def load_diary(self, date):
         """加载日记内容"""
         path = self.get_diary_path(date)
@@ -159,6 +364,204 @@ class FileManager:
             print(f"加载日记失败: {e}")
             return ""
 
+    # ==================== 日期索引与预读 ====================
+    def _ensure_diary_index(self):
+        """构建日记日期索引（只读取目录结构，不读取文件内容）"""
+        if self._diary_index is not None:
+            return self._diary_index
+
+        dates = []
+        try:
+            for year in os.listdir(self.user_diary_dir):
+                year_dir = os.path.join(self.user_diary_dir, year)
+                if not (year.isdigit() and os.path.isdir(year_dir)):
+                    continue
+                for month in os.listdir(year_dir):
+                    month_dir = os.path.join(year_dir, month)
+                    if not (month.isdigit() and os.path.isdir(month_dir)):
+                        continue
+                    for file in os.listdir(month_dir):
+                        if file.endswith('.md') and len(file) == 13:
+                            dates.append(file[:-3])
+        except OSError as e:
+            print(f"构建日记索引失败: {e}")
+
+        dates.sort()
+        self._diary_index = dates
+        return dates
+
+    def get_diary_dates(self, date_from=None, date_to=None):
+        """有日记文件的日期（yyyy-MM-dd 字符串，闭区间，None 表示不限）"""
+        index = self._ensure_diary_index()
+        lo = bisect.bisect_left(index, date_from) if date_from else 0
+        hi = bisect.bisect_right(index, date_to) if date_to else len(index)
+        return index[lo:hi]
+
+    def get_adjacent_diary_date(self, date, step):
+        """获取有日记文件的前一个 / 后一个日期
+
+        Args:
+            date (QDate): 起始日期（不包含在结果中）
+            step (int): -1 向前查找，1 向后查找
+
+        Returns:
+            QDate | None: 找到的日期，没有则返回 None
+        """
+        index = self._ensure_diary_index()
+        key = date.toString('yyyy-MM-dd')
+        if step < 0:
+            pos = bisect.bisect_left(index, key) - 1
+        else:
+            pos = bisect.bisect_right(index, key)
+        if 0 <= pos < len(index):
+            return QDate.fromString(index[pos], "yyyy-MM-dd")
+        return None
+
+    def _resolve_task_ids(self, contents):
+        """写入前解析重复的任务 ID，并把新 ID 写回内容
+
+        Args:
+            contents (dict): {yyyy-MM-dd: content}，同一批写入的日记
+
+        Returns:
+            dict: {yyyy-MM-dd: content}
+        """
+        store = self._task_store
+        claimed = set()   # 本批中较早日期已使用的 ID
+
+        def taken_for(key):
+            def taken(task_id):
+                if task_id in claimed:
+                    return True
+                # 同一批写入的日期之间移动任务时保留原 ID
+                owner = store.date_of(task_id) if store is not None else None
+                return owner is not None and owner != key and owner not in contents
+            return taken
+
+        result = {}
+        for key in sorted(contents):
+            result[key], ids = resolve_task_ids(key, contents[key], taken_for(key))
+            claimed.update(ids)
+        return result
+
+    def _parse_document(self, key, content, taken=None):
+        """解析日记内容，并为没有 ID 或 ID 重复的任务补全稳定 ID"""
+        document = parse_diary(content)
+        document['todos'] = assign_task_ids(key, document['todos'], taken)
+        return document
+
+    def _task_id_taken(self, key):
+        """任务索引已加载时，判断 ID 是否被其他日期占用（与索引的解析结果一致）"""
+        store = self._task_store
+        if store is None:
+            return None
+        return store.taken_by_other_dates(key)
+
+    def _cache_document(self, key, document):
+        """写入文档缓存（调用方需持有锁）"""
+        self._document_cache[key] = document
+        self._document_cache.move_to_end(key)
+        while len(self._document_cache) > self._document_cache_size:
+            self._document_cache.popitem(last=False)
+
+    def load_diary_document(self, date):
+        """加载解析后的日记文档，优先使用预读缓存
+
+        返回的文档会被缓存共享，调用方不应修改其内容。
+        """
+        key = date.toString('yyyy-MM-dd')
+        with self._document_lock:
+            document = self._document_cache.get(key)
+            if document is not None:
+                self._document_cache.move_to_end(key)
+                return document
+            version = self._document_versions.get(key, 0)
+
+        document = self._parse_document(key, self.load_diary(date), self._task_id_taken(key))
+        with self._document_lock:
+            if self._document_versions.get(key, 0) == version:
+                self._cache_document(key, document)
+        return document
+
+    def prefetch_diaries(self, dates):
+        """在后台线程中预读并解析指定日期的日记"""
+        if self._prefetch_executor is None:
+            self._prefetch_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="diary-prefetch")
+
+        for date in dates:
+            if date is None or not date.isValid():
+                continue
+            key = date.toString('yyyy-MM-dd')
+            with self._document_lock:
+                if key in self._document_cache:
+                    continue
+            self._prefetch_executor.submit(self._prefetch_one, QDate(date))
+
+    def _prefetch_one(self, date):
+        try:
+            self.load_diary_document(date)
+        except Exception as e:
+            print(f"预读日记失败: {e}")
+
+    def get_task_store(self):
+        """获取跨日期任务索引（首次调用时从缓存加载并与磁盘对账）"""
+        if self._task_store is None:
+            with self._lazy_lock:
+                if self._task_store is None:
+                    store = TaskStore(self.user_diary_dir,
+                                      os.path.join(self.cache_dir, "task_index.json"))
+                    store.load()
+                    self._task_store = store
+        return self._task_store
+
+    def get_reminder_scheduler(self):
+        """获取任务提醒调度器（随任务索引增量更新）"""
+        if self._reminder_scheduler is None:
+            with self._lazy_lock:
+                if self._reminder_scheduler is None:
+                    store = self.get_task_store()
+                    scheduler = ReminderScheduler(store)
+                    scheduler.rebuild()
+                    store.add_listener(scheduler.update_dates)
+                    self._reminder_scheduler = scheduler
+        return self._reminder_scheduler
+
+    def get_search_index(self):
+        """获取日记和笔记的全文索引（每次查询前调用 sync() 与磁盘对账）
+
+        配置项 search_index 为 "bloom" 时使用按月分片的布隆过滤器
+        （只占很少的空间，适合磁盘较慢的情况），默认使用完整的三元组倒排索引。
+        """
+        if self._search_index is None:
+            with self._lazy_lock:
+                if self._search_index is None:
+                    config = self.__load_config()
+                    if config.get("search_index", "full") == "bloom":
+                        self._search_index = ShardBloomIndex(
+                            self.user_base_path, os.path.join(self.cache_dir, "bloom_filters.json"))
+                    else:
+                        self._search_index = SearchIndex(
+                            self.user_base_path, os.path.join(self.cache_dir, "search_index.json"))
+        return self._search_index
+
+    def get_recurrence_scheduler(self):
+        """获取循环任务调度器（规则保存在用户目录的 recurring.json）"""
+        if self._recurrence_scheduler is None:
+            with self._lazy_lock:
+                if self._recurrence_scheduler is None:
+                    self._recurrence_scheduler = RecurrenceScheduler(
+                        os.path.join(self.user_base_path, "recurring.json"))
+        return self._recurrence_scheduler
+
+    def get_note_catalog(self):
+        """获取笔记文件名索引（标题、日期、标签）"""
+        if self._note_catalog is None:
+            with self._lazy_lock:
+                if self._note_catalog is None:
+                    self._note_catalog = NoteCatalog(self.user_note_dir)
+        return self._note_catalog
+
     def get_note_dir(self):
         """获取快速笔记目录"""
         return self.user_note_dir
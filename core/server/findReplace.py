@@ -0,0 +1,150 @@
+import os
+import re
+from PyQt6.QtCore import QDate
+from .grepSearch import iter_grep, literal_prefilter
+
+try:
+    import re._parser as sre_parse  # Python 3.11+
+    import re._constants as sre_constants
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+# ======================
+# 查找与替换
+# ======================
+def compile_pattern(query, regex=False, case_sensitive=False):
+    """把查询编译为正则表达式，语法错误时抛出 re.error"""
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    return re.compile(query if regex else re.escape(query), flags)
+
+
+def required_literals(query, regex=False):
+    """提取匹配结果中一定会出现的字符串，用于在全文索引中挑选候选文件
+
+    普通查询就是查询串本身；正则只提取顶层连续的普通字符
+    （包含顶层分支等无法确定的结构时返回空列表，表示不能过滤）。
+    """
+    if not regex:
+        return [query]
+    try:
+        parsed = sre_parse.parse(query)
+    except re.error:
+        return []
+
+    literals = []
+    current = []
+    for op, value in parsed:
+        if op == sre_constants.LITERAL:
+            current.append(chr(value))
+            continue
+        if op == sre_constants.BRANCH:
+            return []
+        if current:
+            literals.append("".join(current))
+            current = []
+    if current:
+        literals.append("".join(current))
+    return literals
+
+
+class FindReplace:
+    """
+    全库查找替换（日记和笔记）
+    find() 先用全文索引挑出可能包含查询串的文件（索引无法过滤时扫描全部文件），
+    再在进程池中并行 grep，结果按批次流式返回；replace() 重新读取选中的文件并替换，所有文件通过
+    FileManager.save_diaries 作为一次原子批量写入提交。
+    """
+
+    def __init__(self, file_manager, query, regex=False, case_sensitive=False,
+                 include_diaries=True, include_notes=True):
+        self.file_manager = file_manager
+        self.query = query
+        self.regex = regex
+        self.pattern = compile_pattern(query, regex, case_sensitive)
+        self.roots = tuple(root for root, enabled in (("Diary/", include_diaries),
+                                                      ("QuickNote/", include_notes)) if enabled)
+        self.results = []     # [(相对路径, 匹配总数, 预览匹配), ...]
+
+    def find(self, progress=None, cancelled=None, on_results=None, max_workers=None):
+        """查找所有匹配
+
+        Args:
+            progress (callable | None): progress(已完成数, 总数)
+            cancelled (callable | None): 返回 True 时停止扫描
+            on_results (callable | None): 每扫描完一批文件回调一次 on_results(本批结果)
+
+        Returns:
+            list | None: 结果列表（按路径排序），被取消时返回 None
+        """
+        literals = required_literals(self.query, self.regex)
+        index = self.file_manager.get_search_index()
+        files = index.sync()
+        # 索引无法过滤时（正则、过短的查询）直接 grep 全部文件
+        candidates = index.candidates(literals)
+        if candidates is None:
+            candidates = files.keys()
+
+        jobs = [(rel_path, files[rel_path][0]) for rel_path in sorted(candidates)
+                if rel_path in files and rel_path.startswith(self.roots)]
+        if progress is not None:
+            progress(0, len(jobs))
+
+        results = []
+        prefilter = literal_prefilter(literals, not self.pattern.flags & re.IGNORECASE)
+        for done, total, batch in iter_grep(jobs, self.pattern, prefilter,
+                                            cancelled=cancelled, max_workers=max_workers):
+            results.extend(batch)
+            if batch and on_results is not None:
+                on_results(batch)
+            if progress is not None:
+                progress(done, total)
+        if cancelled is not None and cancelled():
+            return None
+
+        results.sort()
+        self.results = results
+        return results
+
+    def replace(self, replacement, rel_paths=None):
+        """把选中文件中的所有匹配替换为 replacement
+
+        Args:
+            rel_paths (iterable | None): 需要替换的文件，默认为 find() 找到的全部文件
+
+        Returns:
+            int: 替换的总次数，写入失败返回 -1（此时不会修改任何文件）
+        """
+        if rel_paths is None:
+            rel_paths = [rel_path for rel_path, _count, _matches in self.results]
+        if not self.regex:
+            # 普通模式下替换文本中的反斜杠不作转义处理
+            replacement = replacement.replace('\\', '\\\\')
+
+        diaries, notes = {}, {}
+        total = 0
+        for rel_path in rel_paths:
+            path = os.path.join(self.file_manager.user_base_path, *rel_path.split('/'))
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except Exception as e:
+                print(f"读取文件失败: {e}")
+                return -1
+            new_content, count = self.pattern.subn(replacement, content)
+            if not count:
+                continue
+            name = os.path.basename(rel_path)
+            if rel_path.startswith("Diary/"):
+                date = QDate.fromString(name[:-3], "yyyy-MM-dd")
+                if not date.isValid():
+                    print(f"跳过无法识别日期的日记文件: {rel_path}")
+                    continue
+                diaries[date] = new_content
+            else:
+                notes[name] = new_content
+            total += count
+
+        if not self.file_manager.save_diaries(diaries, notes=notes):
+            return -1
+        return total
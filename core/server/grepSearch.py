@@ -0,0 +1,153 @@
+import os
+import re
+import mmap
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# 文件较少时直接在当前进程扫描，避免启动进程池的开销
+PROCESS_POOL_THRESHOLD = 16
+# 每个进程任务包含的文件数（减少进程间通信次数）
+BATCH_SIZE = 32
+# 每个文件最多返回的预览匹配数
+MAX_PREVIEW_MATCHES = 50
+
+# ======================
+# 并行 grep
+# ======================
+def literal_prefilter(literals, case_sensitive):
+    """把必须出现的字符串编译成 bytes 正则，用于在映射的文件上快速排除
+
+    不区分大小写时 bytes 正则只能正确处理 ASCII，含非 ASCII 字母的
+    字符串无法安全预过滤，此时返回 None。
+    """
+    encoded = []
+    for literal in literals:
+        if not literal:
+            continue
+        if not case_sensitive and not literal.isascii() and literal.lower() != literal.upper():
+            continue
+        encoded.append(re.escape(literal.encode('utf-8')))
+    if not encoded:
+        return None
+    # 用最长的字符串预过滤即可排除绝大多数文件
+    longest = max(encoded, key=len)
+    return (longest, 0 if case_sensitive else re.IGNORECASE)
+
+
+def collect_matches(content, pattern, max_matches=MAX_PREVIEW_MATCHES):
+    """在文本中查找所有匹配
+
+    Returns:
+        tuple: (匹配总数, [(行号, 行文本, 起始列, 结束列), ...])
+    """
+    matches = []
+    count = 0
+    line_no = 0
+    line_start = 0
+    for match in pattern.finditer(content):
+        count += 1
+        if len(matches) >= max_matches:
+            continue
+        # 增量计算行号，避免每次从头统计换行
+        line_no += content.count("\n", line_start, match.start())
+        line_start = content.rfind("\n", 0, match.start()) + 1
+        line_end = content.find("\n", match.start())
+        if line_end == -1:
+            line_end = len(content)
+        start = match.start() - line_start
+        end = min(match.end(), line_end) - line_start
+        matches.append((line_no + 1, content[line_start:line_end], start, end))
+    return count, matches
+
+
+def grep_file(path, pattern, prefilter=None):
+    """用内存映射读取文件并查找
+
+    先在映射的字节上做预过滤（不需要解码和复制），
+    只有可能匹配的文件才解码后运行完整的正则。
+
+    Returns:
+        tuple: (匹配总数, 预览匹配)，读取失败或没有匹配时匹配总数为 0
+    """
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return 0, []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if prefilter is not None and prefilter.search(mm) is None:
+                    return 0, []
+                content = mm[:].decode('utf-8', errors='replace')
+    except (OSError, ValueError) as e:
+        print(f"读取文件失败: {e}")
+        return 0, []
+    return collect_matches(content, pattern)
+
+
+def grep_batch(args):
+    """扫描一批文件（在进程池中执行，必须是模块级函数）
+
+    Args:
+        args: ([(相对路径, 绝对路径), ...], 正则源码, 正则 flags, 预过滤 (bytes 源码, flags) 或 None)
+
+    Returns:
+        tuple: (扫描的文件数, [(相对路径, 匹配总数, 预览匹配), ...])
+    """
+    files, source, flags, prefilter = args
+    pattern = re.compile(source, flags)
+    prefilter = re.compile(*prefilter) if prefilter else None
+    results = []
+    for rel_path, path in files:
+        count, matches = grep_file(path, pattern, prefilter)
+        if count:
+            results.append((rel_path, count, matches))
+    return len(files), results
+
+
+def iter_grep(files, pattern, prefilter=None, cancelled=None, max_workers=None):
+    """并行扫描文件，按批次流式返回结果
+
+    Args:
+        files (list): [(相对路径, 绝对路径), ...]
+        pattern: 编译好的 str 正则
+        prefilter: literal_prefilter 的返回值
+        cancelled (callable | None): 返回 True 时停止并丢弃尚未开始的批次
+
+    Yields:
+        tuple: (已扫描文件数, 文件总数, 本批次结果列表)
+    """
+    total = len(files)
+    batches = [(files[i:i+BATCH_SIZE], pattern.pattern, pattern.flags, prefilter)
+               for i in range(0, total, BATCH_SIZE)]
+    done = 0
+
+    if total <= PROCESS_POOL_THRESHOLD:
+        for batch in batches:
+            if cancelled is not None and cancelled():
+                return
+            scanned, results = grep_batch(batch)
+            done += scanned
+            yield done, total, results
+        return
+
+    workers = max_workers or min(os.cpu_count() or 1, 8)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # 同时在途的批次数量有限，取消时不必等待整棵目录扫描完
+        pending = set()
+        queue = iter(batches)
+        for batch in queue:
+            pending.add(executor.submit(grep_batch, batch))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            finished, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            if cancelled is not None and cancelled():
+                return
+            for future in finished:
+                scanned, results = future.result()
+                done += scanned
+                yield done, total, results
+                batch = next(queue, None)
+                if batch is not None:
+                    pending.add(executor.submit(grep_batch, batch))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
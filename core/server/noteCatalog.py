@@ -0,0 +1,108 @@
+import os
+import bisect
+import threading
+
+# ======================
+# 笔记目录索引
+# ======================
+class NoteEntry:
+    """从笔记文件名解析出的元数据"""
+    __slots__ = ('filename', 'date', 'title', 'tags')
+
+    def __init__(self, filename, date, title, tags):
+        self.filename = filename
+        self.date = date        # yyyy-MM-dd，非标准文件名为 None
+        self.title = title
+        self.tags = tuple(tags)
+
+    @classmethod
+    def from_filename(cls, filename):
+        """解析 "20230714_标题_#标签1_#标签2.md" 格式的文件名"""
+        stem = filename[:-3] if filename.endswith('.md') else filename
+        parts = stem.split('_')
+        if '_' in stem and len(parts[0]) == 8 and parts[0].isdigit():
+            date = f"{parts[0][:4]}-{parts[0][4:6]}-{parts[0][6:8]}"
+            title = ' '.join(p for p in parts[1:] if not p.startswith('#'))
+            tags = [p[1:] for p in parts if p.startswith('#')]
+            return cls(filename, date, title, tags)
+        return cls(filename, None, stem.replace('_', ' '), [])
+
+    def __repr__(self):
+        return f"NoteEntry({self.filename!r})"
+
+
+class NoteCatalog:
+    """笔记文件名的内存索引
+
+    笔记的日期、标题和标签都编码在文件名里，列目录即可建立索引，
+    不需要读取文件内容。目录的修改时间变化（新建、重命名、删除笔记）
+    时才重新列目录，按标签建立倒排集合，按日期保存排序列表以便二分查找。
+    """
+
+    def __init__(self, note_dir):
+        self.note_dir = note_dir
+        self._entries = {}      # 文件名 -> NoteEntry
+        self._by_tag = {}       # 标签 -> {文件名}
+        self._by_date = []      # [(日期, 文件名)]（排序）
+        self._dir_mtime = None
+        self.version = 0        # 每次重建加一，供依赖方判断是否需要更新
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        """目录有变化时重新建立索引"""
+        try:
+            mtime = os.path.getmtime(self.note_dir)
+        except OSError:
+            mtime = None
+        with self._lock:
+            if not force and mtime is not None and mtime == self._dir_mtime:
+                return
+            try:
+                names = [name for name in os.listdir(self.note_dir) if name.endswith('.md')]
+            except OSError:
+                names = []
+
+            entries = {}
+            by_tag = {}
+            by_date = []
+            for name in names:
+                entry = NoteEntry.from_filename(name)
+                entries[name] = entry
+                for tag in entry.tags:
+                    by_tag.setdefault(tag, set()).add(name)
+                if entry.date:
+                    by_date.append((entry.date, name))
+            by_date.sort()
+
+            self._entries = entries
+            self._by_tag = by_tag
+            self._by_date = by_date
+            self._dir_mtime = mtime
+            self.version += 1
+
+    # ==================== 查询接口 ====================
+    def get(self, filename):
+        return self._entries.get(filename)
+
+    def entries(self):
+        self.refresh()
+        return list(self._entries.values())
+
+    def all_tags(self):
+        self.refresh()
+        return sorted(self._by_tag)
+
+    def filenames_with_tag(self, tag):
+        self.refresh()
+        return set(self._by_tag.get(tag, ()))
+
+    def filenames_between(self, date_from=None, date_to=None):
+        """日期在闭区间内的笔记（yyyy-MM-dd，None 表示不限）"""
+        self.refresh()
+        lo = bisect.bisect_left(self._by_date, (date_from,)) if date_from else 0
+        hi = bisect.bisect_right(self._by_date, (date_to, '\uffff')) if date_to else len(self._by_date)
+        return {name for _date, name in self._by_date[lo:hi]}
+
+    def __len__(self):
+        self.refresh()
+        return len(self._entries)
@@ -0,0 +1,277 @@
+import os
+import re
+import calendar
+
+# ======================
+# 结构化查询
+# ======================
+# 字段:值、"引号短语"、普通词
+TOKEN_RE = re.compile(r'(\w+):("[^"]*"|\S+)|"([^"]*)"|(\S+)')
+
+PRIORITIES = {"high": "High", "medium": "Medium", "low": "Low",
+              "高": "High", "中": "Medium", "低": "Low"}
+BOOLEANS = {"true": True, "yes": True, "1": True, "是": True,
+            "false": False, "no": False, "0": False, "否": False}
+_UNSET = object()
+
+KIND_ALIASES = {"note": "note", "笔记": "note", "diary": "diary", "日记": "diary",
+                "task": "task", "todo": "task", "任务": "task"}
+
+
+class Query:
+    """解析后的查询条件（各条件之间是“且”的关系）"""
+
+    def __init__(self):
+        self.tags = []          # tag:
+        self.priority = None    # priority: High / Medium / Low
+        self.done = None        # done: True / False
+        self.date_from = None   # date: yyyy-MM-dd 闭区间
+        self.date_to = None
+        self.kinds = set()      # type: note / diary / task，空表示不限
+        self.terms = []         # 文本词（不区分大小写的子串）
+
+    def has_task_filters(self):
+        """是否包含只有任务才有的条件"""
+        return self.priority is not None or self.done is not None
+
+    def is_empty(self):
+        return not (self.tags or self.priority or self.done is not None or self.date_from
+                    or self.date_to or self.kinds or self.terms)
+
+    def wants(self, kind):
+        return not self.kinds or kind in self.kinds
+
+
+def is_structured_query(text):
+    """输入中是否使用了字段或引号语法（否则按普通关键字处理）"""
+    for match in TOKEN_RE.finditer(text):
+        field, _value, phrase, _word = match.groups()
+        if phrase is not None or (field is not None and field.lower() in FIELD_PARSERS):
+            return True
+    return False
+
+
+def _date_bound(value, end=False):
+    """把 yyyy / yyyy-MM / yyyy-MM-dd 解析为区间的起点或终点"""
+    parts = value.split('-')
+    try:
+        year = int(parts[0])
+        month = int(parts[1]) if len(parts) > 1 else (12 if end else 1)
+        if len(parts) > 2:
+            day = int(parts[2])
+        else:
+            day = calendar.monthrange(year, month)[1] if end else 1
+        return f"{year:04d}-{month:02d}-{day:02d}"
+    except (ValueError, IndexError):
+        return None
+
+
+def _parse_tag(query, value):
+    query.tags.append(value.lstrip('#'))
+    return True
+
+
+def _parse_priority(query, value):
+    query.priority = PRIORITIES.get(value.lower())
+    return query.priority is not None
+
+
+def _parse_done(query, value):
+    query.done = BOOLEANS.get(value.lower())
+    return query.done is not None
+
+
+def _parse_date(query, value):
+    if '..' in value:
+        start, end = value.split('..', 1)
+    else:
+        start = end = value
+    date_from = _date_bound(start) if start else None
+    date_to = _date_bound(end, end=True) if end else None
+    if (start and date_from is None) or (end and date_to is None):
+        return False
+    query.date_from, query.date_to = date_from, date_to
+    return True
+
+
+def _parse_type(query, value):
+    kind = KIND_ALIASES.get(value.lower())
+    if kind is not None:
+        query.kinds.add(kind)
+    return kind is not None
+
+
+FIELD_PARSERS = {
+    "tag": _parse_tag,
+    "priority": _parse_priority,
+    "done": _parse_done,
+    "date": _parse_date,
+    "type": _parse_type,
+}
+
+
+def parse_query(text):
+    """解析查询字符串
+
+    例如: tag:工作 priority:high done:false date:2025-06..2025-08 "关键字"
+    无法识别的字段或取值按普通文本词处理。
+    """
+    query = Query()
+    for match in TOKEN_RE.finditer(text):
+        field, value, phrase, word = match.groups()
+        if field is not None:
+            value = value.strip('"')
+            parser = FIELD_PARSERS.get(field.lower())
+            if parser is not None and value and parser(query, value):
+                continue
+            query.terms.append(match.group(0).lower())
+        elif phrase is not None:
+            if phrase:
+                query.terms.append(phrase.lower())
+        else:
+            query.terms.append(word.lower())
+    return query
+
+
+class QueryPlanner:
+    """
+    把查询编译为索引查找
+    每个条件都对应一个索引上的候选集合，按从小到大求交集：
+        - 任务：TaskStore 的状态 / 优先级 / 标签 / 日期倒排集合
+        - 笔记：NoteCatalog 的标签倒排集合和日期排序列表
+        - 日记：日记日期索引，以及包含匹配任务的日期
+        - 文本词：全文索引（或布隆过滤器）给出的候选文件
+    全文索引只给出可能包含的文件，最后只读取交集中的少量文件确认文本。
+    """
+
+    def __init__(self, file_manager):
+        self.file_manager = file_manager
+
+    def search(self, query):
+        """执行查询（各 find_* 也可单独调用，未传入 text_files 时自行查询全文索引）
+
+        Args:
+            query (Query | str): 查询
+
+        Returns:
+            dict: {'task': [Task, ...], 'note': [文件名, ...], 'diary': [yyyy-MM-dd, ...]}
+        """
+        if isinstance(query, str):
+            query = parse_query(query)
+        text_files = self._text_candidates(query)
+        return {
+            'task': self.find_tasks(query, text_files) if query.wants('task') else [],
+            'note': self.find_notes(query, text_files) if query.wants('note') else [],
+            'diary': self.find_diaries(query, text_files) if query.wants('diary') else [],
+        }
+
+    # ==================== 候选集合 ====================
+    def _text_candidates(self, query):
+        """文本词对应的候选文件（相对路径集合），没有文本词或无法过滤时返回 None"""
+        if not query.terms:
+            return None
+        index = self.file_manager.get_search_index()
+        index.sync()
+        return index.candidates(query.terms)
+
+    @staticmethod
+    def _intersect(candidates):
+        """从最小的集合开始求交集，None 表示不限"""
+        sets = sorted((c for c in candidates if c is not None), key=len)
+        if not sets:
+            return None
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+            if not result:
+                break
+        return result
+
+    def _file_contains(self, rel_path, terms):
+        path = os.path.join(self.file_manager.user_base_path, *rel_path.split('/'))
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read().lower()
+        except Exception:
+            return False
+        return all(term in content for term in terms)
+
+    # ==================== 各类结果 ====================
+    def find_tasks(self, query, text_files=_UNSET):
+        if text_files is _UNSET:
+            text_files = self._text_candidates(query)
+        store = self.file_manager.get_task_store()
+        ids = store.query_ids(completed=query.done, priority=query.priority, tags=query.tags,
+                              date_from=query.date_from, date_to=query.date_to)
+        if text_files is not None:
+            # 任务文本包含查询词，则所在的日记文件一定在全文索引的候选中
+            dates = {os.path.basename(rel_path)[:-3] for rel_path in text_files
+                     if rel_path.startswith("Diary/")}
+            ids = {task_id for task_id in ids if store.get(task_id).date in dates}
+        tasks = store.sort_tasks(ids)
+        # 任务文本都在内存中，直接检查即可
+        return [task for task in tasks
+                if all(term in task.text.lower() for term in query.terms)]
+
+    def find_notes(self, query, text_files=_UNSET):
+        if query.has_task_filters():
+            return []
+        if text_files is _UNSET:
+            text_files = self._text_candidates(query)
+        catalog = self.file_manager.get_note_catalog()
+        candidates = [catalog.filenames_with_tag(tag) for tag in query.tags]
+        if query.date_from or query.date_to:
+            candidates.append(catalog.filenames_between(query.date_from, query.date_to))
+        names = self._intersect(candidates)
+        if names is None:
+            names = {entry.filename for entry in catalog.entries()}
+
+        results = []
+        term_candidates = {}
+        for name in names:
+            entry = catalog.get(name)
+            if entry is None:
+                continue
+            # 文本词先匹配标题和标签，剩余的词再用全文索引和文件内容确认
+            meta = " ".join((entry.title,) + entry.tags).lower()
+            remaining = [term for term in query.terms if term not in meta]
+            if remaining:
+                rel_path = "QuickNote/" + name
+                key = tuple(remaining)
+                if key not in term_candidates:
+                    # 部分词已在标题中匹配时，只用剩余的词重新挑选候选文件
+                    term_candidates[key] = (text_files if len(remaining) == len(query.terms)
+                                            else self.file_manager.get_search_index().candidates(remaining))
+                allowed = term_candidates[key]
+                if allowed is not None and rel_path not in allowed:
+                    continue
+                if not self._file_contains(rel_path, remaining):
+                    continue
+            results.append(name)
+        return sorted(results)
+
+    def find_diaries(self, query, text_files=_UNSET):
+        if text_files is _UNSET:
+            text_files = self._text_candidates(query)
+        candidates = []
+        if query.tags or query.has_task_filters():
+            store = self.file_manager.get_task_store()
+            ids = store.query_ids(completed=query.done, priority=query.priority, tags=query.tags)
+            candidates.append({store.get(task_id).date for task_id in ids})
+        if query.date_from or query.date_to:
+            candidates.append(set(self.file_manager.get_diary_dates(query.date_from, query.date_to)))
+        if text_files is not None:
+            candidates.append({os.path.basename(rel_path)[:-3] for rel_path in text_files
+                               if rel_path.startswith("Diary/")})
+        dates = self._intersect(candidates)
+        if dates is None:
+            dates = set(self.file_manager.get_diary_dates())
+
+        if query.terms:
+            dates = {date_key for date_key in dates
+                     if self._file_contains(self._diary_rel_path(date_key), query.terms)}
+        return sorted(dates)
+
+    @staticmethod
+    def _diary_rel_path(date_key):
+        return f"Diary/{date_key[:4]}/{date_key[5:7]}/{date_key}.md"
@@ -0,0 +1,84 @@
+import bisect
+from datetime import date as _date
+
+# ======================
+# 快速跳转索引
+# ======================
+class SwitcherIndex:
+    """
+    快速跳转（Ctrl+P）使用的前缀索引
+    笔记标题（以及标题中的每个词）按小写排序保存在数组中，输入前缀后
+    用 bisect 定位到第一个匹配项，向后读取到前缀不再匹配为止；
+    日期直接在 FileManager 已排序的日记日期索引上二分查找。
+    每次按键只做两次二分查找加少量遍历，不随笔记数量线性增长。
+    笔记目录变化时（NoteCatalog.version 改变）才重建数组。
+    """
+
+    def __init__(self, file_manager):
+        self.file_manager = file_manager
+        self._keys = []          # [(小写键, 文件名)]（排序）
+        self._titles = {}        # 文件名 -> 显示标题
+        self._version = None
+
+    def _ensure_current(self):
+        catalog = self.file_manager.get_note_catalog()
+        catalog.refresh()
+        if catalog.version == self._version:
+            return
+        keys = []
+        titles = {}
+        for entry in catalog.entries():
+            title = entry.title or entry.filename[:-3]
+            titles[entry.filename] = title
+            lowered = title.lower()
+            keys.append((lowered, entry.filename))
+            # 标题中间的词也能作为前缀匹配
+            for word in lowered.split()[1:]:
+                keys.append((word, entry.filename))
+        keys.sort()
+        self._keys = keys
+        self._titles = titles
+        self._version = catalog.version
+
+    def search(self, text, limit=20):
+        """按前缀查找笔记和日期
+
+        Returns:
+            list: [(类型 "note" / "date", 值, 显示文本), ...]，
+                  值为笔记文件名或 yyyy-MM-dd
+        """
+        prefix = text.strip().lower()
+        if not prefix:
+            return []
+        results = []
+
+        # 日期：输入以数字开头时优先匹配有日记的日期
+        if prefix[0].isdigit():
+            exact = self._parse_date(prefix)
+            if exact is not None:
+                results.append(("date", exact, f"日期: {exact}"))
+            for date_key in self.file_manager.get_diary_dates(prefix, prefix + "\uffff")[:limit]:
+                if date_key != exact:
+                    results.append(("date", date_key, f"日期: {date_key}"))
+
+        # 笔记标题
+        self._ensure_current()
+        seen = set()
+        pos = bisect.bisect_left(self._keys, (prefix,))
+        while pos < len(self._keys) and len(results) < limit:
+            key, filename = self._keys[pos]
+            if not key.startswith(prefix):
+                break
+            if filename not in seen:
+                seen.add(filename)
+                results.append(("note", filename, f"笔记: {self._titles[filename]}"))
+            pos += 1
+        return results[:limit]
+
+    @staticmethod
+    def _parse_date(text):
+        """完整的 yyyy-MM-dd 日期（即使当天没有日记也可以跳转）"""
+        try:
+            return _date.fromisoformat(text).isoformat() if len(text) == 10 else None
+        except ValueError:
+            return None
@@ -0,0 +1,261 @@
+import os
+import json
+import heapq
+import calendar
+from datetime import date, timedelta
+from .diaryParser import new_task_id
+
+# ======================
+# 循环任务调度
+# ======================
+FREQUENCIES = ("daily", "weekly", "monthly")
+
+# 每日状态的紧凑编码
+STATE_DONE = "d"
+STATE_SKIPPED = "s"
+
+
+def _parse_date(date_key):
+    return date.fromisoformat(date_key)
+
+
+def next_occurrence(rule, after):
+    """计算规则在 after（含）之后的第一次出现日期
+
+    Args:
+        rule (dict): 循环规则
+        after (date): 起始日期
+
+    Returns:
+        date | None: 没有后续出现时返回 None
+    """
+    start = _parse_date(rule['start'])
+    end = _parse_date(rule['end']) if rule.get('end') else None
+    interval = max(1, int(rule.get('interval', 1)))
+    current = max(start, after)
+
+    if rule['freq'] == "daily":
+        offset = (current - start).days % interval
+        if offset:
+            current += timedelta(days=interval - offset)
+
+    elif rule['freq'] == "weekly":
+        weekdays = set(rule.get('weekdays') or [start.isoweekday()])
+        start_week = start - timedelta(days=start.isoweekday() - 1)
+        # 最多向后查找 interval 周（每周 7 天）即可找到下一次
+        for _ in range(7 * interval + 7):
+            week_index = (current - start_week).days // 7
+            if week_index % interval == 0 and current.isoweekday() in weekdays:
+                break
+            current += timedelta(days=1)
+        else:
+            return None
+
+    elif rule['freq'] == "monthly":
+        monthday = int(rule.get('monthday') or start.day)
+        months = (current.year - start.year) * 12 + current.month - start.month
+        # 跳过没有该日期的月份（例如 31 号）
+        for _ in range(48):
+            offset = months % interval
+            if offset:
+                months += interval - offset
+            year = start.year + (start.month - 1 + months) // 12
+            month = (start.month - 1 + months) % 12 + 1
+            if monthday <= calendar.monthrange(year, month)[1]:
+                candidate = date(year, month, monthday)
+                if candidate >= current:
+                    current = candidate
+                    break
+            months += interval
+        else:
+            return None
+    else:
+        return None
+
+    if end is not None and current > end:
+        return None
+    return current
+
+
+class RecurrenceScheduler:
+    """
+    循环任务调度器
+    规则保存在 recurring.json 中，调度器用小顶堆把一个时间窗口内的
+    所有出现日期预先展开为 {日期: [规则ID]} 索引；load_today 等查询
+    只做一次字典查找，不会对每个日期重新计算所有规则。
+    每次出现的完成/跳过状态按日期紧凑存储为 {日期: {规则ID: 'd'|'s'}}。
+    """
+    WINDOW_BEFORE = 31
+    WINDOW_AFTER = 90
+
+    def __init__(self, path):
+        self.path = path
+        self.rules = {}
+        self.states = {}
+        self._occurrences = {}
+        self._window = None   # (start, end)
+        self._load()
+
+    # ==================== 持久化 ====================
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.rules = {rule['id']: rule for rule in data.get("rules", [])}
+            self.states = data.get("states", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"加载循环任务失败: {e}")
+
+    def _save(self):
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"rules": list(self.rules.values()), "states": self.states},
+                          f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            print(f"保存循环任务失败: {e}")
+            return False
+
+    # ==================== 规则管理 ====================
+    def add_rule(self, text, freq, start, interval=1, weekdays=None, monthday=None,
+                 end=None, priority=None, tags=None):
+        """添加循环规则，返回新规则字典"""
+        if freq not in FREQUENCIES:
+            raise ValueError(f"未知循环频率: {freq}")
+        rule = {
+            'id': new_task_id(),
+            'text': text,
+            'freq': freq,
+            'interval': max(1, int(interval)),
+            'start': start,
+            'end': end,
+            'weekdays': sorted(weekdays) if weekdays else None,
+            'monthday': monthday,
+            'priority': priority,
+            'tags': list(tags or [])
+        }
+        self.rules[rule['id']] = rule
+        self._invalidate()
+        self._save()
+        return rule
+
+    def update_rule(self, rule_id, **changes):
+        """修改规则字段（文本、优先级、标签等）"""
+        return self.update_rules({rule_id: changes})
+
+    def update_rules(self, changes_by_rule):
+        """批量修改多条规则，只写一次文件
+
+        Args:
+            changes_by_rule (dict): {规则ID: {字段: 新值}}
+        """
+        changed = False
+        for rule_id, changes in changes_by_rule.items():
+            rule = self.rules.get(rule_id)
+            if rule is None:
+                continue
+            rule.update(changes)
+            changed = True
+            # 只有影响出现日期的字段才需要重新展开
+            if set(changes) & {'freq', 'interval', 'start', 'end', 'weekdays', 'monthday'}:
+                self._invalidate()
+        return self._save() if changed else False
+
+    def remove_rule(self, rule_id):
+        """删除规则及其所有出现状态"""
+        if self.rules.pop(rule_id, None) is None:
+            return False
+        for date_key in list(self.states):
+            self.states[date_key].pop(rule_id, None)
+            if not self.states[date_key]:
+                del self.states[date_key]
+        self._invalidate()
+        return self._save()
+
+    def list_rules(self):
+        return list(self.rules.values())
+
+    # ==================== 出现日期索引 ====================
+    def _invalidate(self):
+        self._window = None
+        self._occurrences = {}
+
+    def _expand(self, center):
+        """以 center 为中心展开一个时间窗口内的所有出现日期"""
+        start = center - timedelta(days=self.WINDOW_BEFORE)
+        end = center + timedelta(days=self.WINDOW_AFTER)
+        occurrences = {}
+
+        heap = []
+        for rule_id, rule in self.rules.items():
+            first = next_occurrence(rule, start)
+            if first is not None and first <= end:
+                heap.append((first, rule_id))
+        heapq.heapify(heap)
+
+        while heap:
+            day, rule_id = heapq.heappop(heap)
+            occurrences.setdefault(day.isoformat(), []).append(rule_id)
+            following = next_occurrence(self.rules[rule_id], day + timedelta(days=1))
+            if following is not None and following <= end:
+                heapq.heappush(heap, (following, rule_id))
+
+        self._occurrences = occurrences
+        self._window = (start, end)
+
+    def occurrences_on(self, date_key):
+        """获取某天出现的规则 ID 列表"""
+        day = _parse_date(date_key)
+        if self._window is None or not (self._window[0] <= day <= self._window[1]):
+            self._expand(day)
+        return self._occurrences.get(date_key, [])
+
+    # ==================== 出现状态 ====================
+    def get_state(self, date_key, rule_id):
+        return self.states.get(date_key, {}).get(rule_id)
+
+    def set_state(self, date_key, rule_id, state):
+        """设置某次出现的状态：STATE_DONE、STATE_SKIPPED 或 None（未完成）"""
+        return self.set_states(date_key, {rule_id: state})
+
+    def set_states(self, date_key, states):
+        """批量设置同一天多个规则的出现状态，只写一次文件
+
+        Args:
+            states (dict): {规则ID: STATE_DONE | STATE_SKIPPED | None}
+        """
+        day_states = self.states.setdefault(date_key, {})
+        for rule_id, state in states.items():
+            if state is None:
+                day_states.pop(rule_id, None)
+            else:
+                day_states[rule_id] = state
+        if not day_states:
+            del self.states[date_key]
+        return self._save()
+
+    def tasks_for(self, date_key):
+        """获取某天需要显示的循环任务（已跳过的不返回）
+
+        Returns:
+            list: 与日记任务相同结构的字典，额外带有 'recurrence' 字段
+        """
+        tasks = []
+        for rule_id in self.occurrences_on(date_key):
+            state = self.get_state(date_key, rule_id)
+            if state == STATE_SKIPPED:
+                continue
+            rule = self.rules[rule_id]
+            tasks.append({
+                'id': f"{rule_id}@{date_key}",
+                'text': rule['text'],
+                'completed': state == STATE_DONE,
+                'priority': rule.get('priority'),
+                'tags': list(rule.get('tags') or []),
+                'recurrence': rule_id
+            })
+        return tasks
@@ -0,0 +1,106 @@
+import heapq
+from datetime import datetime
+from .diaryParser import resolve_remind_time
+
+# ======================
+# 任务提醒调度
+# ======================
+class ReminderScheduler:
+    """
+    任务提醒调度器
+    所有未完成且设置了提醒时间的任务放在一个按提醒时刻排序的小顶堆中，
+    界面层只需要一个定时器对准 next_deadline()，到点后调用 pop_due()，
+    不需要轮询日记文件。
+    日记保存后通过 update_dates 只重建受影响日期的条目；
+    被替换的旧条目留在堆中，出堆时与 _entries 比对后丢弃（惰性删除）。
+    """
+
+    def __init__(self, task_store):
+        self.task_store = task_store
+        self._heap = []          # (提醒时刻, task_id)
+        self._entries = {}       # task_id -> (提醒时刻, 日期)
+        self._by_date = {}       # 日期 -> {task_id}
+
+    def rebuild(self, now=None):
+        """从任务索引完整重建提醒堆"""
+        now = now or datetime.now()
+        self._entries = {}
+        self._by_date = {}
+        for task_id in self.task_store.query_ids(completed=False):
+            task = self.task_store.get(task_id)
+            self._add(task, now)
+        self._heap = [(when, task_id) for task_id, (when, _date) in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    def update_dates(self, date_keys, now=None):
+        """日记保存后增量更新指定日期的提醒"""
+        now = now or datetime.now()
+        # 先移除所有变化日期的旧提醒再统一重新登记（与 TaskStore.update_dates 相同），
+        # 任务在这些日期之间移动时，后处理的来源日期不会删掉刚登记的提醒
+        for date_key in date_keys:
+            for task_id in self._by_date.pop(date_key, ()):
+                self._entries.pop(task_id, None)
+        for date_key in date_keys:
+            for task in self.task_store.tasks_on(date_key):
+                if not task.completed and self._add(task, now):
+                    when = self._entries[task.task_id][0]
+                    heapq.heappush(self._heap, (when, task.task_id))
+        self._compact()
+
+    def _add(self, task, now):
+        """登记一个任务的提醒，已过期或没有提醒时间时返回 False"""
+        when = resolve_remind_time(task.date, task.due, task.remind)
+        if when is None or when <= now:
+            return False
+        previous = self._entries.get(task.task_id)
+        if previous is not None and previous[1] != task.date:
+            bucket = self._by_date.get(previous[1])
+            if bucket is not None:
+                bucket.discard(task.task_id)
+                if not bucket:
+                    del self._by_date[previous[1]]
+        self._entries[task.task_id] = (when, task.date)
+        self._by_date.setdefault(task.date, set()).add(task.task_id)
+        return True
+
+    def _is_current(self, when, task_id):
+        entry = self._entries.get(task_id)
+        return entry is not None and entry[0] == when
+
+    def _compact(self):
+        """失效条目过多时重建堆，避免无限增长"""
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(when, task_id) for task_id, (when, _date) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def next_deadline(self):
+        """最近一次提醒的时刻，没有待提醒任务时返回 None"""
+        while self._heap and not self._is_current(*self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now=None):
+        """取出所有已到提醒时刻的任务
+
+        Returns:
+            list: Task 列表，按提醒时刻排列
+        """
+        now = now or datetime.now()
+        due_tasks = []
+        while self._heap and self._heap[0][0] <= now:
+            when, task_id = heapq.heappop(self._heap)
+            if not self._is_current(when, task_id):
+                continue
+            _when, date_key = self._entries.pop(task_id)
+            bucket = self._by_date.get(date_key)
+            if bucket is not None:
+                bucket.discard(task_id)
+                if not bucket:
+                    del self._by_date[date_key]
+            task = self.task_store.get(task_id)
+            if task is not None and not task.completed:
+                due_tasks.append(task)
+        return due_tasks
+
+    def __len__(self):
+        return len(self._entries)
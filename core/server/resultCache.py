@@ -0,0 +1,181 @@
+import os
+import json
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+# ======================
+# 文本处理结果缓存
+# ======================
+def normalize_text(text):
+    """计算缓存键前的规范化：统一 Unicode 形式和换行符，去掉首尾空白"""
+    return unicodedata.normalize('NFC', text).replace('\r\n', '\n').strip()
+
+
+def make_cache_key(operation, model, target_lang, text):
+    """缓存键：(操作, 模型, 目标语言, 规范化文本的哈希)"""
+    digest = hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+    raw = json.dumps([operation, model, target_lang, digest], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    两级结果缓存
+        - 内存：有上限的 LRU（OrderedDict），命中时直接返回
+        - 磁盘：每个结果一个 JSON 文件，跨重启保留；总大小超过上限时
+          按最近访问时间（文件 mtime，命中时更新）淘汰最旧的文件
+    cache_dir 为 None 时只使用内存缓存。
+    """
+    MEMORY_ENTRIES = 256
+    DISK_BYTES = 20 * 1024 * 1024
+
+    def __init__(self, cache_dir=None, memory_entries=MEMORY_ENTRIES, disk_bytes=DISK_BYTES):
+        self.cache_dir = cache_dir
+        self.memory_entries = memory_entries
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_size = None    # 首次写入时统计
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    # ==================== 读写接口 ====================
+    def get(self, key):
+        """返回缓存的值，未命中返回 None"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+        self._write_disk(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._disk_size = 0
+        for path in self._disk_files():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        """命中统计"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_size,
+            }
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    # ==================== 磁盘存储 ====================
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _disk_files(self):
+        if not self.cache_dir:
+            return []
+        try:
+            return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                    if name.endswith('.json')]
+        except OSError:
+            return []
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)["value"]
+            os.utime(path)   # 记录最近访问时间，淘汰时保留常用结果
+            return value
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"读取结果缓存失败: {e}")
+            return None
+
+    def _write_disk(self, key, value):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        try:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"value": value}, f, ensure_ascii=False)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            new_size = os.path.getsize(path)
+        except Exception as e:
+            print(f"写入结果缓存失败: {e}")
+            return
+
+        with self._lock:
+            if self._disk_size is None:
+                self._disk_size = sum(self._file_size(p) for p in self._disk_files())
+            else:
+                self._disk_size += new_size - old_size
+            over_limit = self._disk_size > self.disk_bytes
+        if over_limit:
+            self._evict()
+
+    @staticmethod
+    def _file_size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _evict(self):
+        """删除最久未访问的文件，直到总大小降到上限的 80%"""
+        files = []
+        for path in self._disk_files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        files.sort()
+        total = sum(size for _mtime, size, _path in files)
+        target = self.disk_bytes * 0.8
+        for _mtime, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_size = total
@@ -0,0 +1,175 @@
+import os
+import json
+import threading
+
+# ======================
+# 全文索引
+# ======================
+def text_trigrams(text):
+    """文本（转为小写）中出现的所有三字符片段
+
+    中文没有空格分词，按字符三元组建立索引可以同时覆盖中英文，
+    任何长度不少于 3 的子串，其三元组一定都出现在包含它的文件中。
+    """
+    text = text.lower()
+    return {text[i:i+3] for i in range(len(text) - 2)}
+
+
+DATA_ROOTS = ("Diary", "QuickNote")
+
+
+def scan_data_files(base_path, roots=DATA_ROOTS):
+    """列出日记和笔记文件（只读取目录和文件状态）
+
+    Returns:
+        dict: {相对路径: (绝对路径, mtime)}，相对路径使用 / 分隔
+    """
+    files = {}
+    for root_name in roots:
+        root_dir = os.path.join(base_path, root_name)
+        for root, _dirs, names in os.walk(root_dir):
+            for name in names:
+                if not name.endswith('.md'):
+                    continue
+                path = os.path.join(root, name)
+                rel_path = os.path.relpath(path, base_path).replace(os.sep, '/')
+                try:
+                    files[rel_path] = (path, os.path.getmtime(path))
+                except OSError:
+                    continue
+    return files
+
+
+class SearchIndex:
+    """日记和笔记的三元组倒排索引
+
+    文档以相对用户目录的路径标识（如 "Diary/2025/08/2025-08-01.md"、
+    "QuickNote/xxx.md"）。索引只用来挑选候选文件：查询串的所有三元组
+    都出现的文件才可能包含该串，最终是否匹配仍由调用方扫描文件确认。
+    索引以 {路径: 文件修改时间} 为依据缓存到磁盘，sync() 时只重新读取
+    变化过的文件，因此绕过 FileManager 的改动（重命名、删除）也能被发现。
+    """
+    CACHE_VERSION = 1
+
+    def __init__(self, base_path, cache_path):
+        self.base_path = base_path
+        self.cache_path = cache_path
+
+        self._postings = {}      # 三元组 -> {路径}
+        self._grams = {}         # 路径 -> 三元组拼接串（每 3 个字符一个）
+        self._mtimes = {}        # 路径 -> 索引时的文件修改时间
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    # ==================== 构建与持久化 ====================
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == self.CACHE_VERSION:
+                return data.get("files", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"加载全文索引缓存失败: {e}")
+        return {}
+
+    def sync(self):
+        """与磁盘对账：索引新增或修改过的文件，移除已删除的文件
+
+        Returns:
+            dict: 当前所有文件 {相对路径: (绝对路径, mtime)}
+        """
+        with self._lock:
+            cached = {}
+            if not self._loaded:
+                cached = self._load_cache()
+                self._loaded = True
+
+            on_disk = scan_data_files(self.base_path)
+            changed = False
+            for rel_path in set(self._mtimes) - set(on_disk):
+                self._remove(rel_path)
+                changed = True
+
+            for rel_path, (path, mtime) in on_disk.items():
+                if self._mtimes.get(rel_path) == mtime:
+                    continue
+                entry = cached.get(rel_path)
+                if entry and entry.get("mtime") == mtime:
+                    self._replace(rel_path, entry.get("grams", ""), mtime)
+                    continue
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        content = f.read()
+                except Exception as e:
+                    print(f"读取文件失败: {e}")
+                    continue
+                self._replace(rel_path, "".join(sorted(text_trigrams(content))), mtime)
+                changed = True
+
+            if changed or set(cached) - set(on_disk):
+                self.flush()
+            return on_disk
+
+    def flush(self):
+        """把索引写入缓存文件"""
+        with self._lock:
+            files = {rel_path: {"mtime": mtime, "grams": self._grams.get(rel_path, "")}
+                     for rel_path, mtime in self._mtimes.items()}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.CACHE_VERSION, "files": files}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"保存全文索引缓存失败: {e}")
+
+    # ==================== 增量更新 ====================
+    def _replace(self, rel_path, grams, mtime):
+        self._remove(rel_path)
+        self._grams[rel_path] = grams
+        self._mtimes[rel_path] = mtime
+        for i in range(0, len(grams), 3):
+            self._postings.setdefault(grams[i:i+3], set()).add(rel_path)
+
+    def _remove(self, rel_path):
+        grams = self._grams.pop(rel_path, "")
+        self._mtimes.pop(rel_path, None)
+        for i in range(0, len(grams), 3):
+            gram = grams[i:i+3]
+            bucket = self._postings.get(gram)
+            if bucket is not None:
+                bucket.discard(rel_path)
+                if not bucket:
+                    del self._postings[gram]
+
+    # ==================== 查询接口 ====================
+    def candidates(self, literals):
+        """返回可能同时包含所有 literals 的文件集合
+
+        Args:
+            literals (iterable): 必须出现的字符串（不区分大小写）
+
+        Returns:
+            set | None: 候选文件的相对路径集合；没有可用于过滤的
+                        字符串（都短于 3 个字符）时返回 None，表示需要扫描全部文件
+        """
+        grams = set()
+        for literal in literals:
+            grams |= text_trigrams(literal)
+        if not grams:
+            return None
+
+        with self._lock:
+            buckets = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+            result = set(buckets[0])
+            for bucket in buckets[1:]:
+                result &= bucket
+                if not result:
+                    break
+        return result
+
+    def __len__(self):
+        return len(self._mtimes)
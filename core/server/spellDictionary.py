@@ -0,0 +1,265 @@
+import os
+import json
+import gzip
+import mmap
+import struct
+import pkgutil
+import threading
+from array import array
+
+# ======================
+# 预编译拼写词典
+# ======================
+# 文件格式（小端，4 字节对齐）:
+#   头部     : 魔数 "KDIC"、格式版本、词数、元数据长度
+#   元数据   : JSON（来源标识、字母表），补齐到 4 字节
+#   offsets  : uint32 * (词数 + 1)，每个词在词表中的起始位置
+#   freqs    : uint32 * 词数
+#   词表     : 按 UTF-8 字节序排序的小写单词，以 "\n" 分隔
+# 打开时直接 mmap，查词在 offsets 上二分查找，不需要解析或解压整个词频表。
+MAGIC = b"KDIC"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIII")
+MAX_FREQUENCY = 0xFFFFFFFF
+
+
+def _pad4(data):
+    return data + b" " * (-len(data) % 4)
+
+
+def compile_dictionary(path, frequencies, source):
+    """把 {单词: 词频} 编译为词典文件（先写临时文件再替换）"""
+    words = sorted({word.lower() for word in frequencies}, key=lambda w: w.encode('utf-8'))
+    merged = {}
+    for word, freq in frequencies.items():
+        merged[word.lower()] = merged.get(word.lower(), 0) + freq
+
+    offsets = array('I')
+    freqs = array('I')
+    blob = bytearray()
+    letters = set()
+    for word in words:
+        offsets.append(len(blob))
+        freqs.append(min(merged[word], MAX_FREQUENCY))
+        blob += word.encode('utf-8') + b"\n"
+        letters.update(word)
+    offsets.append(len(blob))
+    if offsets.itemsize != 4:
+        raise RuntimeError("当前平台不支持 32 位无符号数组")
+    if array('I', [1]).tobytes() != struct.pack("<I", 1):
+        offsets.byteswap()
+        freqs.byteswap()
+
+    meta = _pad4(json.dumps({"source": source, "letters": "".join(sorted(letters))},
+                            ensure_ascii=False).encode('utf-8'))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(words), len(meta)))
+        f.write(meta)
+        f.write(offsets.tobytes())
+        f.write(freqs.tobytes())
+        f.write(blob)
+    os.replace(tmp_path, path)
+
+
+def read_metadata(path):
+    """读取词典文件的元数据，文件不存在或格式不符时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            magic, version, _count, meta_len = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                return None
+            return json.loads(f.read(meta_len).decode('utf-8'))
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def pyspellchecker_source(language="en"):
+    """pyspellchecker 自带词频表的来源标识（库版本 + 语言），未安装时返回 None"""
+    try:
+        from importlib.metadata import version
+        return f"pyspellchecker-{version('pyspellchecker')}-{language}"
+    except Exception:
+        return None
+
+
+def load_pyspellchecker_frequencies(language="en"):
+    """读取 pyspellchecker 自带的 gzip JSON 词频表"""
+    data = pkgutil.get_data("spellchecker", f"resources/{language}.json.gz")
+    return json.loads(gzip.decompress(data).decode('utf-8'))
+
+
+def read_user_words(path):
+    """用户词典：每行一个单词"""
+    if not path:
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        print(f"读取用户词典失败: {e}")
+        return []
+
+
+def load_spell_dictionary(path, user_words_path=None, language="en"):
+    """
+    打开预编译词典，缺失或与已安装的 pyspellchecker 版本不一致时先编译
+    已编译的词典在未安装 pyspellchecker 时也可以直接使用。
+    """
+    source = pyspellchecker_source(language)
+    meta = read_metadata(path)
+    if meta is None or (source is not None and meta.get("source") != source):
+        if source is None:
+            raise ImportError("spellchecker 库未安装，且没有可用的预编译词典")
+        compile_dictionary(path, load_pyspellchecker_frequencies(language), source)
+    return CompiledDictionary(path, read_user_words(user_words_path))
+
+
+class CompiledDictionary:
+    """
+    内存映射的预编译词典，提供与 pyspellchecker 相同的 unknown() / candidates() /
+    correction() 接口。文件在第一次查词时才映射；查词直接在映射上二分查找，
+    只有需要生成纠正候选（大量查词）时才把词表解码为内存中的集合。
+    用户词典中的词视为正确，词频取 USER_WORD_FREQUENCY。
+    """
+    METHOD_NAME = "本地词典"
+    USER_WORD_FREQUENCY = 1000
+
+    def __init__(self, path, user_words=()):
+        self.path = path
+        self.user_words = {word.lower() for word in user_words}
+        self._lock = threading.Lock()
+        self._mm = None
+        self._offsets = None
+        self._freqs = None
+        self._blob = None
+        self._count = 0
+        self._letters = ""
+        self.source = None
+        self._word_index = None   # 单词 -> 序号，生成候选时才建立
+
+    # ==================== 映射 ====================
+    def _ensure_open(self):
+        if self._mm is not None:
+            return
+        with self._lock:
+            if self._mm is not None:
+                return
+            with open(self.path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count, meta_len = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                mm.close()
+                raise ValueError(f"词典文件格式不正确: {self.path}")
+            meta = json.loads(mm[HEADER.size:HEADER.size + meta_len].decode('utf-8'))
+            view = memoryview(mm)
+            start = HEADER.size + meta_len
+            offsets_end = start + (count + 1) * 4
+            freqs_end = offsets_end + count * 4
+            self._offsets = view[start:offsets_end].cast('I')
+            self._freqs = view[offsets_end:freqs_end].cast('I')
+            self._blob = view[freqs_end:]
+            self._count = count
+            self._letters = meta.get("letters", "")
+            self.source = meta.get("source")
+            self._mm = mm
+
+    def _word_at(self, index):
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1] - 1])
+
+    def _find(self, word):
+        """单词在词表中的序号，不存在时返回 -1"""
+        self._ensure_open()
+        if self._word_index is not None:
+            return self._word_index.get(word, -1)
+        key = word.encode('utf-8')
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._word_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self._count and self._word_at(lo) == key else -1
+
+    def _ensure_word_index(self):
+        """把词表解码为字典（只在生成纠正候选时需要）"""
+        self._ensure_open()
+        if self._word_index is None:
+            words = bytes(self._blob).decode('utf-8').split('\n')[:self._count]
+            self._word_index = {word: index for index, word in enumerate(words)}
+
+    # ==================== 查询接口 ====================
+    def word_count(self):
+        """词典文件中的词数（不含用户词典）"""
+        self._ensure_open()
+        return self._count
+
+    def word_at(self, index):
+        self._ensure_open()
+        return self._word_at(index).decode('utf-8')
+
+    def add_user_word(self, word):
+        self.user_words.add(word.lower())
+
+    def frequency(self, word):
+        word = word.lower()
+        if word in self.user_words:
+            return self.USER_WORD_FREQUENCY
+        index = self._find(word)
+        return self._freqs[index] if index >= 0 else 0
+
+    def __contains__(self, word):
+        word = word.lower()
+        return word in self.user_words or self._find(word) >= 0
+
+    def known(self, words):
+        return {word for word in (w.lower() for w in words) if word in self}
+
+    def unknown(self, words):
+        return {word for word in (w.lower() for w in words) if word not in self}
+
+    def _edits1(self, word):
+        letters = self._letters or "abcdefghijklmnopqrstuvwxyz"
+        splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+        deletes = [left + right[1:] for left, right in splits if right]
+        transposes = [left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1]
+        replaces = [left + c + right[1:] for left, right in splits if right for c in letters]
+        inserts = [left + c + right for left, right in splits for c in letters]
+        return set(deletes + transposes + replaces + inserts)
+
+    def candidates(self, word):
+        """编辑距离 1 以内的已知词，没有时取编辑距离 2，仍没有时返回 None"""
+        word = word.lower()
+        if word in self:
+            return {word}
+        self._ensure_word_index()
+        edits = self._edits1(word)
+        found = self.known(edits)
+        if found:
+            return found
+        found = self.known(edit2 for edit1 in edits for edit2 in self._edits1(edit1))
+        return found or None
+
+    def correction(self, word):
+        """词频最高的候选词"""
+        candidates = self.candidates(word)
+        if not candidates:
+            return None
+        return max(candidates, key=self.frequency)
+
+    def __len__(self):
+        self._ensure_open()
+        return self._count + len(self.user_words)
+
+    def close(self):
+        with self._lock:
+            if self._mm is not None:
+                self._offsets.release()
+                self._freqs.release()
+                self._blob.release()
+                self._mm.close()
+                self._mm = None
@@ -0,0 +1,243 @@
+import os
+import json
+import mmap
+import zlib
+import struct
+import bisect
+import threading
+from array import array
+
+# ======================
+# SymSpell 对称删除索引
+# ======================
+# 预先为词典中每个词（只取前 PREFIX_LENGTH 个字符）生成删除最多 MAX_DISTANCE
+# 个字符后的所有变体；查询时对输入做同样的删除，相同的删除变体即为候选，
+# 再计算真实的编辑距离确认。候选查找只与输入长度有关，不随词典大小增长。
+#
+# 文件格式（小端，4 字节对齐）:
+#   头部   : 魔数 "KSYM"、格式版本、最大编辑距离、前缀长度、条目数、元数据长度
+#   元数据 : JSON（所基于的词典来源和词数），补齐到 4 字节
+#   keys   : uint32 * 条目数，删除变体的 CRC32（排序）
+#   values : uint32 * 条目数，对应单词在预编译词典中的序号
+# 只保存哈希而不保存删除变体本身，哈希冲突在计算编辑距离时被排除。
+MAGIC = b"KSYM"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIIIII")
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+
+
+def deletes(word, max_distance):
+    """word 删除最多 max_distance 个字符得到的所有变体（含自身）"""
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for item in frontier:
+            if len(item) <= 1:
+                continue
+            for i in range(len(item)):
+                next_frontier.add(item[:i] + item[i + 1:])
+        next_frontier -= result
+        result |= next_frontier
+        frontier = next_frontier
+    return result
+
+
+def _hash(text):
+    return zlib.crc32(text.encode('utf-8'))
+
+
+def edit_distance(a, b, max_distance):
+    """限定上界的 Damerau-Levenshtein（相邻交换计为一次）距离，超过上界时返回 max_distance + 1"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    # 去掉公共前缀和后缀，只对不同的部分做动态规划
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a = a[start:len(a) - end]
+    b = b[start:len(b) - end]
+    if not a or not b:
+        return min(max(len(a), len(b)), max_distance + 1)
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+def build_index(path, dictionary, source):
+    """为预编译词典建立删除索引并写入 path"""
+    entries = array('Q')
+    for index in range(dictionary.word_count()):
+        word = dictionary.word_at(index)
+        for variant in deletes(word[:PREFIX_LENGTH], MAX_DISTANCE):
+            entries.append((_hash(variant) << 32) | index)
+    entries = array('Q', sorted(set(entries)))
+    keys = array('I', (entry >> 32 for entry in entries))
+    values = array('I', (entry & 0xFFFFFFFF for entry in entries))
+    if array('I', [1]).tobytes() != struct.pack("<I", 1):
+        keys.byteswap()
+        values.byteswap()
+
+    meta = json.dumps({"source": source, "words": dictionary.word_count()}).encode('utf-8')
+    meta += b" " * (-len(meta) % 4)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, MAX_DISTANCE, PREFIX_LENGTH, len(keys), len(meta)))
+        f.write(meta)
+        f.write(keys.tobytes())
+        f.write(values.tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_metadata(path):
+    try:
+        with open(path, 'rb') as f:
+            magic, version, distance, prefix, _count, meta_len = HEADER.unpack(f.read(HEADER.size))
+            if (magic != MAGIC or version != FORMAT_VERSION
+                    or distance != MAX_DISTANCE or prefix != PREFIX_LENGTH):
+                return None
+            return json.loads(f.read(meta_len).decode('utf-8'))
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+class SymSpellChecker:
+    """
+    基于对称删除索引的拼写纠正，与 CompiledDictionary / pyspellchecker 接口相同
+    查词和词频使用预编译词典；删除索引保存在磁盘上（首次使用时建立，
+    词典更新后重建），打开时直接 mmap。用户词典中的词数量很少，
+    其删除变体保存在内存中。
+    """
+    METHOD_NAME = "SymSpell"
+
+    def __init__(self, dictionary, index_path):
+        self.dictionary = dictionary
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._mm = None
+        self._keys = None
+        self._values = None
+        self._user_deletes = {}   # 删除变体 -> {用户词}
+        for word in dictionary.user_words:
+            self._index_user_word(word)
+
+    @property
+    def user_words(self):
+        return self.dictionary.user_words
+
+    # ==================== 索引 ====================
+    def _ensure_index(self):
+        if self._mm is not None:
+            return
+        with self._lock:
+            if self._mm is not None:
+                return
+            self.dictionary.word_count()   # 打开词典以读取来源标识
+            source = self.dictionary.source
+            meta = read_metadata(self.index_path)
+            if meta is None or meta.get("source") != source:
+                build_index(self.index_path, self.dictionary, source)
+            with open(self.index_path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            _magic, _version, _distance, _prefix, count, meta_len = HEADER.unpack_from(mm, 0)
+            view = memoryview(mm)
+            start = HEADER.size + meta_len
+            self._keys = view[start:start + count * 4].cast('I')
+            self._values = view[start + count * 4:start + count * 8].cast('I')
+            self._mm = mm
+
+    def prepare(self):
+        """预先打开（必要时建立）索引，供后台初始化调用"""
+        self._ensure_index()
+
+    def _index_user_word(self, word):
+        for variant in deletes(word[:PREFIX_LENGTH], MAX_DISTANCE):
+            self._user_deletes.setdefault(variant, set()).add(word)
+
+    def _lookup_words(self, variant):
+        """删除变体对应的词典单词"""
+        h = _hash(variant)
+        lo = bisect.bisect_left(self._keys, h)
+        hi = bisect.bisect_right(self._keys, h, lo)
+        words = {self.dictionary.word_at(self._values[i]) for i in range(lo, hi)}
+        words |= self._user_deletes.get(variant, set())
+        return words
+
+    # ==================== 查询接口 ====================
+    def add_user_word(self, word):
+        word = word.lower()
+        self.dictionary.add_user_word(word)
+        self._index_user_word(word)
+
+    def frequency(self, word):
+        return self.dictionary.frequency(word)
+
+    def __contains__(self, word):
+        return word in self.dictionary
+
+    def known(self, words):
+        return self.dictionary.known(words)
+
+    def unknown(self, words):
+        return self.dictionary.unknown(words)
+
+    def lookup(self, word, max_distance=MAX_DISTANCE):
+        """编辑距离最小的候选词及其距离，没有候选时返回 (set(), None)"""
+        word = word.lower()
+        if word in self.dictionary:
+            return {word}, 0
+        self._ensure_index()
+        best = max_distance + 1
+        found = set()
+        checked = set()
+        for variant in deletes(word[:PREFIX_LENGTH], max_distance):
+            for candidate in self._lookup_words(variant):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                distance = edit_distance(word, candidate, min(best, max_distance))
+                if distance < best:
+                    best = distance
+                    found = {candidate}
+                elif distance == best and distance <= max_distance:
+                    found.add(candidate)
+        return (found, best) if found else (set(), None)
+
+    def candidates(self, word):
+        found, _distance = self.lookup(word)
+        return found or None
+
+    def correction(self, word):
+        """编辑距离最小、词频最高的候选词"""
+        found, _distance = self.lookup(word)
+        if not found:
+            return None
+        return max(found, key=self.frequency)
+
+    def close(self):
+        with self._lock:
+            if self._mm is not None:
+                self._keys.release()
+                self._values.release()
+                self._mm.close()
+                self._mm = None
+        self.dictionary.close()
@@ -0,0 +1,230 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PyQt6.QtCore import QDate
+from .diaryParser import split_todo_section, replace_todo_section
+from .taskRollover import read_todo_tasks
+
+# ======================
+# 标签重命名 / 合并
+# ======================
+def map_tags(tags, mapping):
+    """按映射改写标签列表
+
+    映射到 None 的标签被删除；多个标签映射到同一个名字时只保留一个（合并）。
+
+    Returns:
+        list: 改写后的标签列表（保持原有顺序）
+    """
+    result = []
+    for tag in tags or ():
+        tag = mapping.get(tag, tag)
+        if tag is not None and tag not in result:
+            result.append(tag)
+    return result
+
+
+def split_note_filename(filename):
+    """拆分笔记文件名 "20250817_标题_#标签.md" 为 (各部分, 标签列表)"""
+    parts = filename[:-3].split('_')
+    return parts, [p[1:] for p in parts if p.startswith('#')]
+
+
+def remap_note_filename(filename, mapping):
+    """按标签映射改写笔记文件名，标签未变化时原样返回"""
+    parts, tags = split_note_filename(filename)
+    new_tags = map_tags(tags, mapping)
+    if new_tags == tags:
+        return filename
+    # 标签部分按原位置依次替换，多余的位置（合并或删除）被移除
+    remaining = iter(new_tags)
+    new_parts = []
+    for part in parts:
+        if not part.startswith('#'):
+            new_parts.append(part)
+            continue
+        tag = next(remaining, None)
+        if tag is not None:
+            new_parts.append('#' + tag.replace(' ', '_'))
+    return '_'.join(new_parts) + '.md'
+
+
+def note_link_title(filename):
+    """笔记在日记 Notes 段中的链接标题（文件名去掉日期和扩展名）"""
+    title = os.path.splitext(filename)[0]
+    return title.split('_', 1)[1] if '_' in title else title
+
+
+def rewrite_note_links(content, links):
+    """把日记 Notes 段中的 [[旧标题]] 改写为 [[新标题]]，未变化时返回 None"""
+    lines = content.splitlines()
+    section = None
+    changed = False
+    for i, line in enumerate(lines):
+        if line.startswith("## "):
+            section = line
+            continue
+        if not section or not section.startswith("## Notes") or '[[' not in line:
+            continue
+        start = line.find('[[')
+        end = line.find(']]', start)
+        if end == -1:
+            continue
+        new_title = links.get(line[start+2:end])
+        if new_title is not None:
+            lines[i] = line[:start+2] + new_title + line[end:]
+            changed = True
+    if not changed:
+        return None
+    return "\n".join(lines) + ("\n" if content.endswith("\n") else "")
+
+
+class TagRefactor:
+    """
+    全库标签重命名 / 合并 / 删除
+    一次操作由若干条映射组成（旧标签 -> 新标签，None 表示删除），
+    笔记标签和待办标签分别映射：
+        - 待办标签通过任务索引的标签倒排表找出受影响的日期，只读这些日记；
+        - 笔记标签保存在文件名中，列出笔记目录即可找到受影响的笔记，
+          笔记改名后同时改写对应日期日记里的 [[链接]]。
+    plan() 在线程池中并行读取并改写日记（可在后台线程调用，不修改任何文件），
+    apply() 把所有日记写入和笔记重命名作为一次日志化的批量提交，
+    要么全部生效，要么全部保持原样；循环任务规则的标签随后一次性写入。
+    """
+
+    def __init__(self, file_manager, note_mapping=None, todo_mapping=None, max_workers=4):
+        self.file_manager = file_manager
+        # 去掉不产生变化的映射
+        self.note_mapping = {k: v for k, v in (note_mapping or {}).items() if k != v}
+        self.todo_mapping = {k: v for k, v in (todo_mapping or {}).items() if k != v}
+        self.max_workers = max_workers
+
+        self.note_renames = {}    # 旧文件名 -> 新文件名
+        self.diary_contents = {}  # QDate -> 新内容
+        self.rule_changes = {}    # 规则ID -> {'tags': [...]}
+        self.changed_tasks = 0
+
+    def is_empty(self):
+        return not (self.note_mapping or self.todo_mapping)
+
+    # ==================== 查找受影响的文件 ====================
+    def _affected_task_dates(self):
+        """通过任务索引找出包含待改标签的日期"""
+        if not self.todo_mapping:
+            return set()
+        store = self.file_manager.get_task_store()
+        ids = set()
+        for tag in self.todo_mapping:
+            ids |= store.query_ids(tags=[tag])
+        return {store.get(task_id).date for task_id in ids}
+
+    def _plan_note_renames(self):
+        """找出需要改名的笔记，返回 {日期: {旧链接标题: 新链接标题}}"""
+        links_by_date = {}
+        if not self.note_mapping:
+            return links_by_date
+
+        existing = {os.path.basename(path) for path in self.file_manager.list_notes()}
+        targets = set()
+        for filename in sorted(existing):
+            new_filename = remap_note_filename(filename, self.note_mapping)
+            if new_filename == filename:
+                continue
+            if new_filename in targets or new_filename in existing:
+                raise ValueError(f"笔记 {filename} 改名后与已有笔记 {new_filename} 重名")
+            targets.add(new_filename)
+            self.note_renames[filename] = new_filename
+
+            success, date = self.file_manager.get_note_date_from_filename(filename)
+            if success:
+                date_key = "%04d-%02d-%02d" % date
+                links_by_date.setdefault(date_key, {})[
+                    note_link_title(filename)] = note_link_title(new_filename)
+        return links_by_date
+
+    # ==================== 计划与提交 ====================
+    def plan(self, progress=None, cancelled=None):
+        """计算所有需要的修改（只读取文件）
+
+        Args:
+            progress (callable | None): progress(已完成数, 总数)，在调用线程中回调
+            cancelled (callable | None): 返回 True 时放弃剩余工作
+
+        Returns:
+            int | None: 受影响的文件数量，被取消时返回 None
+        """
+        self.note_renames = {}
+        self.diary_contents = {}
+        self.rule_changes = {}
+        self.changed_tasks = 0
+
+        links_by_date = self._plan_note_renames()
+        date_keys = sorted(self._affected_task_dates() | set(links_by_date))
+        total = len(date_keys)
+        if progress is not None:
+            progress(0, total)
+
+        if date_keys:
+            with ThreadPoolExecutor(max_workers=self.max_workers,
+                                    thread_name_prefix="tag-refactor") as executor:
+                futures = [executor.submit(self._rewrite_diary, key, links_by_date.get(key))
+                           for key in date_keys]
+                for done, future in enumerate(as_completed(futures), 1):
+                    if cancelled is not None and cancelled():
+                        for pending in futures:
+                            pending.cancel()
+                        return None
+                    date, content, changed = future.result()
+                    if content is not None:
+                        self.diary_contents[date] = content
+                        self.changed_tasks += changed
+                    if progress is not None:
+                        progress(done, total)
+
+        # 循环任务规则中的标签
+        if self.todo_mapping:
+            scheduler = self.file_manager.get_recurrence_scheduler()
+            for rule in scheduler.list_rules():
+                tags = map_tags(rule.get('tags'), self.todo_mapping)
+                if tags != list(rule.get('tags') or []):
+                    self.rule_changes[rule['id']] = {'tags': tags}
+
+        return len(self.diary_contents) + len(self.note_renames)
+
+    def _rewrite_diary(self, date_key, links):
+        """改写一天的日记，返回 (QDate, 新内容或 None, 改动的任务数)"""
+        date = QDate.fromString(date_key, "yyyy-MM-dd")
+        original = self.file_manager.load_diary(date)
+        content = original
+        changed = 0
+
+        if self.todo_mapping:
+            _before, task_lines, _after = split_todo_section(content)
+            if task_lines:
+                tasks = read_todo_tasks(date_key, content, self.file_manager.get_task_store())
+                for task in tasks:
+                    tags = map_tags(task.get('tags'), self.todo_mapping)
+                    if tags != list(task.get('tags') or []):
+                        task['tags'] = tags or None
+                        changed += 1
+                if changed:
+                    content = replace_todo_section(content, tasks)
+
+        if links:
+            content = rewrite_note_links(content, links) or content
+
+        return date, (content if content != original else None), changed
+
+    def apply(self):
+        """提交 plan() 计算出的修改
+
+        Returns:
+            bool: 成功返回True，失败时笔记和日记都不会被修改
+        """
+        note_dir = self.file_manager.get_note_dir()
+        renames = [(os.path.join(note_dir, old), os.path.join(note_dir, new))
+                   for old, new in self.note_renames.items()]
+        if not self.file_manager.save_diaries(self.diary_contents, renames):
+            return False
+        if self.rule_changes:
+            self.file_manager.get_recurrence_scheduler().update_rules(self.rule_changes)
+        return True
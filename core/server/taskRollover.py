@@ -0,0 +1,126 @@
+from PyQt6.QtCore import QDate
+from .diaryParser import (
+    parse_task_line, split_todo_section, replace_todo_section,
+    assign_task_ids, new_task_id
+)
+
+# ======================
+# 未完成任务顺延
+# ======================
+def read_todo_tasks(date_key, content, store=None):
+    """读取某天 TODO 段的任务字典列表（补全稳定 ID）
+
+    传入 store 时按任务索引的规则解析重复 ID，得到的 ID 与索引一致。
+    """
+    _before, task_lines, _after = split_todo_section(content)
+    taken = store.taken_by_other_dates(date_key) if store is not None else None
+    return assign_task_ids(date_key, [parse_task_line(line) for line in task_lines or []], taken)
+
+
+def rollover_tasks(file_manager, date_from, date_to, target_date, mode="move"):
+    """把日期范围内的未完成任务顺延到目标日期
+
+    所有受影响的日记在内存中改写后，通过 FileManager.save_diaries
+    作为一次原子批量写入提交，任务索引也只更新一次。
+
+    Args:
+        file_manager: FileManager 实例
+        date_from / date_to (QDate): 来源日期闭区间
+        target_date (QDate): 目标日期（不会作为来源）
+        mode (str): "move" 从原日期移除，"copy" 保留原任务并复制一份
+
+    Returns:
+        int: 顺延的任务数量，写入失败返回 -1
+    """
+    store = file_manager.get_task_store()
+    target_key = target_date.toString('yyyy-MM-dd')
+    open_ids = store.query_ids(completed=False,
+                               date_from=date_from.toString('yyyy-MM-dd'),
+                               date_to=date_to.toString('yyyy-MM-dd'))
+
+    # 按来源日期分组，保持每天的原始顺序
+    by_date = {}
+    for task in store.sort_tasks(open_ids):
+        if task.date != target_key:
+            by_date.setdefault(task.date, set()).add(task.task_id)
+    if not by_date:
+        return 0
+
+    target_content = file_manager.load_diary(target_date)
+    target_tasks = read_todo_tasks(target_key, target_content, store)
+    existing_ids = {task['id'] for task in target_tasks}
+    existing_open_texts = {task['text'] for task in target_tasks if not task['completed']}
+
+    contents = {}
+    moved = 0
+    for date_key in sorted(by_date):
+        ids = by_date[date_key]
+        date = QDate.fromString(date_key, "yyyy-MM-dd")
+        content = file_manager.load_diary(date)
+        tasks = read_todo_tasks(date_key, content, store)
+
+        kept = []
+        for task in tasks:
+            if task['id'] not in ids or task['completed']:
+                kept.append(task)
+                continue
+
+            if mode == "move":
+                if task['id'] in existing_ids:
+                    kept.append(task)
+                    continue
+                target_tasks.append(task)
+                existing_ids.add(task['id'])
+                moved += 1
+            else:
+                # 复制时跳过目标日期已有的同名未完成任务，避免重复顺延
+                kept.append(task)
+                if task['text'] not in existing_open_texts:
+                    copied = dict(task)
+                    copied['id'] = new_task_id()
+                    target_tasks.append(copied)
+                    existing_open_texts.add(task['text'])
+                    moved += 1
+
+        if mode == "move":
+            contents[date] = replace_todo_section(content, kept)
+
+    if moved == 0:
+        return 0
+
+    contents[target_date] = replace_todo_section(target_content, target_tasks)
+    if not file_manager.save_diaries(contents):
+        return -1
+    return moved
+
+
+# ======================
+# 任务批量移动
+# ======================
+def move_tasks(file_manager, source_date, remaining, moved, target_date):
+    """把一组任务从 source_date 移动到 target_date
+
+    来源日期的 TODO 段替换为 remaining，目标日期追加 moved
+    （目标中已存在同一 ID 的任务不会重复添加）。两个日记通过
+    save_diaries 一次性提交，任务索引也只更新一次。
+
+    Returns:
+        int: 实际添加到目标日期的任务数量（不含目标中已存在的任务），写入失败返回 -1
+    """
+    if source_date == target_date or not moved:
+        return 0
+
+    target_key = target_date.toString('yyyy-MM-dd')
+    target_content = file_manager.load_diary(target_date)
+    target_tasks = read_todo_tasks(target_key, target_content, file_manager.get_task_store())
+    existing_ids = {task['id'] for task in target_tasks}
+
+    added = [task for task in moved if task['id'] not in existing_ids]
+    source_content = file_manager.load_diary(source_date)
+    contents = {
+        source_date: replace_todo_section(source_content, remaining),
+        target_date: replace_todo_section(target_content, target_tasks + added),
+    }
+    if not file_manager.save_diaries(contents):
+        return -1
+    return len(added)
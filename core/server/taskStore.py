@@ -0,0 +1,340 @@
+import os
+import json
+import bisect
+import threading
+from .diaryParser import parse_diary, assign_task_ids
+
+# ======================
+# 跨日期任务存储
+# ======================
+class Task:
+    """单个任务记录（使用 __slots__ 以减小内存占用）"""
+    __slots__ = ('task_id', 'date', 'text', 'completed', 'priority', 'tags', 'due', 'remind')
+
+    def __init__(self, task_id, date, text, completed=False, priority=None, tags=(),
+                 due=None, remind=None):
+        self.task_id = task_id
+        self.date = date            # yyyy-MM-dd
+        self.text = text
+        self.completed = completed
+        self.priority = priority
+        self.tags = tuple(tags)
+        self.due = due              # yyyy-MM-dd
+        self.remind = remind        # "yyyy-MM-dd HH:mm" 或 "HH:mm"
+
+    def to_dict(self):
+        """转换为界面层使用的任务字典"""
+        return {
+            'id': self.task_id,
+            'text': self.text,
+            'completed': self.completed,
+            'priority': self.priority,
+            'tags': list(self.tags),
+            'due': self.due,
+            'remind': self.remind
+        }
+
+    def to_row(self):
+        """转换为缓存文件中的紧凑行格式"""
+        return [self.task_id, self.text, self.completed, self.priority, list(self.tags),
+                self.due, self.remind]
+
+    @classmethod
+    def from_row(cls, date, row):
+        task_id, text, completed, priority, tags, due, remind = row
+        return cls(task_id, date, text, completed, priority, tags, due, remind)
+
+    def __repr__(self):
+        return f"Task({self.task_id!r}, {self.date!r}, {self.text!r})"
+
+
+class TaskStore:
+    """所有日记任务的内存索引
+
+    按日期、完成状态、优先级和标签建立倒排集合，查询时只做集合运算，
+    不需要重新扫描日记文件。索引随日记保存增量更新，并以
+    {日期: 文件修改时间} 为依据缓存到磁盘，启动时只重新解析变化过的日记。
+    """
+    CACHE_VERSION = 2
+
+    def __init__(self, diary_dir, cache_path):
+        self.diary_dir = diary_dir
+        self.cache_path = cache_path
+
+        self._tasks = {}             # task_id -> Task
+        self._by_date = {}           # date -> [task_id, ...]（保持文件中的顺序）
+        self._dates = []             # 有任务的日期（排序）
+        self._by_status = {True: set(), False: set()}
+        self._by_priority = {}       # 小写优先级 -> {task_id}
+        self._by_tag = {}            # 标签 -> {task_id}
+        self._mtimes = {}            # date -> 解析时的文件修改时间
+
+        self._listeners = []
+        self._flush_timer = None
+        self._flush_lock = threading.Lock()
+        self._data_lock = threading.RLock()   # 修改索引和写缓存时取快照都持有
+
+    # ==================== 构建与持久化 ====================
+    def load(self):
+        """从缓存加载索引，并与磁盘上的日记文件对账"""
+        cached = {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == self.CACHE_VERSION:
+                cached = data.get("files", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"加载任务索引缓存失败: {e}")
+
+        changed = False
+        on_disk = self._scan_diary_files()
+        # 按日期顺序处理，跨日期重复的 ID 总是由较早的日期保留
+        for date_key in sorted(on_disk):
+            path, mtime = on_disk[date_key]
+            entry = cached.get(date_key)
+            if entry and entry.get("mtime") == mtime:
+                tasks = [Task.from_row(date_key, row) for row in entry.get("tasks", [])]
+                with self._data_lock:
+                    if not any(self._taken_elsewhere(task.task_id, date_key) for task in tasks):
+                        self._replace_date(date_key, tasks)
+                        self._mtimes[date_key] = mtime
+                        continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except Exception as e:
+                print(f"读取日记失败: {e}")
+                continue
+            with self._data_lock:
+                self._replace_date(date_key, self._parse_tasks(date_key, content))
+                self._mtimes[date_key] = mtime
+            changed = True
+
+        if changed or set(cached) - set(on_disk):
+            self.flush()
+
+    def _scan_diary_files(self):
+        """列出所有日记文件: {date: (path, mtime)}"""
+        files = {}
+        for root, _dirs, names in os.walk(self.diary_dir):
+            for name in names:
+                if not (name.endswith('.md') and len(name) == 13):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    files[name[:-3]] = (path, os.path.getmtime(path))
+                except OSError:
+                    continue
+        return files
+
+    def flush(self):
+        """立即把索引写入缓存文件"""
+        with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+        # flush 可能在定时器线程中执行，先在锁内取快照，再在锁外序列化写盘
+        files = {}
+        with self._data_lock:
+            for date_key, mtime in self._mtimes.items():
+                files[date_key] = {
+                    "mtime": mtime,
+                    "tasks": [self._tasks[tid].to_row() for tid in self._by_date.get(date_key, [])]
+                }
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.CACHE_VERSION, "files": files}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"保存任务索引缓存失败: {e}")
+
+    def schedule_flush(self, delay=2.0):
+        """延迟写缓存，合并短时间内的多次保存"""
+        with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+            self._flush_timer = threading.Timer(delay, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    # ==================== 增量更新 ====================
+    def _parse_tasks(self, date_key, content):
+        """解析任务（调用方需持有 _data_lock），与其他日期重复的 ID 改用推导 ID"""
+        todos = assign_task_ids(date_key, parse_diary(content)['todos'],
+                                self.taken_by_other_dates(date_key))
+        return [Task(t['id'], date_key, t['text'], t['completed'], t['priority'], t['tags'],
+                     t.get('due'), t.get('remind'))
+                for t in todos]
+
+    def update_date(self, date_key, content, mtime=None):
+        """日记保存后调用，用新内容替换该日期的全部任务"""
+        self.update_dates({date_key: (content, mtime)})
+
+    def update_dates(self, changes):
+        """批量更新多个日期，只通知监听者一次
+
+        Args:
+            changes (dict): {date: (content, mtime)}
+        """
+        with self._data_lock:
+            # 先移除所有变化日期的旧任务，任务在这些日期之间移动时 ID 不算重复
+            for date_key in changes:
+                self._replace_date(date_key, [])
+            for date_key in sorted(changes):
+                content, mtime = changes[date_key]
+                self._replace_date(date_key, self._parse_tasks(date_key, content))
+                if mtime is not None:
+                    self._mtimes[date_key] = mtime
+        self.schedule_flush()
+        self._notify(list(changes))
+
+    def _replace_date(self, date_key, tasks):
+        for task_id in self._by_date.pop(date_key, []):
+            self._unindex(task_id)
+
+        if not tasks:
+            pos = bisect.bisect_left(self._dates, date_key)
+            if pos < len(self._dates) and self._dates[pos] == date_key:
+                del self._dates[pos]
+            return
+
+        for task in tasks:
+            self._index(task)
+        self._by_date[date_key] = [task.task_id for task in tasks]
+
+        pos = bisect.bisect_left(self._dates, date_key)
+        if pos == len(self._dates) or self._dates[pos] != date_key:
+            self._dates.insert(pos, date_key)
+
+    def taken_by_other_dates(self, date_key):
+        """返回 taken(task_id) 判断函数，供 assign_task_ids 使用
+
+        与索引解析该日期时的规则相同，按它解析出的任务 ID 与索引一致。
+        """
+        return lambda task_id: self._taken_elsewhere(task_id, date_key)
+
+    def _taken_elsewhere(self, task_id, date_key):
+        task = self._tasks.get(task_id)
+        return task is not None and task.date != date_key
+
+    def _index(self, task):
+        self._tasks[task.task_id] = task
+        self._by_status[bool(task.completed)].add(task.task_id)
+        if task.priority:
+            self._by_priority.setdefault(task.priority.lower(), set()).add(task.task_id)
+        for tag in task.tags:
+            self._by_tag.setdefault(tag, set()).add(task.task_id)
+
+    def _unindex(self, task_id):
+        task = self._tasks.pop(task_id, None)
+        if task is None:
+            return
+        self._by_status[bool(task.completed)].discard(task_id)
+        if task.priority:
+            bucket = self._by_priority.get(task.priority.lower())
+            if bucket is not None:
+                bucket.discard(task_id)
+                if not bucket:
+                    del self._by_priority[task.priority.lower()]
+        for tag in task.tags:
+            bucket = self._by_tag.get(tag)
+            if bucket is not None:
+                bucket.discard(task_id)
+                if not bucket:
+                    del self._by_tag[tag]
+
+    # ==================== 监听 ====================
+    def add_listener(self, callback):
+        """注册索引变化回调，参数为发生变化的日期列表"""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, date_keys):
+        for callback in list(self._listeners):
+            try:
+                callback(date_keys)
+            except Exception as e:
+                print(f"任务索引回调失败: {e}")
+
+    # ==================== 查询接口 ====================
+    def get(self, task_id):
+        """按 ID 获取任务"""
+        return self._tasks.get(task_id)
+
+    def date_of(self, task_id):
+        """任务所在的日期，任务不存在时返回 None"""
+        task = self._tasks.get(task_id)
+        return task.date if task is not None else None
+
+    def tasks_on(self, date_key):
+        """获取某一天的全部任务（按文件顺序）"""
+        return [self._tasks[tid] for tid in self._by_date.get(date_key, [])]
+
+    def dates_between(self, date_from=None, date_to=None):
+        """获取日期范围内（闭区间）有任务的日期"""
+        lo = bisect.bisect_left(self._dates, date_from) if date_from else 0
+        hi = bisect.bisect_right(self._dates, date_to) if date_to else len(self._dates)
+        return self._dates[lo:hi]
+
+    def all_tags(self):
+        """所有出现过的任务标签"""
+        return sorted(self._by_tag)
+
+    def query_ids(self, completed=None, priority=None, tags=None, date_from=None, date_to=None):
+        """按条件查询任务 ID 集合
+
+        Args:
+            completed (bool | None): 完成状态，None 表示不限
+            priority (str | None): 优先级（不区分大小写）
+            tags (iterable | None): 必须同时包含的标签
+            date_from / date_to (str | None): yyyy-MM-dd 日期闭区间
+        """
+        candidates = []
+        if completed is not None:
+            candidates.append(self._by_status[bool(completed)])
+        if priority:
+            candidates.append(self._by_priority.get(priority.lower(), set()))
+        for tag in tags or ():
+            candidates.append(self._by_tag.get(tag, set()))
+        if date_from or date_to:
+            ids = set()
+            for date_key in self.dates_between(date_from, date_to):
+                ids.update(self._by_date[date_key])
+            candidates.append(ids)
+
+        if not candidates:
+            return set(self._tasks)
+
+        # 从最小的集合开始求交集
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for other in candidates[1:]:
+            result &= other
+            if not result:
+                break
+        return result
+
+    def query(self, completed=None, priority=None, tags=None, date_from=None, date_to=None):
+        """按条件查询任务，结果按日期和文件内顺序排列"""
+        ids = self.query_ids(completed, priority, tags, date_from, date_to)
+        return self.sort_tasks(ids)
+
+    def sort_tasks(self, ids):
+        """将任务 ID 集合按日期和文件内顺序排列为 Task 列表"""
+        dates = sorted({self._tasks[tid].date for tid in ids})
+        result = []
+        for date_key in dates:
+            result.extend(self._tasks[tid] for tid in self._by_date[date_key] if tid in ids)
+        return result
+
+    def __len__(self):
+        return len(self._tasks)
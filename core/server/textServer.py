@@ -1,16 +1,308 @@
+import os
 import requests
 import json
 import re
+import time
+import inspect
+import functools
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Optional, Tuple
+from .resultCache import ResultCache, make_cache_key
+from .spellDictionary import load_spell_dictionary, read_user_words
+from .symSpell import SymSpellChecker
+
+class TokenStream:
+    """
+    流式输出的接收端
+    _call_ollama 每收到一段文本就调用 on_token，结束后记录首字延迟和生成速度；
+    cancelled 返回 True 时停止读取并关闭连接。调用方取消后调用 notify_cancelled()，
+    正在等待数据的请求会立即断开，而不必等到下一段数据到达。
+    """
+
+    def __init__(self, on_token=None, on_stats=None, cancelled=None):
+        self.on_token = on_token
+        self.on_stats = on_stats
+        self.cancelled = cancelled
+        self.ttft = None               # 首字延迟（秒）
+        self.tokens_per_second = None
+        self.token_count = 0
+        self._cancel_listeners = []
+
+    def is_cancelled(self) -> bool:
+        return bool(self.cancelled and self.cancelled())
+
+    def add_cancel_listener(self, callback):
+        """注册取消通知，已经取消时立即调用"""
+        self._cancel_listeners.append(callback)
+        if self.is_cancelled():
+            callback()
+
+    def notify_cancelled(self):
+        for callback in list(self._cancel_listeners):
+            try:
+                callback()
+            except Exception as e:
+                print(f"取消通知失败: {e}")
+
+    def feed(self, piece: str):
+        self.token_count += 1
+        if self.on_token:
+            self.on_token(piece)
+
+    def finish(self, ttft, tokens_per_second):
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        if self.on_stats:
+            self.on_stats(ttft, tokens_per_second)
+
+
+class SharedRequest(TokenStream):
+    """
+    进行中的一次 Ollama 请求，由发起者和之后加入的相同请求共享
+    片段和统计转发给所有参与者的 stream；只有全部参与者都取消时才中止请求
+    （没有 stream 的同步调用无法取消，会让请求一直进行到结束）。
+    请求期间保存正在读取的响应，最后一个参与者取消时直接关闭连接，
+    让读取线程立即结束，不再占用工作线程等待下一段数据。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.result = None
+        self._streams = []
+        self._pieces = []
+        self._uncancellable = 0
+        self._response = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def join(self, stream):
+        with self._lock:
+            if stream is None:
+                self._uncancellable += 1
+                return
+            for piece in self._pieces:
+                stream.feed(piece)
+            self._streams.append(stream)
+        stream.add_cancel_listener(self._participant_cancelled)
+
+    def attach_response(self, response):
+        """记录正在读取的响应；参与者已全部取消时立即关闭"""
+        with self._lock:
+            self._response = response
+        if self.is_cancelled():
+            self._close_response()
+
+    def detach_response(self):
+        with self._lock:
+            self._response = None
+
+    def _participant_cancelled(self):
+        if self.is_cancelled():
+            self._close_response()
+
+    def _close_response(self):
+        with self._lock:
+            response, self._response = self._response, None
+        if response is None:
+            return
+        try:
+            # 先 shutdown 套接字，阻塞在读取上的线程才会立即返回
+            raw = getattr(response, 'raw', None)
+            if hasattr(raw, 'shutdown'):
+                raw.shutdown()
+            response.close()
+        except Exception as e:
+            print(f"关闭 ollama 连接失败: {e}")
+
+    def is_cancelled(self) -> bool:
+        with self._lock:
+            if self._uncancellable:
+                return False
+            return all(stream.is_cancelled() for stream in self._streams)
+
+    def feed(self, piece: str):
+        with self._lock:
+            self.token_count += 1
+            self._pieces.append(piece)
+            for stream in self._streams:
+                if not stream.is_cancelled():
+                    stream.feed(piece)
+
+    def finish(self, ttft, tokens_per_second):
+        super().finish(ttft, tokens_per_second)
+        with self._lock:
+            for stream in self._streams:
+                stream.finish(ttft, tokens_per_second)
+
+    def complete(self, result):
+        self.result = result
+        self._done.set()
+
+    def wait(self, timeout=None) -> bool:
+        return self._done.wait(timeout)
+
+
+def split_text_chunks(text: str, max_chars: int) -> list:
+    """
+    把长文本切分为不超过 max_chars 的块，块边界由内容决定
+    先按段落（空行）和标题行切成段落块，单个段落过长时再按句子切分，最后按长度硬切。
+    标题行之前、以及哈希命中的段落之后作为分块点（命中概率与段落长度成正比，
+    平均每 max_chars / 2 个字符一个），只有超过 max_chars 时才按长度断开。
+    分块点只取决于附近段落的内容，修改一处后只有所在的块改变，其余块仍命中缓存。
+    """
+    # QTextCursor.selectedText() 用 U+2029 分隔段落
+    text = text.replace('\u2029', '\n').replace('\u2028', '\n').replace('\r\n', '\n')
+    blocks = []
+    for block in re.split(r'\n\s*\n|\n(?=#)', text):
+        block = block.strip()
+        if not block:
+            continue
+        if len(block) <= max_chars:
+            blocks.append(block)
+            continue
+        piece = ""
+        for sentence in re.split(r'(?<=[。！？.!?\n])', block):
+            while len(sentence) > max_chars:
+                if piece:
+                    blocks.append(piece)
+                    piece = ""
+                blocks.append(sentence[:max_chars])
+                sentence = sentence[max_chars:]
+            if len(piece) + len(sentence) > max_chars:
+                blocks.append(piece)
+                piece = ""
+            piece += sentence
+        if piece.strip():
+            blocks.append(piece)
+
+    min_chars = max_chars // 4   # 避免产生过小的块
+    chunks = []
+    current = ""
+    for block in blocks:
+        starts_section = block.startswith('#') and len(current) >= min_chars
+        if current and (starts_section or len(current) + len(block) + 2 > max_chars):
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{block}" if current else block
+        if len(current) >= min_chars and _is_cut_point(block, max_chars):
+            chunks.append(current)
+            current = ""
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _is_cut_point(block: str, max_chars: int) -> bool:
+    """段落之后是否作为分块点：段落哈希落在与其长度成正比的区间内"""
+    return zlib.crc32(block.encode('utf-8')) < len(block) * 2 / max_chars * 0x100000000
+
+
+def cached_operation(method):
+    """
+    文本处理结果缓存装饰器
+    键包含操作、模型、目标语言、方法偏好和规范化文本的哈希；
+    命中时如果有流式接收端，把整个结果作为一段文本发出。
+    只缓存偏好的方法成功给出的结果：失败、返回原文或降级到另一种方法的
+    结果不写入该偏好的键，下次仍会重新请求。
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+        text = arguments['text']
+        stream = arguments.get('stream')
+        preference = arguments.get('force_method') or ('llm' if self.use_llm_first else 'traditional')
+        key = make_cache_key(f"{method.__name__}:{preference}", self._select_model(),
+                             arguments.get('target_lang'), text)
+
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            if stream is not None:
+                stream.feed(cached[0])
+                stream.finish(0.0, None)
+            return cached[0], f"{cached[1]} (缓存)"
+
+        result, method_used = method(self, *args, **kwargs)
+        if (not (stream is not None and stream.is_cancelled())
+                and self._is_cacheable(method_used, preference)):
+            self.result_cache.put(key, [result, method_used])
+        return result, method_used
+
+    return wrapper
+
+
+class TextJob:
+    """
+    异步文本处理任务的句柄
+    cancel() 之后正在读取的连接立即关闭（与其他任务共享的请求在所有参与者
+    都取消后关闭），结果被丢弃；
+    on_done 回调在工作线程中调用，界面需要自行切回主线程。
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.future = None
+        self.stream = None
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+        if self.stream is not None:
+            self.stream.notify_cancelled()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    def result(self) -> Optional[Tuple[str, str]]:
+        """返回 (处理结果, 使用的方法)，任务被取消时返回 None，处理出错时抛出异常"""
+        if self.is_cancelled() or self.future.cancelled():
+            return None
+        return self.future.result()
+
 
 class TextProcessor:
+    # 可通过 submit() 异步执行的操作
+    JOB_OPERATIONS = ('spell_check', 'translate', 'polish', 'summarize')
+    JOB_WORKERS = 2
+    # 长文本分块总结：每块的字符数上限和同时请求的块数
+    SUMMARY_CHUNK_CHARS = 3000
+    SUMMARY_WORKERS = 2
+    SUMMARY_MAX_DEPTH = 3
+    # 传统拼写检查的纠正方式
+    SPELL_BACKENDS = ('pyspellchecker', 'symspell')
+    # 拼写纠正结果的记忆数量（本次登录内有效）
+    SPELL_MEMO_SIZE = 4096
+    # 拉丁字母单词：前后不能紧接字母、数字、下划线
+    LATIN_WORD_RE = re.compile(
+        r"(?<![0-9A-Za-z_\u00C0-\u024F])"
+        r"[A-Za-z\u00C0-\u024F]+(?:'[A-Za-z\u00C0-\u024F]+)*"
+        r"(?![0-9A-Za-z_\u00C0-\u024F])")
+    # 连接池大小：后台初始化、预热和文本处理线程共享同一个 Session
+    POOL_CONNECTIONS = 2
+    POOL_MAXSIZE = 8
     
     def __init__(self, 
                  ollama_url: str = "http://localhost:11434",
                  preferred_model: str = "gemma3n:latest",
                  use_llm_first: bool = True,
                  enable_spell_checker: bool = True,
-                 enable_translator: bool = True):
+                 enable_translator: bool = True,
+                 cache_dir: Optional[str] = None,
+                 dictionary_path: Optional[str] = None,
+                 user_words_path: Optional[str] = None,
+                 spell_backend: str = "pyspellchecker"):
         """
         初始化文本处理器
         
@@ -20,12 +312,39 @@ class TextProcessor:
             use_llm_first: 是否优先使用大模型（False 则优先使用传统方法）
             enable_spell_checker: 是否启用传统拼写检查器
             enable_translator: 是否启用传统翻译器
+            cache_dir: 处理结果的磁盘缓存目录，None 则只在内存中缓存
+            dictionary_path: 预编译拼写词典的路径，None 则直接使用 pyspellchecker
+            user_words_path: 用户词典（每行一个单词），合并到拼写词典中
+            spell_backend: 传统拼写纠正方式，'pyspellchecker'（编辑距离枚举）
+                           或 'symspell'（对称删除索引，需要 dictionary_path）
         """
         self.ollama_url = ollama_url
         self.preferred_model = preferred_model
         self.use_llm_first = use_llm_first
         self.enable_spell_checker = enable_spell_checker
         self.enable_translator = enable_translator
+        self.dictionary_path = dictionary_path
+        self.user_words_path = user_words_path
+        self.spell_backend = spell_backend if spell_backend in self.SPELL_BACKENDS else "pyspellchecker"
+
+        # 所有 Ollama 请求共用一个保持连接的 Session，避免每次调用重新建立 TCP 连接
+        self.session = self._create_session()
+        # 进行中的 Ollama 请求：(模型, 提示词) -> SharedRequest
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+        # 拼写纠正记忆：小写单词 -> 纠正结果（None 表示没有建议）
+        self._spell_memo = OrderedDict()
+        self._spell_memo_lock = threading.Lock()
+
+        # 处理结果缓存（内存 LRU + 磁盘）
+        self.result_cache = ResultCache(cache_dir)
+        # 异步文本处理任务的线程池
+        self._executor = ThreadPoolExecutor(max_workers=self.JOB_WORKERS,
+                                            thread_name_prefix="text-job")
+        # 分块总结使用单独的线程池，避免任务线程等待自己线程池中的子任务
+        self._chunk_executor = ThreadPoolExecutor(max_workers=self.SUMMARY_WORKERS,
+                                                  thread_name_prefix="summary-chunk")
 
         # 将耗时的网络/第三方初始化移到后台线程，避免在 UI 线程阻塞
         self.available_models = []
@@ -34,7 +353,6 @@ class TextProcessor:
 
         # 异步初始化（非阻塞）
         try:
-            import threading
             init_thread = threading.Thread(target=self._background_init, daemon=True)
             init_thread.start()
         except Exception:
@@ -43,6 +361,55 @@ class TextProcessor:
             self.spell_checker = self._init_spell_checker() if enable_spell_checker else None
             self.translator = self._init_translator() if enable_translator else None
 
+    def _create_session(self) -> requests.Session:
+        """创建带连接池的 HTTP Session"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.POOL_CONNECTIONS,
+                              pool_maxsize=self.POOL_MAXSIZE,
+                              max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def close(self):
+        """关闭任务线程池和连接池（退出程序时调用）"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._chunk_executor.shutdown(wait=False, cancel_futures=True)
+        try:
+            self.session.close()
+        except Exception as e:
+            print(f"关闭 HTTP 连接失败: {e}")
+
+    def submit(self, operation: str, text: str, on_token=None, on_stats=None,
+               on_done=None, **kwargs) -> TextJob:
+        """
+        在后台线程中执行文本处理，立即返回任务句柄
+        
+        Args:
+            operation: 'spell_check' / 'translate' / 'polish' / 'summarize'
+            text: 要处理的文本
+            on_token: 大模型每生成一段文本时调用 on_token(piece)
+            on_stats: 生成结束时调用 on_stats(首字延迟, 每秒 token 数)
+            on_done: 任务结束（完成、出错或取消）时调用 on_done(job)
+            kwargs: 传给对应方法的其他参数（如 target_lang、force_method）
+        """
+        if operation not in self.JOB_OPERATIONS:
+            raise ValueError(f"未知操作类型: {operation}")
+        job = TextJob(operation)
+        # 即使调用方不需要逐段显示，也以流式读取，这样取消时能立即断开连接
+        stream = TokenStream(on_token=on_token, on_stats=on_stats, cancelled=job.is_cancelled)
+        job.stream = stream
+
+        def run():
+            if job.is_cancelled():
+                return None
+            return getattr(self, operation)(text, stream=stream, **kwargs)
+
+        job.future = self._executor.submit(run)
+        if on_done is not None:
+            job.future.add_done_callback(lambda _future: on_done(job))
+        return job
+
     def _background_init(self):
         """在后台线程中完成耗时初始化（检查可用模型、初始化拼写检查器和翻译器）"""
         try:
@@ -53,6 +420,8 @@ class TextProcessor:
         try:
             if self.enable_spell_checker:
                 self.spell_checker = self._init_spell_checker()
+                if self.spell_backend == "symspell":
+                    self.spell_checker = self._init_symspell(self.spell_checker)
         except Exception as e:
             print(f"后台初始化拼写检查器失败: {e}")
 
@@ -76,7 +445,7 @@ class TextProcessor:
             }
             
             try:
-                response = requests.post(
+                response = self.session.post(
                     f"{self.ollama_url}/api/generate",
                     json=data,
                     timeout=30
@@ -122,10 +491,18 @@ class TextProcessor:
         }
 
     def _init_spell_checker(self):
-        """初始化拼写检查器"""
+        """初始化拼写检查器（优先使用预编译词典，首次使用时从 pyspellchecker 词频表编译）"""
+        if self.dictionary_path:
+            try:
+                return load_spell_dictionary(self.dictionary_path, self.user_words_path)
+            except Exception as e:
+                print(f"预编译词典不可用，使用 pyspellchecker: {e}")
         try:
             from spellchecker import SpellChecker
-            return SpellChecker()
+            spell_checker = SpellChecker()
+            for word in read_user_words(self.user_words_path):
+                spell_checker.word_frequency.add(word)
+            return spell_checker
         except ImportError as e:
             print(f"spellchecker 库未安装，使用基础规则检查: {e}")
             return None
@@ -133,6 +510,49 @@ class TextProcessor:
             print(f"spellchecker 初始化失败，使用基础规则检查: {e}")
             return None
     
+    def _init_symspell(self, dictionary):
+        """
+        在预编译词典上建立 SymSpell 纠正器
+        首次使用需要建立删除索引（耗时较长，在后台线程中进行），
+        期间继续使用 dictionary 检查；失败时也保留 dictionary。
+        """
+        if not hasattr(dictionary, 'word_count'):
+            print("SymSpell 需要预编译词典，继续使用 pyspellchecker")
+            return dictionary
+        index_path = os.path.splitext(self.dictionary_path)[0] + ".symspell"
+        try:
+            checker = SymSpellChecker(dictionary, index_path)
+            checker.prepare()
+            return checker
+        except Exception as e:
+            print(f"SymSpell 索引建立失败，继续使用预编译词典: {e}")
+            return dictionary
+
+    def add_user_word(self, word: str) -> bool:
+        """把单词加入用户词典（写入文件并立即生效）"""
+        word = word.strip().lower()
+        if not word or any(ch.isspace() for ch in word):
+            return False
+        if self.user_words_path:
+            try:
+                with open(self.user_words_path, 'a', encoding='utf-8') as f:
+                    f.write(word + "\n")
+            except Exception as e:
+                print(f"写入用户词典失败: {e}")
+                return False
+        if self.spell_checker is not None:
+            if hasattr(self.spell_checker, 'add_user_word'):
+                self.spell_checker.add_user_word(word)
+            else:
+                self.spell_checker.word_frequency.add(word)
+        with self._spell_memo_lock:
+            self._spell_memo.clear()
+        return True
+
+    def _spell_method_name(self) -> str:
+        """传统拼写检查显示的方法名"""
+        return getattr(self.spell_checker, 'METHOD_NAME', "pyspellchecker")
+
     def _init_translator(self):
         """初始化翻译器"""
         try:
@@ -145,7 +565,7 @@ class TextProcessor:
     def _check_available_models(self) -> list:
         """检查 ollama 中可用的模型"""
         try:
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=3)
+            response = self.session.get(f"{self.ollama_url}/api/tags", timeout=3)
             if response.status_code == 200:
                 models = response.json().get('models', [])
                 return [model['name'] for model in models]
@@ -153,44 +573,116 @@ class TextProcessor:
             print(f"无法连接到 ollama: {e}")
         return []
 
-    def _call_ollama(self, prompt: str, model: str = None) -> Optional[str]:
-        """调用 ollama API"""
+    def _select_model(self, model: str = None) -> Optional[str]:
+        """选择模型：优先使用指定模型，否则使用首选模型，最后使用第一个可用模型"""
+        if model and model in self.available_models:
+            return model
+        if self.preferred_model in self.available_models:
+            return self.preferred_model
+        return self.available_models[0] if self.available_models else None
+
+    def _is_cacheable(self, method_used: str, preference: str) -> bool:
+        """
+        处理结果是否应缓存
+        失败、服务不可用时返回的是原文或提示；本地拼写检查本身很快，
+        且结果随用户词典变化，这两类都不缓存。偏好大模型时降级得到的
+        传统方法结果（反之亦然）也不缓存，否则大模型恢复后仍会一直命中降级结果。
+        """
+        if (method_used == "Ollama") != (preference == 'llm'):
+            return False
+        if method_used == self._spell_method_name():
+            return False
+        return not any(word in method_used for word in ("失败", "不可用", "无可用", "异步"))
+
+    def _call_ollama(self, prompt: str, model: str = None, stream: TokenStream = None) -> Optional[str]:
+        """
+        调用 ollama API（按 NDJSON 流式读取，传入 stream 时逐段回调）
+        同一 (模型, 提示词) 已有请求在进行时不再重复请求，而是加入该请求共享结果：
+        已生成的片段先补发给新加入的 stream，之后的片段同时发给所有参与者。
+        """
         if not self.available_models:
             return None
         
-        # 选择模型：优先使用指定模型，否则使用首选模型，最后使用第一个可用模型
-        if model and model in self.available_models:
-            target_model = model
-        elif self.preferred_model in self.available_models:
-            target_model = self.preferred_model
-        else:
-            target_model = self.available_models[0]
-            
-        # print(f"使用模型: {target_model}")
-        try:
-            data = {
-                "model": target_model,
-                "prompt": prompt,
-                "stream": False
-            }
-            
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json=data,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                raw_response = result.get('response', '').strip()
-                # 清理思考标签和其他不需要的内容
-                cleaned_response = self._clean_llm_response(raw_response)
-                return cleaned_response
-        except Exception as e:
-            print(f"ollama 调用失败: {e}")
+        target_model = self._select_model(model)
+        key = (target_model, prompt)
+        with self._inflight_lock:
+            shared = self._inflight.get(key)
+            is_leader = shared is None
+            if is_leader:
+                shared = SharedRequest()
+                self._inflight[key] = shared
+            shared.join(stream)
         
-        return None
+        if not is_leader:
+            # 等待发起者完成；自己被取消时不再等待，发起者在所有参与者都取消后才停止
+            while not shared.wait(0.1):
+                if stream is not None and stream.is_cancelled():
+                    return None
+            return shared.result
+        
+        result = None
+        try:
+            result = self._stream_ollama(target_model, prompt, shared)
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            shared.complete(result)
+        return result
     
+    def _stream_ollama(self, target_model: str, prompt: str, stream: SharedRequest) -> Optional[str]:
+        """流式调用：逐行解析 Ollama 返回的 JSON 片段，边生成边回调"""
+        data = {
+            "model": target_model,
+            "prompt": prompt,
+            "stream": True
+        }
+        pieces = []
+        start_time = time.perf_counter()
+        first_token_time = None
+        final_chunk = {}
+        try:
+            # timeout 为 (连接, 两段数据之间) 的超时，长文本生成不受总时长限制
+            with self.session.post(f"{self.ollama_url}/api/generate", json=data,
+                                   stream=True, timeout=(3, 30)) as response:
+                stream.attach_response(response)
+                if response.status_code != 200:
+                    return None
+                for line in response.iter_lines():
+                    if stream.is_cancelled():
+                        return None
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    piece = chunk.get('response', '')
+                    if piece:
+                        if first_token_time is None:
+                            first_token_time = time.perf_counter()
+                        pieces.append(piece)
+                        stream.feed(piece)
+                    if chunk.get('done'):
+                        final_chunk = chunk
+                        break
+        except Exception as e:
+            if not stream.is_cancelled():   # 取消时连接被主动关闭，不是错误
+                print(f"ollama 流式调用失败: {e}")
+            return None
+        finally:
+            stream.detach_response()
+
+        end_time = time.perf_counter()
+        ttft = (first_token_time - start_time) if first_token_time is not None else None
+        # 优先使用服务端统计的生成 token 数和耗时（纳秒），否则按收到的片段数估算
+        eval_count = final_chunk.get('eval_count')
+        eval_duration = final_chunk.get('eval_duration')
+        if eval_count and eval_duration:
+            tokens_per_second = eval_count / (eval_duration / 1e9)
+        elif first_token_time is not None and end_time > first_token_time:
+            tokens_per_second = stream.token_count / (end_time - first_token_time)
+        else:
+            tokens_per_second = None
+        stream.finish(ttft, tokens_per_second)
+        return self._clean_llm_response(''.join(pieces).strip())
+
     def _clean_llm_response(self, response: str) -> str:
         """
         清理大模型响应中的思考标签和其他不需要的内容
@@ -223,53 +715,55 @@ class TextProcessor:
         
         return cleaned.strip()
     
-    def spell_check(self, text: str, force_method: str = None) -> Tuple[str, str]:
+    @cached_operation
+    def spell_check(self, text: str, force_method: str = None, stream: TokenStream = None) -> Tuple[str, str]:
         """
         拼写检查功能
         
         Args:
             text: 要检查的文本
             force_method: 强制使用的方法 ('llm' 或 'traditional')，None 则根据设置自动选择
+            stream: 流式输出接收端，使用大模型时逐段回调生成的文本
             
         返回: (corrected_text, method_used)
         """
         # 如果强制指定方法
         if force_method == 'llm':
-            corrected_llm = self._spell_check_with_llm(text)
+            corrected_llm = self._spell_check_with_llm(text, stream)
             if corrected_llm:
                 return corrected_llm, "Ollama"
             else:
                 return text, "Ollama (失败，返回原文)"
         elif force_method == 'traditional':
             corrected_traditional = self._spell_check_traditional(text)
-            method_name = "pyspellchecker"
+            method_name = self._spell_method_name()
             return corrected_traditional, method_name
         # 根据设置自动选择
         if self.use_llm_first:
             # 优先尝试 ollama 大模型
-            corrected_llm = self._spell_check_with_llm(text)
+            corrected_llm = self._spell_check_with_llm(text, stream)
             if corrected_llm:
                 return corrected_llm, "Ollama"
             
             # 降级到传统方法
             corrected_traditional = self._spell_check_traditional(text)
-            method_name = "pyspellchecker"
+            method_name = self._spell_method_name()
             return corrected_traditional, method_name
         else:
             # 优先使用传统方法
             try:
                 corrected_traditional = self._spell_check_traditional(text)
-                method_name = "pyspellchecker"
+                method_name = self._spell_method_name()
                 return corrected_traditional, method_name
             except RuntimeError:
                 # 传统方法失败，尝试大模型
-                corrected_llm = self._spell_check_with_llm(text)
+                corrected_llm = self._spell_check_with_llm(text, stream)
                 if corrected_llm:
                     return corrected_llm, "Ollama"
                 else:
                     return text, "所有方法都失败，返回原文"
 
-    def _spell_check_with_llm(self, text: str) -> Optional[str]:
+    def _spell_check_with_llm(self, text: str, stream: TokenStream = None) -> Optional[str]:
         """使用大模型进行拼写检查"""
         if not self.available_models:
             return None
@@ -280,7 +774,7 @@ class TextProcessor:
 
 纠正后的文本："""
         
-        result = self._call_ollama(prompt)
+        result = self._call_ollama(prompt, stream=stream)
         if result and result != text:
             return result
         return None
@@ -293,40 +787,68 @@ class TextProcessor:
         else:
             raise RuntimeError("拼写检查器不可用")
 
+    def _latin_words(self, text: str) -> list:
+        """
+        按文字类别切分：只返回拉丁字母组成的单词（可含词中撇号，如 don't）
+        中文、日文等其他文字和数字、标点都不会交给英文拼写检查器；
+        与数字或下划线相连的片段（如 v2、file_name）视为标识符，同样跳过。
+        """
+        return list(self.LATIN_WORD_RE.finditer(text))
+
     def _spell_check_with_library(self, text: str) -> str:
-        """使用 spellchecker 库进行拼写检查"""
-        words = text.split()
-        corrected_words = []
-        
-        for word in words:
-            # 提取纯字母部分
-            clean_word = re.sub(r'[^\w]', '', word.lower())
-            if clean_word and clean_word in self.spell_checker:
-                corrected_words.append(word)
-            elif clean_word:
-                # 获取建议
-                suggestions = self.spell_checker.candidates(clean_word)
-                # 检查 suggestions 是否为 None
-                if suggestions is not None:
-                    suggestions_list = list(suggestions)
-                    if suggestions_list:
-                        # 使用第一个建议，保持原始大小写格式
-                        corrected = suggestions_list[0]
-                        if word[0].isupper():
-                            corrected = corrected.capitalize()
-                        # 保持标点符号
-                        corrected_word = re.sub(r'\w+', corrected, word)
-                        corrected_words.append(corrected_word)
-                    else:
-                        corrected_words.append(word)
-                else:
-                    # 如果 candidates 返回 None，保持原词
-                    corrected_words.append(word)
-            else:
-                corrected_words.append(word)
-        return ' '.join(corrected_words)
+        """
+        使用 spellchecker 库进行拼写检查
+        先切分出所有拉丁字母单词，用一次 unknown() 找出拼写错误的词，
+        只为其中不重复且未记忆过的词计算纠正，最后一次遍历重建文本；
+        单词之间的原文（空白、换行、中文、标点）原样保留。
+        """
+        matches = self._latin_words(text)
+        if not matches:
+            # 纯中文（或没有英文单词）的选区直接返回
+            return text
+        
+        unique_words = {match.group(0).lower() for match in matches}
+        misspelled = self.spell_checker.unknown(unique_words)
+        if not misspelled:
+            return text
+        corrections = {word: self._correct_word(word) for word in misspelled}
+        
+        rebuilt = []
+        position = 0
+        for match in matches:
+            corrected = corrections.get(match.group(0).lower())
+            if not corrected:
+                continue
+            word = match.group(0)
+            # 保持原始大小写格式
+            if word[0].isupper():
+                corrected = corrected.capitalize()
+            rebuilt.append(text[position:match.start()])
+            rebuilt.append(corrected)
+            position = match.end()
+        rebuilt.append(text[position:])
+        return ''.join(rebuilt)
+    
+    def _correct_word(self, word: str) -> Optional[str]:
+        """单个拼写错误单词的纠正结果（有上限的记忆，重复出现的词只计算一次）"""
+        with self._spell_memo_lock:
+            if word in self._spell_memo:
+                self._spell_memo.move_to_end(word)
+                return self._spell_memo[word]
+        
+        correction = self.spell_checker.correction(word)
+        if correction == word:
+            correction = None
+        
+        with self._spell_memo_lock:
+            self._spell_memo[word] = correction
+            while len(self._spell_memo) > self.SPELL_MEMO_SIZE:
+                self._spell_memo.popitem(last=False)
+        return correction
 
-    def translate(self, text: str, target_lang: str = "中文", force_method: str = None) -> Tuple[str, str]:
+    @cached_operation
+    def translate(self, text: str, target_lang: str = "中文", force_method: str = None,
+                  stream: TokenStream = None) -> Tuple[str, str]:
         """
         翻译功能
         
@@ -334,10 +856,11 @@ class TextProcessor:
             text: 要翻译的文本
             target_lang: 目标语言
             force_method: 强制使用的方法 ('llm' 或 'traditional')，None 则根据设置自动选择
+            stream: 流式输出接收端，使用大模型时逐段回调生成的文本
         """
         # 如果强制指定方法
         if force_method == 'llm':
-            translated_llm = self._translate_with_llm(text, target_lang)
+            translated_llm = self._translate_with_llm(text, target_lang, stream)
             if translated_llm:
                 return translated_llm, "Ollama"
             else:
@@ -348,7 +871,7 @@ class TextProcessor:
         # 根据设置自动选择
         if self.use_llm_first:
             # 优先使用大模型
-            translated_llm = self._translate_with_llm(text, target_lang)
+            translated_llm = self._translate_with_llm(text, target_lang, stream)
             if translated_llm:
                 return translated_llm, "Ollama"
             
@@ -361,13 +884,13 @@ class TextProcessor:
                 return translated_traditional, method
             
             # 传统方法失败，尝试大模型
-            translated_llm = self._translate_with_llm(text, target_lang)
+            translated_llm = self._translate_with_llm(text, target_lang, stream)
             if translated_llm:
                 return translated_llm, "Ollama"
             else:
                 return translated_traditional, method
 
-    def _translate_with_llm(self, text: str, target_lang: str) -> Optional[str]:
+    def _translate_with_llm(self, text: str, target_lang: str, stream: TokenStream = None) -> Optional[str]:
         """使用大模型翻译"""
         if not self.available_models:
             return None
@@ -378,7 +901,7 @@ class TextProcessor:
 
 译文："""
         
-        return self._call_ollama(prompt)
+        return self._call_ollama(prompt, stream=stream)
     
     def _translate_traditional(self, text: str, target_lang: str) -> Tuple[str, str]:
         """传统翻译方法"""
@@ -424,17 +947,19 @@ class TextProcessor:
         
         return f"[需要翻译服务] {text}", "无可用服务"
     
-    def polish(self, text: str, force_method: str = None) -> Tuple[str, str]:
+    @cached_operation
+    def polish(self, text: str, force_method: str = None, stream: TokenStream = None) -> Tuple[str, str]:
         """
         文本润色
         
         Args:
             text: 要润色的文本
             force_method: 强制使用的方法 ('llm' 或 'traditional')，None 则根据设置自动选择
+            stream: 流式输出接收端，使用大模型时逐段回调生成的文本
         """
         # 如果强制指定方法
         if force_method == 'llm':
-            polished_llm = self._polish_with_llm(text)
+            polished_llm = self._polish_with_llm(text, stream)
             if polished_llm:
                 return polished_llm, "Ollama"
             else:
@@ -446,7 +971,7 @@ class TextProcessor:
         # 根据设置自动选择
         if self.use_llm_first:
             # 优先使用大模型
-            polished_llm = self._polish_with_llm(text)
+            polished_llm = self._polish_with_llm(text, stream)
             if polished_llm:
                 return polished_llm, "Ollama"
             
@@ -459,7 +984,7 @@ class TextProcessor:
             
             # 如果传统方法结果不理想，可以尝试大模型
             if len(polished.strip()) == 0:
-                polished_llm = self._polish_with_llm(text)
+                polished_llm = self._polish_with_llm(text, stream)
                 if polished_llm:
                     return polished_llm, "Ollama"
             
@@ -477,7 +1002,7 @@ class TextProcessor:
         
         return polished
     
-    def _polish_with_llm(self, text: str) -> Optional[str]:
+    def _polish_with_llm(self, text: str, stream: TokenStream = None) -> Optional[str]:
         """使用大模型润色"""
         if not self.available_models:
             return None
@@ -488,19 +1013,21 @@ class TextProcessor:
 
 润色后："""
         
-        return self._call_ollama(prompt)
+        return self._call_ollama(prompt, stream=stream)
     
-    def summarize(self, text: str, force_method: str = None) -> Tuple[str, str]:
+    @cached_operation
+    def summarize(self, text: str, force_method: str = None, stream: TokenStream = None) -> Tuple[str, str]:
         """
         文本总结
         
         Args:
             text: 要总结的文本
             force_method: 强制使用的方法 ('llm' 或 'traditional')，None 则根据设置自动选择
+            stream: 流式输出接收端，使用大模型时逐段回调生成的文本
         """
         # 如果强制指定方法
         if force_method == 'llm':
-            summary_llm = self._summarize_with_llm(text)
+            summary_llm = self._summarize_with_llm(text, stream)
             if summary_llm:
                 return summary_llm, "Ollama"
             else:
@@ -512,7 +1039,7 @@ class TextProcessor:
         # 根据设置自动选择
         if self.use_llm_first:
             # 优先使用大模型
-            summary_llm = self._summarize_with_llm(text)
+            summary_llm = self._summarize_with_llm(text, stream)
             if summary_llm:
                 return summary_llm, "Ollama"
             
@@ -525,14 +1052,21 @@ class TextProcessor:
             
             # 如果文本很长，传统方法可能效果不好，可以尝试大模型
             if len(text.split()) > 100:  # 超过100个词
-                summary_llm = self._summarize_with_llm(text)
+                summary_llm = self._summarize_with_llm(text, stream)
                 if summary_llm and len(summary_llm) < len(summary):
                     return summary_llm, "Ollama"
             
             return summary, "Traditional Method"
 
     def _summarize_traditional(self, text: str) -> str:
-        """传统总结方法"""
+        """传统总结方法（长文本按块分别总结，每块一行）"""
+        chunks = split_text_chunks(text, self.SUMMARY_CHUNK_CHARS)
+        if len(chunks) > 1:
+            return '\n'.join(self._summarize_sentences(chunk) for chunk in chunks)
+        return self._summarize_sentences(text)
+
+    def _summarize_sentences(self, text: str) -> str:
+        """取首尾句的简单摘要"""
         sentences = re.split(r'[.!?]+', text.strip())
         sentences = [s.strip() for s in sentences if s.strip()]
         
@@ -545,16 +1079,68 @@ class TextProcessor:
             # 取第一句和最后一句
             return f"{sentences[0]}. ...{sentences[-1]}."
         
-    def _summarize_with_llm(self, text: str) -> Optional[str]:
-        """使用大模型总结"""
+    def _summarize_with_llm(self, text: str, stream: TokenStream = None, depth: int = 0) -> Optional[str]:
+        """
+        使用大模型总结
+        超过一块的长文本按 map-reduce 处理：各块并行总结（结果单独缓存，
+        修改一小部分后重新总结只需请求变化的块），再把各块摘要合并为整体摘要；
+        合并后仍然过长时继续分块合并。只有最后的合并步骤流式输出。
+        """
         if not self.available_models:
             return None
         
-        prompt = f"""请为以下文本生成简洁的摘要：
+        chunks = split_text_chunks(text, self.SUMMARY_CHUNK_CHARS)
+        if len(chunks) <= 1 or depth >= self.SUMMARY_MAX_DEPTH:
+            prompt = f"""请为以下文本生成简洁的摘要：
 
 原文：{text}
 
 摘要："""
+            return self._call_ollama(prompt, stream=stream)
+        
+        # map：并行总结各块
+        futures = [self._chunk_executor.submit(self._summarize_chunk, chunk, stream)
+                   for chunk in chunks]
+        partials = []
+        for future in futures:
+            partial = future.result()
+            if partial is None:
+                # 任一块失败或已取消：放弃剩余的块
+                for other in futures:
+                    other.cancel()
+                return None
+            partials.append(partial)
         
-        return self._call_ollama(prompt)
+        # reduce：合并各块摘要
+        combined = '\n'.join(f"- {partial}" for partial in partials)
+        if len(combined) > self.SUMMARY_CHUNK_CHARS:
+            return self._summarize_with_llm(combined, stream, depth + 1)
+        prompt = f"""以下是一篇长文本按顺序分段得到的各部分摘要，请将它们合并为一份简洁连贯的整体摘要：
+
+{combined}
+
+整体摘要："""
+        return self._call_ollama(prompt, stream=stream)
     
+    def _summarize_chunk(self, chunk: str, parent: TokenStream = None) -> Optional[str]:
+        """总结单个块，结果按块内容缓存"""
+        cancelled = parent.cancelled if parent is not None else None
+        key = make_cache_key("summarize_chunk", self._select_model(), None, chunk)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            return cached
+        if cancelled and cancelled():
+            return None
+        prompt = f"""以下是一篇长文本中的一部分，请用几句话概括这部分的要点：
+
+{chunk}
+
+要点："""
+        # 以流式读取，整个任务取消时可以立即断开
+        stream = TokenStream(cancelled=cancelled)
+        if parent is not None:
+            parent.add_cancel_listener(stream.notify_cancelled)
+        summary = self._call_ollama(prompt, stream=stream)
+        if summary:
+            self.result_cache.put(key, summary)
+        return summary
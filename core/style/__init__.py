@@ -0,0 +1,4 @@
+from .theme import (
+    ThemeManager, current_theme, set_style_role, repolish,
+    THEME_MODES, PRIORITY_COLORS, DEFAULT_PRIORITY_COLOR, TAG_COLORS, DEFAULT_TAG_COLOR
+)
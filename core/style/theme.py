@@ -0,0 +1,351 @@
+from string import Template
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import Qt, QObject, pyqtSignal
+from PyQt6.QtGui import QFont, QColor, QPalette
+
+# ======================
+# 主题配色
+# ======================
+THEME_MODES = ("system", "light", "dark")
+
+COLORS = {
+    "light": {
+        "primary": "#5D3FD3",
+        "primary_hover": "#4A2FB8",
+        "text": "#212121",
+        "muted": "#757575",
+        "subtle": "#9E9E9E",
+        "preview": "#616161",
+        "border": "#E0E0E0",
+        "divider": "#EEEEEE",
+        "selection": "#EDE7F6",
+        "selection_strong": "#D1C4E9",
+        "chip_bg": "#E0E0E0",
+        "chip_fg": "#424242",
+        "tag_chip_bg": "#E8EAF6",
+        "tag_chip_fg": "#3F51B5",
+        "tag_chip_border": "#C5CAE9",
+        "secondary_bg": "#EEEEEE",
+        "secondary_fg": "#424242",
+        "danger_bg": "#f8d7da",
+        "danger_fg": "#721c24",
+        "diary_mark": "#EDE7F6",
+        "todo_mark": "#FFF9C4",
+        "window": "#F5F5F5",
+        "base": "#FFFFFF",
+        "alternate_base": "#FAFAFA",
+        "button": "#F0F0F0",
+    },
+    "dark": {
+        "primary": "#7E57C2",
+        "primary_hover": "#9575CD",
+        "text": "#E0E0E0",
+        "muted": "#9E9E9E",
+        "subtle": "#757575",
+        "preview": "#BDBDBD",
+        "border": "#424242",
+        "divider": "#333333",
+        "selection": "#3A2F5B",
+        "selection_strong": "#4527A0",
+        "chip_bg": "#424242",
+        "chip_fg": "#E0E0E0",
+        "tag_chip_bg": "#2C2F4A",
+        "tag_chip_fg": "#C5CAE9",
+        "tag_chip_border": "#3F51B5",
+        "secondary_bg": "#424242",
+        "secondary_fg": "#E0E0E0",
+        "danger_bg": "#5C1F26",
+        "danger_fg": "#F8D7DA",
+        "diary_mark": "#5E35B1",
+        "todo_mark": "#DAA520",
+        "window": "#2B2B2B",
+        "base": "#1E1E1E",
+        "alternate_base": "#262626",
+        "button": "#353535",
+    },
+}
+
+# 优先级颜色：(背景色, 文字色)
+PRIORITY_COLORS = {
+    "high": ("#FF6B6B", "white"),
+    "medium": ("#FFD166", "black"),
+    "low": ("#06D6A0", "white"),
+}
+DEFAULT_PRIORITY_COLOR = ("#5D3FD3", "white")
+
+# 标签颜色映射
+TAG_COLORS = {
+    "工作": "#5D3FD3",
+    "学习": "#06D6A0",
+    "生活": "#FFD166",
+    "重要": "#FF6B6B",
+    "紧急": "#EF476F",
+    "个人": "#118AB2"
+}
+DEFAULT_TAG_COLOR = "#6C757D"
+
+# 字体规格：名称 -> (字号, 是否加粗)
+FONT_SPECS = {
+    "title_large": (24, True),
+    "title": (20, True),
+    "heading": (14, True),
+    "body": (12, False),
+    "body_bold": (12, True),
+    "meta": (10, False),
+    "small": (9, False),
+    "board": (14, False),
+    "board_header": (13, True),
+}
+
+# 整个应用唯一的样式表，控件通过 objectName 或动态属性匹配规则
+STYLESHEET = Template("""
+QLabel[role="title"] {
+    color: $primary;
+    padding: 10px;
+}
+QLabel[role="muted"] { color: $muted; }
+QLabel[role="subtle"] { color: $subtle; }
+QLabel[role="preview"] { color: $preview; }
+QLabel[role="formLabel"] { font-weight: bold; }
+QLabel[role="heading"] { font-weight: bold; font-size: 14px; }
+QLabel[role="sectionTitle"] { font-size: 16px; font-weight: bold; margin-bottom: 10px; }
+QLabel[role="description"] { color: $muted; margin-bottom: 15px; }
+QLabel[role="methodLabel"] { color: $muted; font-weight: bold; }
+QLabel[role="accent"] { color: $primary; }
+QLabel[role="chip"] {
+    background-color: $chip_bg;
+    color: $chip_fg;
+    border-radius: 10px;
+    padding: 2px 8px;
+}
+
+QPushButton[variant] {
+    padding: 10px 20px;
+    font-weight: bold;
+    border-radius: 6px;
+    min-width: 80px;
+}
+QPushButton[variant="primary"] { background-color: $primary; color: white; }
+QPushButton[variant="primary"]:hover { background-color: $primary_hover; }
+QPushButton[variant="success"] { background-color: #4CAF50; color: white; }
+QPushButton[variant="warning"] { background-color: #FFD166; color: black; }
+QPushButton[variant="info"] { background-color: #118AB2; color: white; }
+QPushButton[variant="secondary"] { background-color: $secondary_bg; color: $secondary_fg; }
+QPushButton[variant="danger"] { background-color: $danger_bg; color: $danger_fg; }
+
+QPushButton[role="nav"] {
+    border: none;
+    padding: 10px 20px;
+    font-size: 16px;
+    border-radius: 6px;
+}
+QPushButton[role="nav"]:checked { background-color: $primary; color: white; }
+
+QPushButton[role="dayStep"] {
+    font-size: 18px;
+    padding: 5px 15px;
+    background-color: $selection_strong;
+    color: $text;
+    border-radius: 6px;
+}
+QPushButton[role="dayStep"]:hover { background-color: $selection; }
+QPushButton[role="toggle"] {
+    font-size: 14px;
+    padding: 8px 12px;
+    background-color: $selection_strong;
+    color: $text;
+    border-radius: 6px;
+}
+QPushButton[role="toggle"]:checked { background-color: $primary; color: white; }
+QPushButton[role="picker"] {
+    text-align: left;
+    padding: 8px;
+    border: 1px solid $border;
+    border-radius: 4px;
+}
+
+QPushButton[role="tagChip"] {
+    background-color: $tag_chip_bg;
+    color: $tag_chip_fg;
+    border: 1px solid $tag_chip_border;
+    border-radius: 15px;
+    padding: 5px 12px;
+    font-size: 12px;
+}
+QPushButton[role="tagChip"]:hover { background-color: $tag_chip_border; }
+QPushButton[role="tagChip"]:checked { background-color: $tag_chip_fg; color: white; }
+
+QListView[role="itemList"] {
+    border: 1px solid $border;
+    border-radius: 6px;
+    padding: 5px;
+}
+QListView[role="itemList"]::item {
+    padding: 8px;
+    border-bottom: 1px solid $divider;
+}
+QListView[role="itemList"]::item:selected {
+    background-color: $selection;
+    color: $text;
+}
+QListView[role="compactList"]::item {
+    padding: 4px 8px;
+    margin: 2px;
+}
+QListView#notesList {
+    border: 1px solid $border;
+    border-radius: 8px;
+}
+QListView#notesList::item {
+    padding: 0px;
+    border-bottom: 1px solid $divider;
+}
+QListView#notesList::item:selected { background-color: $selection; }
+QListView#taskBoard::item:selected { background-color: $selection_strong; color: $text; }
+
+QLineEdit[role="taskInput"] {
+    padding: 10px;
+    font-size: 16px;
+    border: 1px solid $border;
+    border-radius: 6px;
+}
+QLineEdit[role="search"], QComboBox[role="filter"] {
+    padding: 6px 10px;
+    font-size: 14px;
+    border: 1px solid $border;
+    border-radius: 6px;
+}
+""")
+
+
+def build_palette(name):
+    """按主题配色生成应用调色板（强制浅色 / 深色时使用）"""
+    colors = COLORS[name]
+    role = QPalette.ColorRole
+    palette = QPalette()
+    for color_role, token in (
+        (role.Window, "window"),
+        (role.WindowText, "text"),
+        (role.Base, "base"),
+        (role.AlternateBase, "alternate_base"),
+        (role.Text, "text"),
+        (role.Button, "button"),
+        (role.ButtonText, "text"),
+        (role.ToolTipBase, "base"),
+        (role.ToolTipText, "text"),
+        (role.PlaceholderText, "subtle"),
+        (role.Highlight, "primary"),
+        (role.Link, "primary"),
+        (role.Mid, "border"),
+        (role.Midlight, "divider"),
+    ):
+        palette.setColor(color_role, QColor(colors[token]))
+    palette.setColor(role.HighlightedText, QColor("white"))
+    for color_role in (role.WindowText, role.Text, role.ButtonText):
+        palette.setColor(QPalette.ColorGroup.Disabled, color_role, QColor(colors["subtle"]))
+    return palette
+
+
+class ThemeManager(QObject):
+    """
+    主题管理器
+    启动时生成一次应用级样式表，并缓存常用的 QFont / QColor 对象；
+    切换主题只需重新设置样式表（Qt 统一重新 polish 一次）。
+    强制浅色 / 深色时同时设置应用调色板，使未被样式表覆盖的控件
+    配色一致；跟随系统时恢复启动时的系统调色板。
+    """
+    theme_changed = pyqtSignal(str)  # 参数为实际生效的主题名 light / dark
+
+    def __init__(self):
+        super().__init__()
+        self.mode = "system"
+        self.name = "light"
+        self._fonts = {}
+        self._colors = {}
+        self._system_palette = None   # 第一次强制配色前保存的系统调色板
+
+    def resolve(self, mode):
+        """把主题模式解析为实际使用的 light / dark"""
+        if mode in ("light", "dark"):
+            return mode
+        app = QApplication.instance()
+        if app is None:
+            return "light"
+        # Qt 6.5 起可以直接读取系统配色方案
+        hints = app.styleHints()
+        if hasattr(hints, "colorScheme"):
+            scheme = hints.colorScheme()
+            if scheme == Qt.ColorScheme.Dark:
+                return "dark"
+            if scheme == Qt.ColorScheme.Light:
+                return "light"
+        return "dark" if app.palette().window().color().lightness() < 128 else "light"
+
+    def apply(self, mode=None):
+        """应用主题（mode 为空时沿用当前模式）"""
+        app = QApplication.instance()
+        if mode is not None:
+            self.mode = mode if mode in THEME_MODES else "system"
+        if app is not None:
+            if self._system_palette is None:
+                self._system_palette = QPalette(app.palette())
+            if self.mode == "system":
+                # 先恢复系统调色板，resolve 才能读到系统的明暗
+                app.setPalette(self._system_palette)
+        self.name = self.resolve(self.mode)
+        self._colors = {}
+        if app is not None:
+            if self.mode != "system":
+                app.setPalette(build_palette(self.name))
+            app.setStyleSheet(STYLESHEET.substitute(COLORS[self.name]))
+        self.theme_changed.emit(self.name)
+
+    def is_dark(self):
+        return self.name == "dark"
+
+    def color(self, token):
+        """获取当前主题下的颜色（缓存 QColor 对象）"""
+        color = self._colors.get(token)
+        if color is None:
+            color = QColor(COLORS[self.name].get(token, token))
+            self._colors[token] = color
+        return color
+
+    def font(self, name):
+        """获取共享字体对象（与主题无关，只创建一次）"""
+        font = self._fonts.get(name)
+        if font is None:
+            size, bold = FONT_SPECS[name]
+            font = QFont("Arial", size, QFont.Weight.Bold if bold else QFont.Weight.Normal)
+            self._fonts[name] = font
+        return font
+
+
+_theme = None
+
+
+def current_theme():
+    """获取全局主题管理器"""
+    global _theme
+    if _theme is None:
+        _theme = ThemeManager()
+    return _theme
+
+
+def set_style_role(widget, role=None, variant=None):
+    """给控件设置样式表匹配用的动态属性
+
+    在控件显示前调用即可；显示后修改属性需要调用 repolish。
+    """
+    if role is not None:
+        widget.setProperty("role", role)
+    if variant is not None:
+        widget.setProperty("variant", variant)
+    return widget
+
+
+def repolish(widget):
+    """动态属性改变后让样式重新生效"""
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
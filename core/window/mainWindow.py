@@ -1,30 +1,50 @@
+import os
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QStackedWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton,QMessageBox
+    QPushButton,QMessageBox, QApplication
 )
-from PyQt6.QtCore import QDate, pyqtSignal
-from PyQt6.QtGui import QAction
-from core.components import CalendarView, DiaryView, QuickNoteView, TodayTODOView
+from PyQt6.QtCore import Qt, QDate, QTimer, pyqtSignal
+from datetime import datetime
+from PyQt6.QtGui import QAction, QActionGroup
+from core.components import (
+    CalendarView, DiaryView, QuickNoteView, TodayTODOView, TaskBoardView, FindReplaceDialog,
+    QuickSwitcherDialog
+)
+from core.server.quickSwitcher import SwitcherIndex
 from core.server.textServer import TextProcessor
 from core.window.settingsDialog import SettingsDialog
+from core.style import current_theme, set_style_role
 class MainWindow(QMainWindow):
     logout_requested = pyqtSignal()
+    REMINDER_MAX_WAIT_MS = 60 * 60 * 1000
     def __init__(self, username, file_manager):
         super().__init__()
         self.username = username
         self.file_manager = file_manager
-        self.text_processor = TextProcessor()
+        self.text_processor = TextProcessor(
+            cache_dir=os.path.join(self.file_manager.cache_dir, "text_results"),
+            dictionary_path=os.path.join(self.file_manager.cache_dir, "spell_en.dict"),
+            user_words_path=os.path.join(self.file_manager.user_base_path, "spell_words.txt"),
+            spell_backend=self.file_manager.get_spell_backend())
         # 推迟预热：让 UI 先完成显示再在后台预热模型，避免首次渲染被阻塞
         try:
-            from PyQt6.QtCore import QTimer
             # 100ms 后触发预热，这样主窗口有机会先完成绘制
             QTimer.singleShot(100, self.text_processor.warm_up_model)
         except Exception:
             # 回退到直接调用（极少发生）
             self.text_processor.warm_up_model()
         self.current_date = QDate.currentDate()
+        # 先应用主题：只设置一次应用级样式表，后续创建的控件直接匹配
+        current_theme().apply(self.file_manager.get_theme_mode())
         self.init_ui()
 
+        # 任务提醒：单个定时器始终对准最近的提醒时刻
+        self.reminder_scheduler = None
+        self.reminder_timer = QTimer(self)
+        self.reminder_timer.setSingleShot(True)
+        self.reminder_timer.timeout.connect(self.on_reminder_timeout)
+        QTimer.singleShot(500, self.init_reminders)
+
 
     def init_ui(self):
 
@@ -46,6 +66,31 @@ class MainWindow(QMainWindow):
         switch_user_action.triggered.connect(self.switch_user)
         account_menu.addAction(switch_user_action)
 
+        # 2. 编辑菜单：全库查找替换
+        edit_menu = menubar.addMenu("编辑(&E)")
+        find_replace_action = QAction("查找和替换...", self)
+        find_replace_action.setShortcut("Ctrl+Shift+F")
+        find_replace_action.triggered.connect(self.open_find_replace)
+        edit_menu.addAction(find_replace_action)
+
+        quick_switch_action = QAction("快速跳转...", self)
+        quick_switch_action.setShortcut("Ctrl+P")
+        quick_switch_action.triggered.connect(self.open_quick_switcher)
+        edit_menu.addAction(quick_switch_action)
+        self.switcher_index = None
+
+        # 3. 视图菜单：主题切换
+        view_menu = menubar.addMenu("视图(&V)")
+        theme_menu = view_menu.addMenu("主题")
+        theme_group = QActionGroup(self)
+        for mode, text in [("system", "跟随系统"), ("light", "浅色"), ("dark", "深色")]:
+            action = QAction(text, self)
+            action.setCheckable(True)
+            action.setChecked(current_theme().mode == mode)
+            action.triggered.connect(lambda checked, m=mode: self.set_theme_mode(m))
+            theme_group.addAction(action)
+            theme_menu.addAction(action)
+
 
         self.setWindowTitle(f"KairoDiary - {self.username}")
         self.setGeometry(100, 100, 1000, 700)
@@ -64,26 +109,17 @@ class MainWindow(QMainWindow):
         self.today_btn = QPushButton("今日待办")
         self.calendar_btn = QPushButton("日历")
         self.note_btn = QPushButton("快速笔记")
+        self.board_btn = QPushButton("任务看板")
         
-        nav_buttons = [self.calendar_btn, self.today_btn, self.note_btn]
+        nav_buttons = [self.calendar_btn, self.today_btn, self.note_btn, self.board_btn]
         for btn in nav_buttons:
             btn.setCheckable(True)
             btn.setMinimumHeight(40)
-            btn.setStyleSheet("""
-                QPushButton {
-                    border: none;
-                    padding: 10px 20px;
-                    font-size: 16px;
-                    border-radius: 6px;        
-                }
-                QPushButton:checked {
-                    background-color: #5D3FD3;
-                    color: white;
-                }
-            """)
+            set_style_role(btn, role="nav")
         nav_layout.addWidget(self.today_btn)
         nav_layout.addWidget(self.calendar_btn)
         nav_layout.addWidget(self.note_btn)
+        nav_layout.addWidget(self.board_btn)
         
         # 视图切换区域
         self.stacked_widget = QStackedWidget()
@@ -104,18 +140,22 @@ class MainWindow(QMainWindow):
         self.notes_view.note_deleted.connect(self.note_deleted)
         self.notes_view.notename_changed.connect(self.note_name_changed)
         self.diary_view.editor.open_note_signal.connect(self.notes_view.open_note_editor)
+        self.board_view = TaskBoardView(self.file_manager)
+        self.board_view.open_date.connect(self.open_diary)
         
 
         self.stacked_widget.addWidget(self.calendar_view)
         self.stacked_widget.addWidget(self.today_view)
         self.stacked_widget.addWidget(self.notes_view)  
         self.stacked_widget.addWidget(self.diary_view)
+        self.stacked_widget.addWidget(self.board_view)
 
         
         # 信号连接
         self.calendar_btn.clicked.connect(lambda: self.switch_view(0))
         self.today_btn.clicked.connect(lambda: self.switch_view(1))
         self.note_btn.clicked.connect(lambda: self.switch_view(2))
+        self.board_btn.clicked.connect(lambda: self.switch_view(4))
         
         # 添加布局
         main_layout.addLayout(nav_layout)
@@ -131,6 +171,7 @@ class MainWindow(QMainWindow):
         """打开指定日期的日记"""
         self.diary_view.load_date(date)
         self.stacked_widget.setCurrentIndex(3)
+        self.board_btn.setChecked(False)
 
     def switch_view(self, index):
         self.stacked_widget.setCurrentIndex(index)
@@ -139,6 +180,7 @@ class MainWindow(QMainWindow):
         self.calendar_btn.setChecked(index == 0)
         self.today_btn.setChecked(index == 1)
         self.note_btn.setChecked(index == 2)
+        self.board_btn.setChecked(index == 4)
         
         # 视图更新
         if index == 0:
@@ -149,6 +191,55 @@ class MainWindow(QMainWindow):
             self.notes_view.refresh()
         elif index == 3:
             self.diary_view.refresh()
+        elif index == 4:
+            self.board_view.refresh()
+
+    def init_reminders(self):
+        """加载任务索引并启动提醒定时器"""
+        self.reminder_scheduler = self.file_manager.get_reminder_scheduler()
+        self.file_manager.get_task_store().add_listener(self.on_tasks_changed)
+        self.arm_reminder_timer()
+
+    def on_tasks_changed(self, date_keys):
+        """日记保存后提醒调度器已增量更新，这里只需重新对准定时器"""
+        self.arm_reminder_timer()
+
+    def arm_reminder_timer(self):
+        """把定时器设置到下一次提醒时刻"""
+        deadline = self.reminder_scheduler.next_deadline() if self.reminder_scheduler else None
+        if deadline is None:
+            self.reminder_timer.stop()
+            return
+        delay_ms = int((deadline - datetime.now()).total_seconds() * 1000)
+        # 最长一小时后重新对准，避免系统休眠或时钟调整造成偏差
+        self.reminder_timer.start(min(max(delay_ms, 0), self.REMINDER_MAX_WAIT_MS))
+
+    def on_reminder_timeout(self):
+        """到达提醒时刻，弹出所有到期任务"""
+        tasks = self.reminder_scheduler.pop_due()
+        if tasks:
+            lines = []
+            for task in tasks:
+                line = f"• {task.text}"
+                if task.due:
+                    line += f"（截止 {task.due}）"
+                lines.append(line)
+            self.statusBar().showMessage(f"任务提醒: {tasks[0].text}", 10000)
+            QApplication.alert(self)
+            box = QMessageBox(QMessageBox.Icon.Information, "任务提醒", "\n".join(lines),
+                              QMessageBox.StandardButton.Ok, self)
+            box.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+            box.open()
+        self.arm_reminder_timer()
+
+    def closeEvent(self, event):
+        """关闭窗口时停止提醒，避免登出后旧窗口继续弹出"""
+        self.reminder_timer.stop()
+        if self.reminder_scheduler is not None:
+            self.file_manager.get_task_store().remove_listener(self.on_tasks_changed)
+        self.notes_view.stop_queries()
+        self.text_processor.close()
+        super().closeEvent(event)
 
     def switch_to_calendar(self):   
         """切换到日历视图"""
@@ -194,11 +285,42 @@ class MainWindow(QMainWindow):
         else:
             print(f"文件{new_filename}重命名失败，无法解析日期，")
 
+    def set_theme_mode(self, mode):
+        """切换主题：重新设置一次应用样式表并保存选择"""
+        current_theme().apply(mode)
+        self.file_manager.set_theme_mode(mode)
+
     def open_settings(self):
         """打开设置对话框"""
         settings_dialog = SettingsDialog(self.file_manager, self)
         settings_dialog.exec()
+        if settings_dialog.tags_rewritten:
+            # 笔记文件名和日记内容已改写，刷新当前视图
+            self.refresh_current_view()
     
+    def open_find_replace(self):
+        """打开全库查找替换对话框"""
+        dialog = FindReplaceDialog(self.file_manager, self)
+        dialog.files_changed.connect(self.refresh_current_view)
+        dialog.exec()
+
+    def open_quick_switcher(self):
+        """打开快速跳转（索引在首次使用时建立，之后随笔记目录变化更新）"""
+        if self.switcher_index is None:
+            self.switcher_index = SwitcherIndex(self.file_manager)
+        dialog = QuickSwitcherDialog(self.switcher_index, self)
+        dialog.note_selected.connect(self.notes_view.open_note_editor)
+        dialog.date_selected.connect(
+            lambda date_key: self.open_diary(QDate.fromString(date_key, "yyyy-MM-dd")))
+        # 显示在窗口上方居中
+        dialog.move(self.mapToGlobal(self.rect().center()).x() - dialog.width() // 2,
+                    self.mapToGlobal(self.rect().topLeft()).y() + 80)
+        dialog.exec()
+
+    def refresh_current_view(self):
+        """文件在视图之外被修改后，刷新当前视图"""
+        self.switch_view(self.stacked_widget.currentIndex())
+
     def switch_user(self):
         """切换用户"""
         # 确认对话框
@@ -1,7 +1,28 @@
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QListWidget, 
-    QPushButton, QInputDialog, QMessageBox, QTabWidget, QWidget,
+    QPushButton, QInputDialog, QMessageBox, QTabWidget, QWidget, QProgressDialog,
 )
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from core.server.tagRefactor import TagRefactor
+from core.style import set_style_role
+
+
+class TagRefactorThread(QThread):
+    """在后台线程中计算标签改写（只读文件），提交由界面线程完成"""
+    progress = pyqtSignal(int, int)
+    failed = pyqtSignal(str)
+
+    def __init__(self, refactor, parent=None):
+        super().__init__(parent)
+        self.refactor = refactor
+        self.result = None
+
+    def run(self):
+        try:
+            self.result = self.refactor.plan(progress=self.progress.emit,
+                                             cancelled=self.isInterruptionRequested)
+        except Exception as e:
+            self.failed.emit(str(e))
 
 
 class SettingsDialog(QDialog):
@@ -11,6 +32,11 @@ class SettingsDialog(QDialog):
         self.setWindowTitle("账户设置")
         self.setGeometry(200, 200, 500, 400)
         self.setModal(True)
+
+        # 本次对话框中的标签改名 / 合并 / 删除：旧标签 -> 新标签（None 表示删除）
+        self.tag_mappings = {"note": {}, "todo": {}}
+        self.tags_rewritten = False
+        self.refactor_thread = None
         
         self.init_ui()
         self.load_tags()
@@ -56,12 +82,12 @@ class SettingsDialog(QDialog):
         
         # 标题
         title_label = QLabel("笔记标签管理")
-        title_label.setStyleSheet("font-size: 16px; font-weight: bold; margin-bottom: 10px;")
+        set_style_role(title_label, role="sectionTitle")
         layout.addWidget(title_label)
         
         # 说明文字
         desc_label = QLabel("管理您的笔记分类标签，可以添加、修改或删除标签。")
-        desc_label.setStyleSheet("color: #666; margin-bottom: 15px;")
+        set_style_role(desc_label, role="description")
         layout.addWidget(desc_label)
         
         # 标签列表
@@ -93,12 +119,12 @@ class SettingsDialog(QDialog):
         
         # 标题
         title_label = QLabel("待办事项标签管理")
-        title_label.setStyleSheet("font-size: 16px; font-weight: bold; margin-bottom: 10px;")
+        set_style_role(title_label, role="sectionTitle")
         layout.addWidget(title_label)
         
         # 说明文字
         desc_label = QLabel("管理您的待办事项分类标签，可以添加、修改或删除标签。")
-        desc_label.setStyleSheet("color: #666; margin-bottom: 15px;")
+        set_style_role(desc_label, role="description")
         layout.addWidget(desc_label)
         
         # 标签列表
@@ -180,16 +206,30 @@ class SettingsDialog(QDialog):
         if ok and new_name.strip():
             new_name = new_name.strip()
             
+            if new_name == old_name:
+                return
+
             # 检查是否已存在（除了当前项）
             existing_tags = [list_widget.item(i).text() for i in range(list_widget.count()) 
                            if list_widget.item(i) != current_item]
             
             if new_name in existing_tags:
-                QMessageBox.warning(self, "警告", "该标签已存在！")
-                return
-            
-            # 更新标签名称
-            current_item.setText(new_name)
+                # 改成已有标签即为合并
+                reply = QMessageBox.question(
+                    self,
+                    "合并标签",
+                    f"标签 '{new_name}' 已存在，是否将 '{old_name}' 合并到 '{new_name}'？",
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                    QMessageBox.StandardButton.No
+                )
+                if reply != QMessageBox.StandardButton.Yes:
+                    return
+                list_widget.takeItem(list_widget.row(current_item))
+            else:
+                # 更新标签名称
+                current_item.setText(new_name)
+
+            self.record_tag_change(tag_type, old_name, new_name)
     
     def delete_tag(self, tag_type):
         """删除标签"""
@@ -206,7 +246,7 @@ class SettingsDialog(QDialog):
         reply = QMessageBox.question(
             self, 
             "确认删除", 
-            f"确定要删除标签 '{tag_name}' 吗？",
+            f"确定要删除标签 '{tag_name}' 吗？\n保存后会同时从所有{'笔记' if tag_type == 'note' else '待办事项'}中移除该标签。",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             QMessageBox.StandardButton.No
         )
@@ -215,6 +255,16 @@ class SettingsDialog(QDialog):
             # 删除选中的项
             row = list_widget.row(current_item)
             list_widget.takeItem(row)
+            self.record_tag_change(tag_type, tag_name, None)
+
+    def record_tag_change(self, tag_type, old_name, new_name):
+        """记录一次改名 / 合并 / 删除，与之前的修改合成一个映射"""
+        mapping = self.tag_mappings[tag_type]
+        for key, value in mapping.items():
+            if value == old_name:
+                mapping[key] = new_name
+        if old_name not in mapping:
+            mapping[old_name] = new_name
     
     def save_settings(self):
         """保存设置"""
@@ -236,15 +286,80 @@ class SettingsDialog(QDialog):
                 QMessageBox.warning(self, "警告", "待办标签不能为空！")
                 return
             
-            # 保存到文件管理器
-            note_success = self.file_manager.set_note_tags(note_tags)
-            todo_success = self.file_manager.set_todo_tags(todo_tags)
-            
-            if note_success and todo_success:
-                QMessageBox.information(self, "成功", "设置已保存！")
-                self.accept()
+            refactor = TagRefactor(self.file_manager,
+                                   note_mapping=self.tag_mappings["note"],
+                                   todo_mapping=self.tag_mappings["todo"])
+            if refactor.is_empty():
+                self.save_tag_config(note_tags, todo_tags)
             else:
-                QMessageBox.critical(self, "错误", "保存设置失败！")
+                # 先在后台改写笔记和日记，成功后再保存标签列表，保证三者一致
+                self.start_tag_refactor(refactor, note_tags, todo_tags)
                 
         except Exception as e:
             QMessageBox.critical(self, "错误", f"保存设置时发生错误: {str(e)}")
+
+    def save_tag_config(self, note_tags, todo_tags):
+        """保存标签列表到配置文件"""
+        note_success = self.file_manager.set_note_tags(note_tags)
+        todo_success = self.file_manager.set_todo_tags(todo_tags)
+
+        if note_success and todo_success:
+            QMessageBox.information(self, "成功", "设置已保存！")
+            self.accept()
+        else:
+            QMessageBox.critical(self, "错误", "保存设置失败！")
+
+    # ==================== 标签改写任务 ====================
+    def start_tag_refactor(self, refactor, note_tags, todo_tags):
+        """启动后台标签改写任务并显示进度"""
+        self.save_btn.setEnabled(False)
+        progress_dialog = QProgressDialog("正在查找使用这些标签的笔记和日记...", "取消", 0, 0, self)
+        progress_dialog.setWindowTitle("更新标签")
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(300)
+
+        thread = TagRefactorThread(refactor, self)
+        errors = []
+        thread.progress.connect(lambda done, total: self.update_refactor_progress(
+            progress_dialog, done, total))
+        thread.failed.connect(errors.append)
+        progress_dialog.canceled.connect(thread.requestInterruption)
+        thread.finished.connect(lambda: self.finish_tag_refactor(
+            thread, progress_dialog, errors, note_tags, todo_tags))
+        self.refactor_thread = thread
+        thread.start()
+
+    def update_refactor_progress(self, progress_dialog, done, total):
+        progress_dialog.setMaximum(total)
+        progress_dialog.setValue(done)
+        progress_dialog.setLabelText(f"正在改写日记 {done}/{total}")
+
+    def finish_tag_refactor(self, thread, progress_dialog, errors, note_tags, todo_tags):
+        """后台计算完成后在界面线程中一次性提交"""
+        progress_dialog.close()
+        self.refactor_thread = None
+        self.save_btn.setEnabled(True)
+        refactor = thread.refactor
+
+        if errors:
+            QMessageBox.critical(self, "错误", f"更新标签失败，未做任何修改：{errors[0]}")
+            return
+        if thread.result is None:
+            QMessageBox.information(self, "已取消", "已取消更新标签，未做任何修改")
+            return
+        if not refactor.apply():
+            QMessageBox.critical(self, "错误", "写入笔记和日记失败，未做任何修改")
+            return
+
+        self.tags_rewritten = True
+        self.tag_mappings = {"note": {}, "todo": {}}
+        print(f"标签已更新: {len(refactor.note_renames)} 个笔记, "
+              f"{len(refactor.diary_contents)} 篇日记, {refactor.changed_tasks} 个任务")
+        self.save_tag_config(note_tags, todo_tags)
+
+    def reject(self):
+        # 后台任务只读取文件，取消后直接丢弃结果
+        if self.refactor_thread is not None:
+            self.refactor_thread.requestInterruption()
+            self.refactor_thread.wait()
+        super().reject()
@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QIcon
 
@@ -104,4 +105,6 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # 打包后的程序在 spawn 平台上启动搜索进程池时需要（必须最先执行）
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
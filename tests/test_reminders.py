@@ -0,0 +1,25 @@
+from datetime import datetime
+import pytest
+
+pytest.importorskip("PyQt6")
+pytest.importorskip("requests")   # core.server 包导入时需要
+
+from core.server.taskStore import TaskStore
+from core.server.reminders import ReminderScheduler
+
+
+def test_task_moved_to_earlier_listed_date_keeps_reminder(tmp_path):
+    store = TaskStore(str(tmp_path), str(tmp_path / "task_index.json"))
+    store.update_dates({"2026-10-20": ("## TODO\n- [ ] { remind:09:00, id:a}call\n", None)})
+    scheduler = ReminderScheduler(store)
+    now = datetime(2026, 10, 18)
+    scheduler.rebuild(now)
+    assert len(scheduler) == 1
+
+    # 任务 a 从 10-20 移动到 10-21，目标日期排在前面
+    store.update_dates({"2026-10-20": ("## TODO\n", None),
+                        "2026-10-21": ("## TODO\n- [ ] { remind:09:00, id:a}call\n", None)})
+    scheduler.update_dates(["2026-10-21", "2026-10-20"], now)
+
+    assert len(scheduler) == 1
+    assert scheduler.next_deadline() == datetime(2026, 10, 21, 9, 0)
@@ -0,0 +1,53 @@
+import pytest
+
+pytest.importorskip("PyQt6")
+pytest.importorskip("requests")   # core.server 包导入时需要
+
+from PyQt6.QtCore import QDate
+from core.server.fileServer import FileManager
+from core.server.taskRollover import rollover_tasks, move_tasks, read_todo_tasks
+
+
+def write_diary(file_manager, date_key, content):
+    path = file_manager.get_diary_path(QDate.fromString(date_key, "yyyy-MM-dd"))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def open_texts(file_manager, date_key):
+    content = file_manager.load_diary(QDate.fromString(date_key, "yyyy-MM-dd"))
+    return [task['text'] for task in read_todo_tasks(date_key, content) if not task['completed']]
+
+
+@pytest.fixture
+def file_manager(tmp_path):
+    manager = FileManager(str(tmp_path), "tester")
+    # 两天中出现同一个 ID（例如复制粘贴的任务行）
+    write_diary(manager, "2026-10-10", "## TODO\n- [ ] { id:abcd1234}first\n\n## Notes\n")
+    write_diary(manager, "2026-10-11", "## TODO\n- [ ] { id:abcd1234}second\n\n## Notes\n")
+    return manager
+
+
+def test_rollover_moves_tasks_with_duplicate_ids_across_days(file_manager):
+    moved = rollover_tasks(file_manager, QDate(2026, 10, 1), QDate(2026, 10, 17),
+                           QDate(2026, 10, 18))
+
+    assert moved == 2
+    assert open_texts(file_manager, "2026-10-10") == []
+    assert open_texts(file_manager, "2026-10-11") == []
+    assert sorted(open_texts(file_manager, "2026-10-18")) == ["first", "second"]
+    ids = [task.task_id for task in file_manager.get_task_store().tasks_on("2026-10-18")]
+    assert len(set(ids)) == 2
+
+
+def test_move_tasks_does_not_skip_task_whose_raw_id_is_on_target(file_manager):
+    # 2026-10-11 文件中的 abcd1234 在索引中已改用推导 ID，移动 2026-10-10 的任务不应被跳过
+    source = file_manager.get_task_store().tasks_on("2026-10-10")
+    assert source[0].task_id == "abcd1234"
+
+    added = move_tasks(file_manager, QDate(2026, 10, 10), [],
+                       [task.to_dict() for task in source], QDate(2026, 10, 11))
+
+    assert added == 1
+    assert open_texts(file_manager, "2026-10-10") == []
+    assert sorted(open_texts(file_manager, "2026-10-11")) == ["first", "second"]
@@ -0,0 +1,11 @@
+import pytest
+
+pytest.importorskip("PyQt6")
+pytest.importorskip("requests")   # core.server 包导入时需要
+
+from core.server.textServer import TextProcessor
+
+
+def test_latin_words_after_opening_quote_are_checked():
+    words = TextProcessor.LATIN_WORD_RE.findall("he said 'teh speling' don't rock'n'roll x2y")
+    assert words == ["he", "said", "teh", "speling", "don't", "rock'n'roll"]